@@ -19,9 +19,9 @@ def set_werkzeug_log_format():
 
 set_werkzeug_log_format()
 
-import asyncio
+import atexit
+import json
 import os
-from threading import Lock, Thread
 from time import time
 from typing import Dict, List, Optional
 
@@ -29,6 +29,7 @@ from typing import Dict, List, Optional
 from dotenv import load_dotenv
 from flask import (
     Flask,
+    Response,
     flash,
     jsonify,
     redirect,
@@ -38,10 +39,17 @@ from flask import (
     session,
     url_for,
 )
-from llm.categorizer import categorize_text_with_llama3
+from llm.categorizer import categorization_key
+from llm.worker import get_categorization_queue
 
 
-from scraper.config import SCRAPER_CLS
+from scraper.core.archive import get_page_archive
+from scraper.core.background_loop import run_in_background
+from scraper.core.browser_pool import close_browser_pool
+from scraper.core.jobs import JobNotFound, JobRejected, JobScheduler
+from scraper.core.metrics import CONTENT_TYPE, REGISTRY
+from scraper.core.progress import CrawlProgress, ProgressStore
+from scraper.core.storage import BASE_DIR
 from scraper.logging_config import get_logger
 from scraper.utils.url_utils import format_url, is_valid_url
 
@@ -53,29 +61,48 @@ logger = get_logger(__name__)
 
 RATE_LIMIT_SECONDS: int = 20
 
-crawl_status_store: Dict[str, str] = {}
-crawl_status_lock = Lock()
+STATUS_STREAM_KEEPALIVE = 15  # Seconds between SSE keep-alive comments
 
+LLM_CATEGORIZE_ON_CRAWL = os.getenv("LLM_CATEGORIZE_ON_CRAWL", "1") == "1"
 
-def set_crawl_status(task_id: str, status: str):
-    with crawl_status_lock:
-        crawl_status_store[task_id] = status
+progress_store = ProgressStore()
 
 
-def get_crawl_status(task_id: str) -> Optional[str]:
-    with crawl_status_lock:
-        return crawl_status_store.get(task_id)
+def enqueue_categorization(domain: str, url: str, text: str) -> None:
+    """Crawler hook: categorize each page in the background as soon as it is saved."""
+    get_categorization_queue().submit(text)
 
 
-def run_crawl(url: str, max_pages: int, task_id: str) -> None:
+# Crawls share one long-lived loop so the warm browser pool survives between them
+job_scheduler = JobScheduler(
+    progress_store, enqueue_categorization if LLM_CATEGORIZE_ON_CRAWL else None
+)
+
+
+def current_user() -> str:
+    """Anonymous per-browser id, used for per-user crawl fairness and job ownership."""
+    if "user_id" not in session:
+        session["user_id"] = os.urandom(8).hex()
+    return session["user_id"]
+
+
+def submit_crawl(url: str, resume: bool = False) -> Optional[str]:
+    """Queue a crawl job; returns its task id, or None (with a flash) if it was rejected."""
+    task_id = f"crawl_{int(time()*1000)}_{os.urandom(2).hex()}"
     try:
-        set_crawl_status(task_id, "Crawl started...")
-        scraper = SCRAPER_CLS(max_pages=max_pages)
-        asyncio.run(scraper.crawl(url, status_key=task_id, status_callback=set_crawl_status))
-        set_crawl_status(task_id, "Crawl finished.")
+        job_scheduler.submit(task_id, url, current_user(), max_pages=50, resume=resume)
+    except JobRejected as e:
+        flash(str(e), "error")
+        return None
+    return task_id
+
+
+@atexit.register
+def shutdown_browser_pool() -> None:
+    try:
+        run_in_background(close_browser_pool()).result(timeout=10)
     except Exception as e:
-        logger.error(f"❌ Crawl failed: {e}", exc_info=True)
-        set_crawl_status(task_id, f"Error during crawl: {e}")
+        logger.warning(f"Browser pool shutdown failed: {e}")
 
 
 def list_scraped_files(domain: str) -> Dict[str, List[Dict[str, str]]]:
@@ -117,34 +144,124 @@ def list_scraped_files(domain: str) -> Dict[str, List[Dict[str, str]]]:
     return categories
 
 
+def latest_page_text(domain: str) -> Optional[str]:
+    """Text of the domain's most recently archived page (or a .txt file from older crawls)."""
+    record = get_page_archive(BASE_DIR).latest(domain)
+    if record is not None:
+        return record.text
+    txt_dir = os.path.join("extracted_data", domain, "text")
+    if not os.path.exists(txt_dir):
+        return None
+    txt_files = [f for f in os.listdir(txt_dir) if f.endswith(".txt")]
+    if not txt_files:
+        return None
+    with open(os.path.join(txt_dir, sorted(txt_files)[-1]), "r", encoding="utf-8") as f:
+        return f.read()
+
+
 @app.route("/extracted_data/<path:filename>")
 def extracted_data(filename):
     return send_from_directory("extracted_data", filename)
 
 
+def status_payload(progress: CrawlProgress) -> Dict:
+    return {
+        "status": progress.message,
+        "finished": progress.done,
+        "progress": progress.to_dict(),
+    }
+
+
 @app.route("/status/<task_id>")
 def crawl_status_api(task_id):
-    status = get_crawl_status(task_id) or ""
-    import re
+    progress = progress_store.get(task_id)
+    if progress is None:
+        return jsonify({"status": "", "finished": True, "progress": {"percent": 0}}), 404
+    return jsonify(status_payload(progress))
+
+
+@app.route("/status/<task_id>/stream")
+def crawl_status_stream(task_id):
+    """Server-Sent Events: one ``data:`` message per progress change until the crawl ends."""
+
+    def events():
+        version = 0
+        while True:
+            progress = progress_store.wait(task_id, version, STATUS_STREAM_KEEPALIVE)
+            if progress is None:
+                if progress_store.get(task_id) is None:
+                    yield "event: gone\ndata: {}\n\n"
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            version = progress.version
+            yield f"data: {json.dumps(status_payload(progress))}\n\n"
+            if progress.done:
+                return
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/categorized/<key>")
+def categorized_api(key):
+    """Categorization state of one page text: partial streamed answer until done."""
+    job = get_categorization_queue().get(key)
+    if job is None:
+        return jsonify({"done": False, "known": False, "partial": ""}), 404
+    return jsonify(
+        {"done": job.done, "known": True, "partial": job.partial, "result": job.result()}
+    )
+
+
+@app.route("/metrics")
+def metrics():
+    """Crawl and LLM stage timings and counters in the Prometheus text format."""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
 
-    match = re.search(r"Crawled (\d+)[^\d]+(\d+)", status)
-    progress = {}
-    percent = 0
-    if match:
-        try:
-            cur = int(match.group(1))
-            total = int(match.group(2))
-            percent = int(cur / total * 100)
-            progress = {"cur": cur, "total": total, "percent": percent}
-        except Exception:
-            pass
-    finished = False
-    status_lc = status.lower()
-    if "finished" in status_lc or "error" in status_lc:
-        finished = True
-        percent = 100
-    progress["percent"] = percent
-    return jsonify({"status": status, "finished": finished, "progress": progress})
+
+@app.route("/jobs")
+def jobs_api():
+    """The current user's queued, running and paused crawl jobs."""
+    return jsonify({"jobs": job_scheduler.jobs(current_user())})
+
+
+@app.route("/jobs/<task_id>/<action>", methods=["POST"])
+def job_action_api(task_id, action):
+    """Cancel, pause or resume one of the current user's crawl jobs."""
+    actions = {
+        "cancel": job_scheduler.cancel,
+        "pause": job_scheduler.pause,
+        "resume": job_scheduler.unpause,
+    }
+    if action not in actions:
+        return jsonify({"error": f"Unknown action: {action}"}), 400
+    try:
+        job = actions[action](task_id, current_user())
+    except JobNotFound:
+        return jsonify({"error": "No such active job."}), 404
+    return jsonify({"job": job.to_dict()})
+
+
+@app.route("/resume", methods=["POST"])
+def resume_crawl():
+    """Continue an unfinished crawl of the submitted URL from its last checkpoint."""
+    url = request.form.get("url", "").strip()
+    if not is_valid_url(url):
+        flash("Please enter a valid URL (e.g., example.com or https://example.com).", "error")
+        return redirect(url_for("index"))
+    url = format_url(url)
+    task_id = submit_crawl(url, resume=True)
+    if task_id is None:
+        return redirect(url_for("index"))
+    from urllib.parse import urlparse
+
+    session["last_domain"] = urlparse(url).netloc or url
+    session["last_task_id"] = task_id
+    return redirect(url_for("index", task_id=task_id))
 
 
 @app.route("/", methods=["GET", "POST"])
@@ -155,6 +272,7 @@ def index():
     task_id = None
     scraped_files = {}
     categorized = None  # NEW
+    categorized_key = None
 
     if request.method == "POST":
         url = request.form.get("url", "").strip()
@@ -170,7 +288,6 @@ def index():
         except (ValueError, TypeError):
             last_crawl = 0.0
         now = time()
-        task_id = f"crawl_{int(now*1000)}_{os.urandom(2).hex()}"
 
         if now - last_crawl < RATE_LIMIT_SECONDS:
             error = (
@@ -180,10 +297,9 @@ def index():
             flash(error, "error")
             return redirect(url_for("index"))
 
-        set_crawl_status(task_id, "Crawl started...")
-        t = Thread(target=run_crawl, args=(url, 50, task_id))
-        t.daemon = True
-        t.start()
+        task_id = submit_crawl(url)
+        if task_id is None:
+            return redirect(url_for("index"))
         from urllib.parse import urlparse
 
         domain_just_crawled = urlparse(url).netloc or url
@@ -196,51 +312,48 @@ def index():
     domain_to_display = session.get("last_domain")
 
     extracted_dirs = [
-        d for d in os.listdir("extracted_data") if os.path.isdir(os.path.join("extracted_data", d))
+        d
+        for d in os.listdir("extracted_data")
+        if not d.startswith(".") and os.path.isdir(os.path.join("extracted_data", d))
     ]
+    extracted_dirs = sorted(set(extracted_dirs) | set(get_page_archive(BASE_DIR).domains()))
     if not domain_to_display and extracted_dirs:
         domain_to_display = sorted(extracted_dirs)[-1]
 
     if domain_to_display and domain_to_display in extracted_dirs:
         scraped_files = list_scraped_files(domain_to_display)
-        txt_dir = os.path.join("extracted_data", domain_to_display, "text")
-        if os.path.exists(txt_dir):
-            txt_files = [f for f in os.listdir(txt_dir) if f.endswith(".txt")]
-            if txt_files:
-                with open(os.path.join(txt_dir, sorted(txt_files)[-1]), "r", encoding="utf-8") as f:
-                    extracted_text = f.read()
-                    # --- Categorize with Llama 3
-                    try:
-                        categorized = categorize_text_with_llama3(extracted_text)
-                        logger.info(
-                            "🧩 Categorized LLM result keys: %s",
-                            list(categorized.keys()) if categorized else "None",
-                        )
-                        logger.info("🧩 Categorized LLM result: %s", repr(categorized)[:1000])
-
-                    except Exception as e:
-                        logger.error(f"LLM categorization failed: {e}")
-                        categorized = None
-
-    crawl_status = None
+        extracted_text = latest_page_text(domain_to_display)
+        if extracted_text:
+            # --- Categorize with Llama 3 in the background; never block the page
+            job = get_categorization_queue().submit(extracted_text)
+            if job is not None and job.done:
+                categorized = job.result()
+                logger.info(
+                    "🧩 Categorized LLM result keys: %s",
+                    list(categorized.keys()) if categorized else "None",
+                )
+            elif job is not None:
+                categorized_key = categorization_key(extracted_text)
+
+    progress = None
     if task_id:
-        crawl_status = get_crawl_status(task_id)
+        progress = progress_store.get(task_id)
     else:
-        with crawl_status_lock:
-            if crawl_status_store:
-                last_task = sorted(crawl_status_store.keys())[-1]
-                crawl_status = crawl_status_store[last_task]
-                task_id = last_task
+        latest = progress_store.latest()
+        if latest:
+            task_id, progress = latest
 
     return render_template(
         "index.html",
         error=error,
         status=status,
-        crawl_status=crawl_status,
+        crawl_status=progress.message if progress else None,
+        crawl_running=bool(progress and not progress.done),
         text=extracted_text,
         scraped_files=scraped_files,
         task_id=task_id,
         categorized=categorized,  # NEW
+        categorized_key=categorized_key,
     )
 
 
@@ -1,25 +1,81 @@
 # app/llm/api.py
+import json
 import os
+import time
+from threading import BoundedSemaphore
+from typing import Callable, Optional
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from scraper.core.metrics import LLM_REQUEST_SECONDS
+
 from .utils import try_write_file, PROJECT_TMP_DIR
 
-def call_llama3(prompt: str, logger):
+LLAMA3_MODEL = os.getenv("LLAMA3_MODEL", "llama3")
+OLLAMA_CHAT_URL = os.getenv("OLLAMA_CHAT_URL", "http://localhost:11434/api/chat")
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "2"))  # Parallel calls to Ollama
+LLM_STREAM = os.getenv("LLM_STREAM", "1") == "1"  # Stream partial answers to the UI
+
+# One keep-alive session for every call, sized for the worker pool
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=max(1, LLM_CONCURRENCY)))
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max(1, LLM_CONCURRENCY)))
+
+# Every Ollama call in the process takes a slot, whichever pool the calling thread belongs to
+_slots = BoundedSemaphore(max(1, LLM_CONCURRENCY))
+
+
+def call_llama3(prompt: str, logger, on_chunk: Optional[Callable[[str], None]] = None):
+    """
+    Send ``prompt`` to Ollama. With ``on_chunk`` the answer is streamed and
+    ``on_chunk`` receives the text received so far after every chunk. At most
+    ``LLM_CONCURRENCY`` calls run at once; the others wait here.
+    """
+    with _slots:
+        return _call_llama3(prompt, logger, on_chunk)
+
+
+def _call_llama3(prompt: str, logger, on_chunk: Optional[Callable[[str], None]]):
+    stream = on_chunk is not None
+    started = time.perf_counter()
+    result = "error"
     try:
-        r = requests.post(
-            "http://localhost:11434/api/chat",
+        r = _session.post(
+            OLLAMA_CHAT_URL,
             json={
-                "model": "llama3",
+                "model": LLAMA3_MODEL,
                 "messages": [{"role": "user", "content": prompt}],
-                "stream": False,
+                "stream": stream,
             },
             timeout=120,
+            stream=stream,
         )
-        try_write_file(os.path.join(PROJECT_TMP_DIR, "llm_last_output_raw_response.txt"), r.text)
         logger.info("✅ Llama3 API status code: %s", r.status_code)
         if r.status_code != 200:
             logger.error("❌ Llama3 API call failed: %s", r.text)
             return None, r.text
-        return r.json(), None
+        if not stream:
+            try_write_file(
+                os.path.join(PROJECT_TMP_DIR, "llm_last_output_raw_response.txt"), r.text
+            )
+            result = "ok"
+            return r.json(), None
+
+        # Streaming answers arrive as one JSON object per line
+        content = ""
+        with r:
+            for line in r.iter_lines():  # Read to the end so the connection is reused
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                content += chunk.get("message", {}).get("content", "")
+                on_chunk(content)
+        try_write_file(os.path.join(PROJECT_TMP_DIR, "llm_last_output_raw_response.txt"), content)
+        result = "ok"
+        return {"message": {"role": "assistant", "content": content}}, None
     except Exception as ex:
         logger.exception("❌ Exception while requesting Llama3 API")
         return None, str(ex)
+    finally:
+        LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, result=result)
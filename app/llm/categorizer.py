@@ -1,32 +1,118 @@
 # app/llm/categorizer.py
 import os
 import logging
-from typing import Dict, Any  # Add this if not already
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional  # Add this if not already
 from .prompt_templates import navigation_and_main_text_prompt
 from .parsing import parse_llm_response_content
-from .api import call_llama3
+from .api import LLAMA3_MODEL, LLM_CONCURRENCY, call_llama3
+from .cache import cache_key, get_llm_cache
+from .chunking import (
+    LLM_MAX_CHUNKS,
+    LLM_TOKEN_BUDGET,
+    clean_page_text,
+    count_tokens,
+    split_into_chunks,
+)
 from .utils import try_write_file, PROJECT_TMP_DIR
-from typing import TypedDict, List
+from typing import List
 
 # Optionally use your existing logger setup
 try:
     from scraper.logging_config import get_logger
+
     logger = get_logger(__name__)
 except ImportError:
     logger = logging.getLogger("llm_categorizer")
     if not logger.handlers:
         handler = logging.StreamHandler()
-        handler.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s"))
+        handler.setFormatter(
+            logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+        )
         logger.addHandler(handler)
         logger.setLevel(logging.INFO)
 
-def categorize_text_with_llama3(page_text: str) -> Dict[str, Any]:
-    prompt = navigation_and_main_text_prompt(page_text)
-    logger.info("📝 Full page text sent to LLM (length: %d)", len(page_text))
-    try_write_file(os.path.join(PROJECT_TMP_DIR, "llm_last_input.txt"), page_text)
-    logger.info("🔎 Sending prompt to Llama3:\n%s", prompt[:1500] + ("..." if len(prompt) > 1500 else ""))
+# Chunks of one long page are categorized in parallel (map), then merged (reduce). The calls
+# share call_llama3's slots with the queue workers, so LLM_CONCURRENCY still bounds Ollama load
+_chunk_executor = ThreadPoolExecutor(
+    max_workers=max(1, LLM_CONCURRENCY), thread_name_prefix="llm-chunk"
+)
+
+
+def categorization_key(page_text: str) -> str:
+    """Cache/queue key for a page text: hash of the model, budget and the cleaned prompt."""
+    return cache_key(
+        f"{LLAMA3_MODEL}:{LLM_TOKEN_BUDGET}:{LLM_MAX_CHUNKS}",
+        navigation_and_main_text_prompt(clean_page_text(page_text)),
+    )
+
+
+def categorize_text_with_llama3(
+    page_text: str, on_chunk: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
+    cache = get_llm_cache()
+    key = categorization_key(page_text)
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info("⚡ LLM cache hit (%s)", cache.stats())
+        return cached
+    return categorize_uncached(page_text, key, on_chunk)
+
+
+def categorize_uncached(
+    page_text: str, key: str, on_chunk: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
+    """Ask the LLM without looking in the cache first; a clean answer is cached under ``key``."""
+    text = clean_page_text(page_text)
+    chunks = split_into_chunks(text, LLM_TOKEN_BUDGET)
+    logger.info(
+        "📝 Page text for LLM: %d chars raw, %d cleaned (~%d tokens, %d chunk(s))",
+        len(page_text),
+        len(text),
+        count_tokens(text),
+        len(chunks),
+    )
+    try_write_file(os.path.join(PROJECT_TMP_DIR, "llm_last_input.txt"), text)
+    if len(chunks) > LLM_MAX_CHUNKS:
+        # Navigation and the intro sit near the top; the tail would only add latency
+        logger.info("✂️ Sending only the first %d of %d chunks", LLM_MAX_CHUNKS, len(chunks))
+        chunks = chunks[:LLM_MAX_CHUNKS]
+
+    if len(chunks) == 1:
+        results = [categorize_chunk(chunks[0], on_chunk)]
+    else:
+        partials = [""] * len(chunks)
+
+        def chunk_progress(i: int) -> Optional[Callable[[str], None]]:
+            if on_chunk is None:
+                return None
 
-    output, error = call_llama3(prompt, logger)
+            def report(partial: str) -> None:
+                partials[i] = partial
+                on_chunk("\n".join(p for p in partials if p))
+
+            return report
+
+        futures = [
+            _chunk_executor.submit(categorize_chunk, chunk, chunk_progress(i))
+            for i, chunk in enumerate(chunks)
+        ]
+        results = [f.result() for f in futures]
+
+    data = merge_categorized(results)
+    if not any("error" in r or "parse_error" in r for r in results):
+        get_llm_cache().put(key, data)  # Only keep answers worth reusing
+    return data
+
+
+def categorize_chunk(text: str, on_chunk: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Ask the LLM for the navigation links and main text of one chunk of page text."""
+    prompt = navigation_and_main_text_prompt(text)
+    logger.debug(
+        "🔎 Sending prompt to Llama3:\n%s", prompt[:1500] + ("..." if len(prompt) > 1500 else "")
+    )
+
+    output, error = call_llama3(prompt, logger, on_chunk)
     if not output:
         return {"error": error}
 
@@ -40,3 +126,23 @@ def categorize_text_with_llama3(page_text: str) -> Dict[str, Any]:
     if "Main text block" not in data:
         data["Main text block"] = ""
     return data
+
+
+def merge_categorized(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reduce per-chunk answers: quick links in page order without repeats, and
+    the first non-empty main text block (it normally sits near the top).
+    Failed chunks are skipped unless every chunk failed.
+    """
+    if len(results) == 1:
+        return results[0]
+    good = [r for r in results if "error" not in r and "parse_error" not in r]
+    if not good:
+        return results[0]
+    links: List[Any] = []
+    for r in good:
+        for link in r.get("Quick-links") or []:
+            if link not in links:
+                links.append(link)
+    main = next((r["Main text block"] for r in good if r.get("Main text block")), "")
+    return {"Quick-links": links, "Main text block": main}
@@ -0,0 +1,75 @@
+# app/llm/chunking.py
+import os
+import re
+from typing import List
+
+LLM_TOKEN_BUDGET = int(os.getenv("LLM_TOKEN_BUDGET", "3000"))  # Page tokens per prompt
+LLM_MAX_CHUNKS = int(os.getenv("LLM_MAX_CHUNKS", "8"))  # Later chunks are not sent at all
+
+# Lines that carry no content for categorization (cookie banners, legal footers, ...)
+BOILERPLATE_RE = re.compile(
+    r"^(©|\(c\)|copyright\b|all rights reserved|privacy policy|terms (of use|and conditions)"
+    r"|cookie|we use cookies|accept( all)?( cookies)?$|skip to (main )?content|back to top"
+    r"|share( this)?( on)?\b|powered by\b)",
+    re.IGNORECASE,
+)
+WORD_RE = re.compile(r"\S+")
+
+
+def clean_page_text(text: str) -> str:
+    """Trim lines, drop blank, boilerplate and repeated lines (first occurrence wins)."""
+    seen = set()
+    kept = []
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if not line or line.lower() in seen or BOILERPLATE_RE.match(line):
+            continue
+        seen.add(line.lower())
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximate llama3 token count without a tokenizer: about four characters
+    per token for English prose, but never fewer tokens than words.
+    """
+    return max(len(text) // 4, len(WORD_RE.findall(text)))
+
+
+def split_into_chunks(text: str, budget: int = LLM_TOKEN_BUDGET) -> List[str]:
+    """Split on line boundaries into chunks of at most ``budget`` tokens each."""
+    if count_tokens(text) <= budget:
+        return [text]
+    chunks: List[str] = []
+    current: List[str] = []
+    used = 0
+    for line in text.splitlines():
+        for piece in _split_line(line, budget):
+            tokens = count_tokens(piece) + 1
+            if current and used + tokens > budget:
+                chunks.append("\n".join(current))
+                current, used = [], 0
+            current.append(piece)
+            used += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _split_line(line: str, budget: int) -> List[str]:
+    """Break a single over-long line into word runs that fit the budget."""
+    if count_tokens(line) < budget:
+        return [line]
+    pieces: List[str] = []
+    words: List[str] = []
+    chars = 0
+    for word in line.split():
+        chars += len(word) + 1
+        if words and max(chars // 4, len(words) + 1) >= budget:
+            pieces.append(" ".join(words))
+            words, chars = [], len(word) + 1
+        words.append(word)
+    if words:
+        pieces.append(" ".join(words))
+    return pieces
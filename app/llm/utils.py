@@ -3,8 +3,12 @@ import os
 import json
 
 PROJECT_TMP_DIR = os.path.join(os.path.dirname(__file__), "..", "tmp")
+LLM_DEBUG_FILES = os.getenv("LLM_DEBUG_FILES", "0") == "1"  # Dump prompts/answers to tmp/
+
 
 def try_write_file(path: str, data, is_json: bool = False):
+    if not LLM_DEBUG_FILES:
+        return
     try:
         if is_json:
             with open(path, "w", encoding="utf-8") as f:
@@ -0,0 +1,114 @@
+# app/llm/worker.py
+import os
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from scraper.logging_config import get_logger
+
+from .api import LLM_CONCURRENCY, LLM_STREAM
+from .cache import get_llm_cache
+from .categorizer import categorization_key, categorize_uncached
+
+logger = get_logger(__name__)
+
+LLM_QUEUE_MAX = int(os.getenv("LLM_QUEUE_MAX", "100"))  # Pages waiting for the LLM at most
+LLM_RECENT_JOBS = 100  # Finished jobs kept for status lookups
+
+
+class CategorizationJob:
+    """One page text being categorized. ``partial`` grows while the answer streams in."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.partial = ""
+        self.future: "Future[Dict[str, Any]]" = Future()
+
+    @property
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        return self.future.result() if self.done else None
+
+
+class CategorizationQueue:
+    """
+    Runs LLM categorization on a small thread pool, off the request path.
+
+    Identical texts share one job while it is in flight, cached answers
+    complete immediately, and at most ``max_pending`` jobs wait at once.
+    """
+
+    def __init__(self, concurrency: int = LLM_CONCURRENCY, max_pending: int = LLM_QUEUE_MAX):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, concurrency), thread_name_prefix="llm"
+        )
+        self._lock = Lock()
+        self._active: Dict[str, CategorizationJob] = {}
+        self._recent: "OrderedDict[str, CategorizationJob]" = OrderedDict()
+
+    def submit(self, page_text: str) -> Optional[CategorizationJob]:
+        """Queue ``page_text`` unless it is cached or already queued. None if the queue is full."""
+        key = categorization_key(page_text)
+        with self._lock:
+            job = self._active.get(key) or self._recent.get(key)
+            if job is not None and "error" not in (job.result() or {}):
+                return job  # In flight or answered; failed jobs are retried
+            job = CategorizationJob(key)
+            cached = get_llm_cache().get(key)
+            if cached is not None:
+                job.future.set_result(cached)
+                self._remember(job)
+                return job
+            if len(self._active) >= self.max_pending:
+                logger.warning("🧠⚠️ LLM queue full (%d jobs), skipping page", len(self._active))
+                return None
+            self._active[key] = job
+        self._executor.submit(self._run, job, page_text)
+        return job
+
+    def get(self, key: str) -> Optional[CategorizationJob]:
+        with self._lock:
+            return self._active.get(key) or self._recent.get(key)
+
+    def _run(self, job: CategorizationJob, page_text: str) -> None:
+        def on_chunk(text: str) -> None:
+            job.partial = text
+
+        try:
+            # submit() already missed the cache for this key; a second lookup would count twice
+            job.future.set_result(
+                categorize_uncached(page_text, job.key, on_chunk if LLM_STREAM else None)
+            )
+        except Exception as e:
+            logger.exception("❌ LLM categorization failed")
+            job.future.set_result({"error": str(e)})
+        finally:
+            with self._lock:
+                self._active.pop(job.key, None)
+                self._remember(job)
+
+    def _remember(self, job: CategorizationJob) -> None:
+        self._recent[job.key] = job
+        self._recent.move_to_end(job.key)
+        while len(self._recent) > LLM_RECENT_JOBS:
+            self._recent.popitem(last=False)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+_queue: Optional[CategorizationQueue] = None
+_queue_lock = Lock()
+
+
+def get_categorization_queue() -> CategorizationQueue:
+    """The process-wide categorization queue."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = CategorizationQueue()
+        return _queue
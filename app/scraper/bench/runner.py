@@ -0,0 +1,226 @@
+# app/scraper/bench/runner.py
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from scraper.bench.site import SiteProcess, SiteSpec
+from scraper.config import CRAWL_WORKERS, SCRAPER_ENGINE
+from scraper.core.base import BaseScraper
+from scraper.core.browser_pool import browser_rss_mb, close_browser_pool
+from scraper.core.metrics import (
+    ASSET_DOWNLOAD_SECONDS,
+    EXTRACTION_SECONDS,
+    NAVIGATION_SECONDS,
+    READINESS_SECONDS,
+    STORAGE_WRITE_SECONDS,
+    THROTTLE_SLEEP_SECONDS,
+    Histogram,
+)
+from scraper.core.progress import CrawlProgress
+from scraper.utils.throttling import PolitenessScheduler
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None  # type: ignore
+
+ENGINES = {
+    "http": "scraper.core.http_scraper:HttpScraper",
+    "playwright": "scraper.core.playwright_scraper:PlaywrightScraper",
+}
+STAGES: Tuple[Histogram, ...] = (
+    NAVIGATION_SECONDS,
+    READINESS_SECONDS,
+    EXTRACTION_SECONDS,
+    ASSET_DOWNLOAD_SECONDS,
+    THROTTLE_SLEEP_SECONDS,
+    STORAGE_WRITE_SECONDS,
+)
+
+
+def load_engine(name: str) -> Type[BaseScraper]:
+    """An engine by short name, or any BaseScraper subclass as ``module:Class``."""
+    module, _, cls = ENGINES.get(name, name).partition(":")
+    engine = getattr(importlib.import_module(module), cls)
+    if not (isinstance(engine, type) and issubclass(engine, BaseScraper)):
+        raise ValueError(f"{name} is not a BaseScraper engine")
+    return engine
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process so far, in MiB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def stage_timings(before: Dict[str, Dict], after: Dict[str, Dict]) -> Dict[str, Dict[str, Any]]:
+    """Per stage and label set: observations, total and mean seconds during the run."""
+    stages: Dict[str, Dict[str, Any]] = {}
+    for stage in STAGES:
+        for labels, (total, count) in after[stage.name].items():
+            old_total, old_count = before[stage.name].get(labels, (0.0, 0))
+            if count == old_count:
+                continue
+            key = ",".join(f"{n}={v}" for n, v in zip(stage.labelnames, labels)) or "all"
+            seconds = total - old_total
+            stages.setdefault(stage.name, {})[key] = {
+                "count": count - old_count,
+                "seconds": round(seconds, 4),
+                "mean_ms": round(seconds / (count - old_count) * 1000, 2),
+            }
+    return stages
+
+
+async def run_benchmark(
+    engine: Type[BaseScraper],
+    url: str,
+    max_pages: int,
+    workers: int = CRAWL_WORKERS,
+    polite: bool = False,
+) -> Dict[str, Any]:
+    """Crawl ``url`` once with ``engine`` and measure it."""
+    scraper = engine(max_pages=max_pages, workers=workers)
+    if not polite:
+        # Measure the crawler, not the politeness delays (429 backoff still applies)
+        scraper.scheduler = PolitenessScheduler(start_delay=0.0, min_delay=0.0)
+    reports: List[CrawlProgress] = []
+    browser_peak = 0.0
+
+    async def sample_browser_rss() -> None:
+        nonlocal browser_peak
+        while True:
+            browser_peak = max(browser_peak, browser_rss_mb() or 0.0)
+            await asyncio.sleep(0.5)
+
+    before = {stage.name: stage.totals() for stage in STAGES}
+    sampler = asyncio.create_task(sample_browser_rss())
+    started = time.perf_counter()
+    try:
+        await scraper.crawl(
+            url, status_key="bench", status_callback=lambda _k, p: reports.append(p)
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        sampler.cancel()
+        await close_browser_pool()
+    after = {stage.name: stage.totals() for stage in STAGES}
+
+    last = reports[-1] if reports else CrawlProgress()
+    rss = peak_rss_mb()
+    return {
+        "engine": f"{engine.__module__}:{engine.__name__}",
+        "workers": workers,
+        "polite": polite,
+        "seconds": round(elapsed, 3),
+        "pages": last.pages,
+        "errors": last.errors,
+        "images": last.images,
+        "files": last.files,
+        "stored_bytes": last.bytes,
+        "pages_per_s": round(last.pages / elapsed, 2) if elapsed else None,
+        "stored_bytes_per_s": round(last.bytes / elapsed) if elapsed else None,
+        "peak_rss_mb": round(rss, 1) if rss is not None else None,
+        "peak_browser_rss_mb": round(browser_peak, 1) if browser_peak else None,
+        "stages": stage_timings(before, after),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(
+        description="Benchmark a crawl engine against a synthetic local site (no network)"
+    )
+    parser.add_argument(
+        "--engine",
+        default=SCRAPER_ENGINE,
+        help=f"{' | '.join(ENGINES)} or any BaseScraper subclass as module:Class",
+    )
+    parser.add_argument("--pages", type=int, default=200, help="Pages on the synthetic site")
+    parser.add_argument("--max-pages", type=int, help="Crawl budget (default: every page)")
+    parser.add_argument("--fanout", type=int, default=5, help="Links per page")
+    parser.add_argument("--images", type=int, default=2, help="Images per page")
+    parser.add_argument("--documents", type=int, default=1, help="PDF links per page")
+    parser.add_argument("--text-bytes", type=int, default=2000, help="Visible text per page")
+    parser.add_argument("--asset-bytes", type=int, default=20000, help="Size of each asset")
+    parser.add_argument("--slow-ratio", type=float, default=0.0, help="Share of slow pages")
+    parser.add_argument("--slow-ms", type=int, default=500, help="Delay of a slow page")
+    parser.add_argument(
+        "--throttle-ratio", type=float, default=0.0, help="Share of pages answering 429 once"
+    )
+    parser.add_argument("--js-ratio", type=float, default=0.0, help="Share of JavaScript pages")
+    parser.add_argument(
+        "--duplicate-ratio", type=float, default=0.0, help="Share of pages copying another's text"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Site layout seed")
+    parser.add_argument("--workers", type=int, default=CRAWL_WORKERS, help="Page workers")
+    parser.add_argument(
+        "--polite", action="store_true", help="Keep the configured per-host politeness delays"
+    )
+    parser.add_argument("--out", help="Also write the JSON report to this file")
+    parser.add_argument(
+        "--keep", action="store_true", help="Keep the crawl output instead of deleting it"
+    )
+    args = parser.parse_args(argv)
+
+    spec = SiteSpec(
+        pages=args.pages,
+        fanout=args.fanout,
+        images=args.images,
+        documents=args.documents,
+        text_bytes=args.text_bytes,
+        asset_bytes=args.asset_bytes,
+        slow_ratio=args.slow_ratio,
+        slow_ms=args.slow_ms,
+        throttle_ratio=args.throttle_ratio,
+        js_ratio=args.js_ratio,
+        duplicate_ratio=args.duplicate_ratio,
+        seed=args.seed,
+    )
+    engine = load_engine(args.engine)
+    out = os.path.abspath(args.out) if args.out else None
+
+    # Crawl output lands in ./extracted_data, so every run starts from an empty directory
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="scraper-bench-")
+    os.chdir(workdir)
+    try:
+        with SiteProcess(spec) as site:
+            result = asyncio.run(
+                run_benchmark(
+                    engine,
+                    site.url,
+                    max_pages=args.max_pages or spec.pages,
+                    workers=args.workers,
+                    polite=args.polite,
+                )
+            )
+        served = site.stats
+        result["site"] = {**spec._asdict(), "served": served}
+        result["served_bytes_per_s"] = (
+            round(served["bytes"] / result["seconds"]) if result["seconds"] else None
+        )
+    finally:
+        os.chdir(cwd)
+        if args.keep:
+            print(f"Crawl output kept in {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = json.dumps(result, indent=2)
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    print(report)
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# app/scraper/bench/site.py
+import asyncio
+import json
+import multiprocessing
+import random
+from multiprocessing.connection import Connection
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from aiohttp import web
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud"
+).split()
+
+
+class SiteSpec(NamedTuple):
+    """Shape of a synthetic benchmark site. The same spec always builds the same site."""
+
+    pages: int = 200
+    fanout: int = 5  # Links from each page to other pages
+    images: int = 2  # Images per page
+    documents: int = 1  # PDF links per page
+    text_bytes: int = 2000  # Visible text per page
+    asset_bytes: int = 20000  # Size of each image / document
+    slow_ratio: float = 0.0  # Share of pages answered after ``slow_ms``
+    slow_ms: int = 500
+    throttle_ratio: float = 0.0  # Share of pages answered 429 on their first request
+    retry_after: int = 1  # Retry-After seconds sent with a 429
+    js_ratio: float = 0.0  # Share of pages that only render with JavaScript
+    duplicate_ratio: float = 0.0  # Share of pages repeating another page's text
+    seed: int = 0
+
+
+class SyntheticSite:
+    """
+    A deterministic local site for benchmarks: ``/page/<n>`` pages linked in
+    a ring plus ``fanout - 1`` random links each, with per-page images and
+    documents, optional slow pages, 429 responses, JavaScript-only pages and
+    pages whose text duplicates another page.
+    ``stats`` counts what was served.
+    """
+
+    def __init__(self, spec: SiteSpec):
+        self.spec = spec
+        rng = random.Random(spec.seed)
+        n = max(1, spec.pages)
+        self.links: List[List[int]] = [
+            [(i + 1) % n] + [rng.randrange(n) for _ in range(max(0, spec.fanout - 1))]
+            for i in range(n)
+        ]
+        self.slow: Set[int] = {i for i in range(n) if rng.random() < spec.slow_ratio}
+        self.throttled: Set[int] = {i for i in range(1, n) if rng.random() < spec.throttle_ratio}
+        self.js_only: Set[int] = {i for i in range(1, n) if rng.random() < spec.js_ratio}
+        self.copies: Dict[int, int] = {}  # page → the original whose text it repeats
+        for i in range(1, n):
+            if rng.random() < spec.duplicate_ratio:
+                original = rng.randrange(i)
+                self.copies[i] = self.copies.get(original, original)
+        self.stats: Dict[str, int] = {"requests": 0, "bytes": 0, "pages": 0, "assets": 0}
+        self.stats.update({"throttled": 0, "slow": 0, "not_found": 0})
+        self._runner: Optional[web.AppRunner] = None
+
+    def page_text(self, n: int) -> str:
+        """Visible text of page ``n``: its own words, or the page it copies."""
+        rng = random.Random(f"{self.spec.seed}-{self.copies.get(n, n)}")
+        return " ".join(rng.choice(WORDS) for _ in range(self.spec.text_bytes // 6 + 1))
+
+    def page_html(self, n: int) -> str:
+        links = "".join(f'<a href="/page/{j}">Page {j}</a> ' for j in self.links[n])
+        images = "".join(f'<img src="/img/{n}-{k}.png"> ' for k in range(self.spec.images))
+        docs = "".join(
+            f'<a href="/doc/{n}-{k}.pdf">Doc {k}</a> ' for k in range(self.spec.documents)
+        )
+        text = self.page_text(n)
+        if n in self.js_only:
+            return (
+                f'<html><head><title>Page {n}</title></head><body><div id="root"></div>'
+                f"<script>document.getElementById('root').innerHTML = "
+                f"{json.dumps(f'<h1>Page {n}</h1><p>{text}</p>' + links + images + docs)};"
+                "</script></body></html>"
+            )
+        return (
+            f"<html><head><title>Page {n}</title></head><body><h1>Page {n}</h1>"
+            f"<p>{text}</p><nav>{links}</nav>{images}{docs}</body></html>"
+        )
+
+    def asset_body(self, name: str) -> bytes:
+        # Unique per URL, so the content-addressed store keeps every asset
+        prefix = name.encode("utf-8") + b"\n"
+        return prefix + b"\0" * max(0, self.spec.asset_bytes - len(prefix))
+
+    def _sent(self, kind: str, response: web.Response) -> web.Response:
+        self.stats["requests"] += 1
+        self.stats[kind] += 1
+        self.stats["bytes"] += len(response.body or b"")
+        return response
+
+    async def _page(self, request: web.Request) -> web.Response:
+        n = int(request.match_info.get("n", 0))
+        if not 0 <= n < len(self.links):
+            return self._sent("not_found", web.Response(status=404))
+        if n in self.throttled:
+            self.throttled.discard(n)  # Later requests for the page succeed
+            return self._sent(
+                "throttled",
+                web.Response(status=429, headers={"Retry-After": str(self.spec.retry_after)}),
+            )
+        if n in self.slow:
+            self.stats["slow"] += 1
+            await asyncio.sleep(self.spec.slow_ms / 1000)
+        return self._sent("pages", web.Response(text=self.page_html(n), content_type="text/html"))
+
+    async def _asset(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        content_type = "application/pdf" if name.endswith(".pdf") else "image/png"
+        return self._sent(
+            "assets", web.Response(body=self.asset_body(name), content_type=content_type)
+        )
+
+    async def _not_found(self, request: web.Request) -> web.Response:
+        return self._sent("not_found", web.Response(status=404))
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/", self._page)
+        app.router.add_get("/page/{n:\\d+}", self._page)
+        app.router.add_get("/img/{name}", self._asset)
+        app.router.add_get("/doc/{name}", self._asset)
+        app.router.add_get("/{tail:.*}", self._not_found)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve the site; returns its base URL (``port=0`` picks a free port)."""
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound = self._runner.addresses[0][1]
+        return f"http://{host}:{bound}/"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def _serve(spec: SiteSpec, conn: Connection) -> None:
+    """Process entry: serve until the parent asks for the stats."""
+
+    async def main() -> None:
+        site = SyntheticSite(spec)
+        conn.send(await site.start())
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, conn.recv)
+        await site.stop()
+        conn.send(site.stats)
+
+    asyncio.run(main())
+
+
+class SiteProcess:
+    """
+    Runs a SyntheticSite in its own process, so serving it does not compete
+    with the crawler for the event loop or count towards its memory.
+    """
+
+    def __init__(self, spec: SiteSpec):
+        self.spec = spec
+        self.url = ""
+        self.stats: Dict[str, int] = {}
+        self._conn: Optional[Connection] = None
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+
+    def __enter__(self) -> "SiteProcess":
+        self._conn, child = multiprocessing.get_context("spawn").Pipe()
+        self._process = multiprocessing.get_context("spawn").Process(
+            target=_serve, args=(self.spec, child), daemon=True
+        )
+        self._process.start()
+        self.url = self._conn.recv()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        assert self._conn is not None and self._process is not None
+        self._conn.send("stop")
+        self.stats = self._conn.recv()
+        self._process.join(timeout=10)
@@ -2,13 +2,37 @@
 import argparse
 import asyncio
 
-from scraper.config import SCRAPER_CLS
+from scraper.config import (
+    CRAWL_SHARDS,
+    CRAWL_WORKERS,
+    FRONTIER_MAX_DEPTH,
+    FRONTIER_STRATEGY,
+    SCRAPER_CLS,
+)
+from scraper.core.browser_pool import close_browser_pool
+from scraper.core.frontier import STRATEGIES
+from scraper.core.sharding import ShardedCrawl
 from scraper.utils.url_utils import format_url, is_valid_url  # NEW: import
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Web Scraper CLI")
     parser.add_argument("url", help="URL to start scraping")
     parser.add_argument("--max-pages", type=int, default=50, help="Max pages to crawl")
+    parser.add_argument(
+        "--workers", type=int, default=CRAWL_WORKERS, help="Concurrent page workers"
+    )
+    parser.add_argument(
+        "--strategy", choices=STRATEGIES, default=FRONTIER_STRATEGY, help="Frontier ordering"
+    )
+    parser.add_argument(
+        "--max-depth", type=int, default=FRONTIER_MAX_DEPTH, help="Max link depth to follow"
+    )
+    parser.add_argument(
+        "--resume", action="store_true", help="Continue an unfinished crawl of this URL"
+    )
+    parser.add_argument(
+        "--shards", type=int, default=CRAWL_SHARDS, help="Worker processes to spread the crawl over"
+    )
 
     args = parser.parse_args()
     url = args.url.strip()
@@ -16,5 +40,20 @@ if __name__ == "__main__":
         print("ERROR: Please enter a valid URL (e.g., example.com or https://example.com).")
         exit(1)
     url = format_url(url)
-    scraper = SCRAPER_CLS(max_pages=args.max_pages)
-    asyncio.run(scraper.crawl(url))
+    options = dict(
+        max_pages=args.max_pages,
+        workers=args.workers,
+        strategy=args.strategy,
+        max_depth=args.max_depth,
+    )
+    scraper = (
+        ShardedCrawl(shards=args.shards, **options) if args.shards > 1 else SCRAPER_CLS(**options)
+    )
+
+    async def main() -> None:
+        try:
+            await scraper.crawl(url, resume=args.resume)
+        finally:
+            await close_browser_pool()
+
+    asyncio.run(main())
@@ -1,12 +1,124 @@
 # app/scraper/config.py
 import os
 
-from scraper.core.playwright_scraper import PlaywrightScraper
-
 MAX_PAGES = 50
 HEADLESS_MODE = os.getenv("USE_HEADLESS", "1") == "1"
-TIMEOUT = 20000  # 20 seconds
+TIMEOUT = 20000  # 20 seconds, page navigation / fetch timeout
 PROXY_RETRY_ATTEMPTS = 3
 USER_AGENT_POOL_SIZE = 20
+CHECKPOINT_EVERY = int(os.getenv("CHECKPOINT_EVERY", "5"))  # Pages between crawl checkpoints
+PROGRESS_TTL_SECONDS = int(os.getenv("PROGRESS_TTL_SECONDS", "3600"))  # Idle crawl status lifetime
+PROGRESS_MAX_TASKS = int(os.getenv("PROGRESS_MAX_TASKS", "200"))  # Crawl statuses kept in memory
+
+# Crawl job scheduler (web app)
+CRAWL_MAX_JOBS = int(os.getenv("CRAWL_MAX_JOBS", "2"))  # Crawls running at once
+CRAWL_QUEUE_MAX = int(os.getenv("CRAWL_QUEUE_MAX", "20"))  # Crawls waiting; more are rejected
+CRAWL_MAX_JOBS_PER_USER = int(os.getenv("CRAWL_MAX_JOBS_PER_USER", "3"))  # Queued plus running
+CRAWL_MAX_JOBS_PER_DOMAIN = int(os.getenv("CRAWL_MAX_JOBS_PER_DOMAIN", "1"))  # Running at once
+CRAWL_SHARDS = int(os.getenv("CRAWL_SHARDS", "1"))  # Worker processes per crawl (1 = in-process)
+
+# Page archive: text, HTML and headers in compressed append-only segments (.archive)
+ARCHIVE_SEGMENT_MB = int(os.getenv("ARCHIVE_SEGMENT_MB", "64"))  # Start a new segment past this
+ARCHIVE_BATCH = 64  # Records compressed and indexed per write
+ARCHIVE_QUEUE_MAX = 1024  # Records waiting for the writer before crawl workers wait too
+ARCHIVE_COMPRESSION = 6  # gzip level
+ARCHIVE_HTML = os.getenv("ARCHIVE_HTML", "1") == "1"  # Keep the (rendered) HTML next to the text
+
+# Engine: "http" fetches static HTML and renders only JavaScript pages in a browser,
+# "playwright" renders every page.
+SCRAPER_ENGINE = os.getenv("SCRAPER_ENGINE", "http")
+JS_MIN_TEXT_CHARS = 200  # Less visible text than this means the page needs rendering
+
+# Concurrency
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", "4"))  # Pages open at once per crawl
+PER_HOST_CONCURRENCY = int(os.getenv("PER_HOST_CONCURRENCY", "2"))  # Pages open at once per host
+
+# Frontier
+FRONTIER_STRATEGY = os.getenv("FRONTIER_STRATEGY", "bfs")  # bfs | dfs | priority
+FRONTIER_MAX_DEPTH = int(os.getenv("FRONTIER_MAX_DEPTH", "0")) or None  # 0 = unlimited
+FRONTIER_MEMORY_ITEMS = int(os.getenv("FRONTIER_MEMORY_ITEMS", "100000"))  # More spill to disk
+
+# robots.txt and sitemaps
+ROBOTS_ENABLED = os.getenv("ROBOTS_ENABLED", "1") == "1"  # Skip disallowed pages, obey Crawl-delay
+ROBOTS_USER_AGENT = os.getenv("ROBOTS_USER_AGENT", "*")  # Token matched against User-agent groups
+ROBOTS_CACHE_SECONDS = 3600  # robots.txt is refetched per host after this
+ROBOTS_ERROR_SECONDS = 60  # A 5xx / unreachable robots.txt blocks the host this long, then retries
+ROBOTS_ATTEMPTS = 3  # Fetches of an unavailable start-host robots.txt before the crawl fails
+ROBOTS_MAX_BYTES = 512 * 1024  # Larger robots.txt files are cut off
+SITEMAP_SEED = os.getenv("SITEMAP_SEED", "1") == "1"  # Queue sitemap URLs when a crawl starts
+SITEMAP_MAX_URLS = int(os.getenv("SITEMAP_MAX_URLS", "100000"))  # Seeds per crawl, ≤ max_pages
+SITEMAP_MAX_FILES = 50  # Sitemaps (including index children) fetched per crawl
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024  # Uncompressed size cap per sitemap (the protocol's limit)
+SITEMAP_POLL_SECONDS = 0.5  # How often a crawl checks its page budget while sitemaps load
+
+# Near-duplicate pages (SimHash of the page text): duplicates are linked to the first copy
+NEAR_DUP_ENABLED = os.getenv("NEAR_DUP_ENABLED", "1") == "1"
+NEAR_DUP_DISTANCE = int(os.getenv("NEAR_DUP_DISTANCE", "3"))  # Differing bits (of 64) still a dup
+NEAR_DUP_SHINGLE = 3  # Words per fingerprint feature
+NEAR_DUP_MIN_WORDS = 50  # Shorter pages only match exact duplicates
+
+# Assets stored (or revalidated) more recently than this are reused without a request;
+# older ones are revalidated with If-None-Match / If-Modified-Since.
+ASSET_FRESH_SECONDS = int(os.getenv("ASSET_FRESH_SECONDS", "3600"))
+
+# Asset downloads
+DOWNLOAD_MAX_BYTES = int(os.getenv("DOWNLOAD_MAX_BYTES", str(200 * 1024 * 1024)))  # Larger: refused
+DOWNLOAD_CHUNK_BYTES = 256 * 1024  # Bytes buffered per disk write
+DOWNLOAD_CONNECT_TIMEOUT = float(os.getenv("DOWNLOAD_CONNECT_TIMEOUT", "10"))  # Seconds
+DOWNLOAD_READ_TIMEOUT = float(os.getenv("DOWNLOAD_READ_TIMEOUT", "30"))  # Longest silence mid-body
+DOWNLOAD_RESUMES = 2  # Range requests continuing a dropped download
+# Content-Type prefixes accepted per asset kind (a missing Content-Type is accepted)
+ASSET_CONTENT_TYPES = {
+    "images": ("image/", "application/octet-stream", "binary/octet-stream"),
+    "files": ("application/", "text/plain", "text/csv", "binary/"),
+}
+
+# Browser pool (kept warm across crawls)
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))  # Warm browsers
+BROWSER_CONTEXTS_PER_BROWSER = 4  # Crawls sharing one browser at once
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "500"))  # Recycle after this many pages
+BROWSER_MAX_RSS_MB = int(os.getenv("BROWSER_MAX_RSS_MB", "1024"))  # Recycle above this (psutil)
+
+# Per-host politeness (AIMD): delay shrinks by a step on success, doubles on 429/503/5xx
+THROTTLE_START_DELAY = float(os.getenv("THROTTLE_START_DELAY", "1.0"))  # Seconds between pages
+THROTTLE_MIN_DELAY = float(os.getenv("THROTTLE_MIN_DELAY", "0.25"))
+THROTTLE_MAX_DELAY = 60.0
+THROTTLE_DECREASE_STEP = 0.1
+PAGE_RETRIES = int(os.getenv("PAGE_RETRIES", "3"))  # Re-queues of a 429/5xx page before an error
+
+# Page readiness: domcontentloaded | load | networkidle | quiescence | selector
+READINESS_STRATEGY = os.getenv("READINESS_STRATEGY", "quiescence")
+READY_SELECTOR = os.getenv("READY_SELECTOR", "main, #content, body")  # For "selector"
+READY_QUIET_MS = 500  # DOM must be mutation-free this long for "quiescence"
+READY_MAX_MS = 5000  # Hard cap on waiting after navigation
+
+# Browser request interception
+BLOCKED_RESOURCE_TYPES = os.getenv("BLOCKED_RESOURCE_TYPES", "font,media").split(",")
+BLOCKED_URL_HOSTS = os.getenv(
+    "BLOCKED_URL_HOSTS",
+    "google-analytics.com,googletagmanager.com,doubleclick.net,facebook.net,"
+    "hotjar.com,segment.io,mixpanel.com,clarity.ms,newrelic.com,nr-data.net",
+).split(",")
+CAPTURE_BROWSER_ASSETS = os.getenv("CAPTURE_BROWSER_ASSETS", "1") == "1"  # Reuse browser bytes
+CAPTURE_MAX_BYTES = 10 * 1024 * 1024  # Larger responses are downloaded separately
+
+# Pooled HTTP client (asset downloads)
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "32"))  # Open connections in total
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "6"))
+HTTP_MAX_IN_FLIGHT = int(os.getenv("HTTP_MAX_IN_FLIGHT", "16"))  # Concurrent requests in total
+HTTP_DNS_TTL = 300  # Seconds to cache DNS answers
+HTTP_KEEPALIVE_TIMEOUT = 30  # Seconds to keep idle connections open
+
+
+def __getattr__(name: str):
+    # Engines read the settings above at import time, so the engine class is
+    # resolved lazily to keep this module free of circular imports.
+    if name == "SCRAPER_CLS":
+        if SCRAPER_ENGINE == "playwright":
+            from scraper.core.playwright_scraper import PlaywrightScraper
+
+            return PlaywrightScraper
+        from scraper.core.http_scraper import HttpScraper
 
-SCRAPER_CLS = PlaywrightScraper
+        return HttpScraper
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,333 @@
+import atexit
+import gzip
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from threading import Lock
+from typing import BinaryIO, Dict, List, NamedTuple, Optional, Union
+
+from scraper.config import (
+    ARCHIVE_BATCH,
+    ARCHIVE_COMPRESSION,
+    ARCHIVE_QUEUE_MAX,
+    ARCHIVE_SEGMENT_MB,
+)
+from scraper.core.metrics import STORAGE_WRITE_BYTES, STORAGE_WRITE_SECONDS
+from scraper.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    url TEXT PRIMARY KEY,
+    domain TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    fetched REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_by_domain ON records (domain, fetched);
+CREATE TABLE IF NOT EXISTS duplicates (
+    url TEXT PRIMARY KEY,
+    domain TEXT NOT NULL,
+    canonical TEXT NOT NULL,
+    distance INTEGER NOT NULL
+);
+"""
+
+
+class PageRecord(NamedTuple):
+    """One archived page."""
+
+    url: str
+    domain: str
+    text: str
+    html: Optional[str] = None
+    status: Optional[int] = None
+    headers: Dict[str, str] = {}
+    fetched: float = 0.0  # Unix time the page was archived
+
+
+class DuplicateLink(NamedTuple):
+    """A page whose text (nearly) matches an archived page, stored as a link to it."""
+
+    url: str
+    domain: str
+    canonical: str
+    distance: int = 0  # Differing SimHash bits
+
+
+def encode_record(record: PageRecord) -> bytes:
+    """A WARC-style record: WARC headers, then the page as a JSON payload."""
+    payload = json.dumps(record._asdict(), ensure_ascii=False).encode("utf-8")
+    head = (
+        "WARC/1.1\r\n"
+        "WARC-Type: resource\r\n"
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+        f"WARC-Date: {time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(record.fetched))}\r\n"
+        f"WARC-Target-URI: {record.url}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n"
+    )
+    return head.encode("utf-8") + payload + b"\r\n\r\n"
+
+
+def decode_record(data: bytes) -> PageRecord:
+    head, _, rest = data.partition(b"\r\n\r\n")
+    fields = dict(
+        line.split(": ", 1) for line in head.decode("utf-8").split("\r\n")[1:] if ": " in line
+    )
+    payload = rest[: int(fields["Content-Length"])]
+    return PageRecord(**json.loads(payload.decode("utf-8")))
+
+
+class PageArchive:
+    """
+    Page text, HTML and headers in compressed, append-only segment files.
+
+    Each record is its own gzip member (as in ``.warc.gz``), so one page can
+    be read back from its offset without touching the rest of the segment.
+    ``append`` only queues the record (waiting only while ``queue_max``
+    records are already queued): a background thread compresses and writes
+    queued records in batches, rotates segments past ``segment_bytes``
+    and indexes url → (segment, offset, length) in SQLite. Segment names carry
+    the writer's pid, so sharded crawl processes can share one archive.
+    Near-duplicate pages are stored only as a link to their canonical page.
+    """
+
+    def __init__(
+        self,
+        base_dir: Path,
+        segment_bytes: int = ARCHIVE_SEGMENT_MB * 1024 * 1024,
+        batch: int = ARCHIVE_BATCH,
+        compression: int = ARCHIVE_COMPRESSION,
+        queue_max: int = ARCHIVE_QUEUE_MAX,
+    ):
+        self.base_dir = base_dir
+        self.root = base_dir / ".archive"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.batch = max(1, batch)
+        self.compression = compression
+        self._lock = Lock()
+        self._db = sqlite3.connect(
+            str(self.root / "index.sqlite"), timeout=30, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._queue: "queue.Queue[Union[PageRecord, DuplicateLink, threading.Event, None]]" = (
+            queue.Queue(maxsize=max(1, queue_max))
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._segment: Optional[str] = None
+        self._segment_file: Optional[BinaryIO] = None
+        self._segment_size = 0
+        self._segment_seq = 0
+
+    # --- Writer side ---
+
+    def append(self, record: PageRecord, block: bool = True) -> bool:
+        """
+        Queue a page for writing; never waits on disk, only for room in the
+        queue. With ``block=False`` a full queue returns False instead.
+        """
+        return self._put(record._replace(fetched=record.fetched or time.time()), block)
+
+    def link_duplicate(self, link: DuplicateLink, block: bool = True) -> bool:
+        """Queue a duplicate → canonical link; ``get`` of the duplicate returns the canonical."""
+        return self._put(link, block)
+
+    def _put(self, item: Union[PageRecord, DuplicateLink], block: bool) -> bool:
+        self._start()
+        try:
+            self._queue.put(item, block)
+        except queue.Full:
+            return False
+        return True
+
+    def _start(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="page-archive", daemon=True
+                    )
+                    self._thread.start()
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until every record queued so far is written and indexed."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._segment_file = None
+
+    def _run(self) -> None:
+        while True:
+            items = [self._queue.get()]
+            while len(items) < self.batch:  # Whatever piled up while the last batch was written
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [i for i in items if isinstance(i, PageRecord)]
+            links = [i for i in items if isinstance(i, DuplicateLink)]
+            if records or links:
+                try:
+                    self._write(records, links)
+                except Exception as e:
+                    logger.error(
+                        f"🗄️❌ Could not archive {len(records) + len(links)} pages: {e}",
+                        exc_info=True,
+                    )
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in items:
+                return
+
+    def _write(self, records: List[PageRecord], links: List[DuplicateLink]) -> None:
+        started = time.perf_counter()
+        rows = []
+        written = 0
+        for record in records:
+            data = gzip.compress(encode_record(record), compresslevel=self.compression)
+            if self._segment is None or (
+                self._segment_size and self._segment_size + len(data) > self.segment_bytes
+            ):
+                self._rotate()
+            assert self._segment_file is not None
+            self._segment_file.write(data)
+            rows.append(
+                (
+                    record.url,
+                    record.domain,
+                    self._segment,
+                    self._segment_size,
+                    len(data),
+                    record.fetched,
+                )
+            )
+            self._segment_size += len(data)
+            written += len(data)
+        if self._segment_file is not None:
+            self._segment_file.flush()  # Readers only find records once the bytes are on disk
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO records (url, domain, segment, offset, length, fetched) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            # A URL is either archived or linked; the newest crawl decides which
+            self._db.executemany("DELETE FROM duplicates WHERE url = ?", [(r[0],) for r in rows])
+            self._db.executemany(
+                "DELETE FROM records WHERE url = ?", [(link.url,) for link in links]
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO duplicates (url, domain, canonical, distance) "
+                "VALUES (?, ?, ?, ?)",
+                links,
+            )
+        STORAGE_WRITE_SECONDS.observe(time.perf_counter() - started, kind="archive")
+        STORAGE_WRITE_BYTES.inc(written, kind="archive")
+
+    def _rotate(self) -> None:
+        if self._segment_file is not None:
+            self._segment_file.close()
+        self._segment_seq += 1
+        self._segment = f"{int(time.time())}-{os.getpid()}-{self._segment_seq:05d}.warc.gz"
+        self._segment_file = open(self.root / self._segment, "ab")
+        self._segment_size = self._segment_file.seek(0, os.SEEK_END)
+        logger.info(f"🗄️ Starting archive segment {self._segment}")
+
+    # --- Reader side ---
+
+    def get(self, url: str) -> Optional[PageRecord]:
+        """The latest archived copy of ``url`` (of its canonical page for a duplicate)."""
+        url = self.canonical(url) or url
+        with self._lock:
+            row = self._db.execute(
+                "SELECT segment, offset, length FROM records WHERE url = ?", (url,)
+            ).fetchone()
+        return self._read(*row) if row else None
+
+    def canonical(self, url: str) -> Optional[str]:
+        """The page ``url`` was found to duplicate, if it was."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT canonical FROM duplicates WHERE url = ?", (url,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def duplicates(self, domain: str) -> Dict[str, str]:
+        """Duplicate → canonical URL links of a domain."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, canonical FROM duplicates WHERE domain = ?", (domain,)
+            ).fetchall()
+        return dict(rows)
+
+    def urls(self, domain: str) -> List[str]:
+        """Archived page URLs of a domain, oldest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url FROM records WHERE domain = ? ORDER BY fetched", (domain,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def latest(self, domain: str) -> Optional[PageRecord]:
+        """The most recently archived page of a domain."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT segment, offset, length FROM records WHERE domain = ? "
+                "ORDER BY fetched DESC LIMIT 1",
+                (domain,),
+            ).fetchone()
+        return self._read(*row) if row else None
+
+    def domains(self) -> List[str]:
+        with self._lock:
+            rows = self._db.execute("SELECT DISTINCT domain FROM records").fetchall()
+        return sorted(r[0] for r in rows)
+
+    def _read(self, segment: str, offset: int, length: int) -> PageRecord:
+        with open(self.root / segment, "rb") as f:
+            f.seek(offset)
+            return decode_record(gzip.decompress(f.read(length)))
+
+
+_archives: Dict[Path, PageArchive] = {}
+_archives_lock = Lock()
+
+
+def get_page_archive(base_dir: Path) -> PageArchive:
+    """The process-wide archive rooted in ``base_dir``; each one stays open until exit."""
+    with _archives_lock:
+        archive = _archives.get(base_dir)
+        if archive is None:
+            archive = _archives[base_dir] = PageArchive(base_dir)
+        return archive
+
+
+@atexit.register
+def close_archives() -> None:
+    """Write out and close every open archive."""
+    with _archives_lock:
+        archives = list(_archives.values())
+        _archives.clear()
+    for archive in archives:
+        archive.close()
@@ -0,0 +1,181 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from threading import Lock
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+
+from scraper.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    fetched REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS names (
+    domain TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (domain, kind, name)
+);
+CREATE INDEX IF NOT EXISTS names_by_digest ON names (domain, kind, digest);
+"""
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class AssetStore:
+    """
+    Content-addressed storage for downloaded images and files.
+
+    Bytes are stored once per SHA-256 digest under ``root`` and indexed in
+    SQLite (URL → digest, and per-domain logical name → digest). The files a
+    user browses in ``<domain>/images`` and ``<domain>/files`` are hard links
+    to the blobs, so identical assets cost disk space once across pages,
+    crawls and domains. A name already taken by different bytes gets the
+    digest appended, so names never collide.
+    """
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = base_dir
+        self.root = base_dir / ".blobs"
+        self.tmp_dir = self.root / "tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._db = sqlite3.connect(str(self.root / "index.sqlite"), check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:]
+
+    def temp_path(self) -> Path:
+        """A fresh path in the store's temp dir to download into before ingesting."""
+        return self.tmp_dir / uuid.uuid4().hex
+
+    def ingest_file(self, url: str, tmp_path: Path) -> str:
+        """Move a downloaded temp file into the store (or drop it if the bytes are known)."""
+        digest = sha256_file(tmp_path)
+        blob = self.blob_path(digest)
+        if blob.exists():
+            tmp_path.unlink()
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, blob)
+        self._record(url, digest, blob.stat().st_size)
+        return digest
+
+    def ingest_bytes(self, url: str, body: bytes) -> str:
+        digest = hashlib.sha256(body).hexdigest()
+        blob = self.blob_path(digest)
+        if not blob.exists():
+            tmp_path = self.temp_path()
+            tmp_path.write_bytes(body)
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, blob)
+        self._record(url, digest, len(body))
+        return digest
+
+    def _record(self, url: str, digest: str, size: int) -> None:
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO blobs (digest, size, created) VALUES (?, ?, ?)",
+                (digest, size, now),
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO urls (url, digest, fetched) VALUES (?, ?, ?)",
+                (url, digest, now),
+            )
+
+    def size_of(self, url: str) -> int:
+        """Size in bytes of the blob last stored for ``url`` (0 if unknown)."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT b.size FROM urls u JOIN blobs b ON b.digest = u.digest WHERE u.url = ?",
+                (url,),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def total_size(self, urls: List[str]) -> int:
+        """Bytes of the blobs last stored for ``urls``, 500 URLs per query."""
+        total = 0
+        with self._lock:
+            for start in range(0, len(urls), 500):  # SQLite caps the number of parameters
+                end = start + 500
+                chunk = urls[start:end]
+                row = self._db.execute(
+                    "SELECT SUM(b.size) FROM urls u JOIN blobs b ON b.digest = u.digest "
+                    f"WHERE u.url IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchone()
+                total += row[0] or 0
+        return total
+
+    def link(self, domain: str, kind: str, url: str, digest: str) -> Tuple[Path, bool]:
+        """
+        Give ``digest`` a logical name in ``<domain>/<kind>``.
+        Returns the path and whether it is new (False if these bytes were already there).
+        """
+        folder = self.base_dir / domain / kind
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT name FROM names WHERE domain = ? AND kind = ? AND digest = ?",
+                (domain, kind, digest),
+            ).fetchone()
+            if row and (folder / row[0]).exists():
+                return folder / row[0], False
+            name = self._free_name(folder, domain, kind, Path(urlparse(url).path).name, digest)
+            self._db.execute(
+                "INSERT OR REPLACE INTO names (domain, kind, name, digest) VALUES (?, ?, ?, ?)",
+                (domain, kind, name, digest),
+            )
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / name
+        if not path.exists():
+            try:
+                os.link(self.blob_path(digest), path)
+            except OSError:  # Filesystem without hard links
+                shutil.copyfile(self.blob_path(digest), path)
+        return path, True
+
+    def _free_name(self, folder: Path, domain: str, kind: str, name: str, digest: str) -> str:
+        taken = self._db.execute(
+            "SELECT digest FROM names WHERE domain = ? AND kind = ? AND name = ?",
+            (domain, kind, name),
+        ).fetchone()
+        if taken is not None and taken[0] == digest:
+            return name
+        if taken is None and not (folder / name).exists():  # Unindexed files predate the store
+            return name
+        stem, ext = os.path.splitext(name)
+        return f"{stem}__{digest[:10]}{ext}"
+
+
+_store: Optional[AssetStore] = None
+
+
+def get_asset_store(base_dir: Path) -> AssetStore:
+    """The process-wide store rooted in ``base_dir``."""
+    global _store
+    if _store is None or _store.base_dir != base_dir:
+        _store = AssetStore(base_dir)
+    return _store
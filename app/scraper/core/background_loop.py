@@ -0,0 +1,34 @@
+import asyncio
+import concurrent.futures
+from threading import Lock, Thread
+from typing import Any, Coroutine, Optional, TypeVar
+
+from scraper.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = Lock()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the process-wide event loop, starting its thread on first use.
+
+    Long-lived async resources (browser pool, HTTP pool) are bound to the loop
+    that created them, so every crawl in a server process runs on this one.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            logger.info("🔁 Starting background event loop thread...")
+            _loop = asyncio.new_event_loop()
+            Thread(target=_loop.run_forever, name="scraper-loop", daemon=True).start()
+        return _loop
+
+
+def run_in_background(coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+    """Schedule a coroutine on the background loop from any thread."""
+    return asyncio.run_coroutine_threadsafe(coro, get_background_loop())
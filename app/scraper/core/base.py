@@ -1,18 +1,531 @@
-# app/scraper/core/base.py
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Callable, Dict, Optional
+from typing import Callable, Dict, List, NamedTuple, Optional
+from urllib.parse import urlparse
+
+from scraper.config import (
+    CRAWL_WORKERS,
+    FRONTIER_MAX_DEPTH,
+    FRONTIER_STRATEGY,
+    NEAR_DUP_ENABLED,
+    NEAR_DUP_MIN_WORDS,
+    PAGE_RETRIES,
+    PER_HOST_CONCURRENCY,
+    ROBOTS_ATTEMPTS,
+    ROBOTS_ENABLED,
+    ROBOTS_ERROR_SECONDS,
+    SITEMAP_MAX_URLS,
+    SITEMAP_POLL_SECONDS,
+    SITEMAP_SEED,
+)
+from scraper.core.archive import get_page_archive
+from scraper.core.asset_store import get_asset_store
+from scraper.core.checkpoint import CrawlCheckpoint, CrawlState
+from scraper.core.frontier import Frontier
+from scraper.core.http_pool import hold_http_pool, release_http_pool
+from scraper.core.metrics import PAGES, Histogram
+from scraper.core.progress import CrawlProgress
+from scraper.core.simhash import SimHashIndex, simhash, words
+from scraper.core.site_meta import RobotsRules, get_robots, sitemap_urls
+from scraper.core.storage import (
+    BASE_DIR,
+    async_save_file,
+    async_save_image,
+    link_duplicate_page,
+    save_link_graph,
+    save_page,
+)
+from scraper.core.urlset import UrlSet
+from scraper.logging_config import get_logger, page_sampler
+from scraper.utils.throttling import BACKOFF_STATUSES, get_scheduler
+from scraper.utils.url_utils import DOC_EXTS, extract_page_links, normalize_url
+
+logger = get_logger(__name__)
+
+ProgressCallback = Callable[[str, CrawlProgress], None]
+PageCallback = Callable[[str, str, str], None]  # (domain, url, text) of each saved page
+
+
+class PageContent(NamedTuple):
+    """What an engine extracted from one page. URLs are absolute."""
+
+    text: str
+    links: List[str]  # every a[href]
+    images: List[str]  # every img[src]
+    assets: Optional[Dict[str, bytes]] = None  # bodies the engine already fetched, by URL
+    ready_ms: Optional[float] = None  # time until the page was ready for extraction
+    status: Optional[int] = None  # HTTP status of the page response
+    retry_after: Optional[str] = None  # Retry-After header, if the server sent one
+    not_modified: bool = False  # Server confirmed the stored copy is current (304)
+    html: Optional[str] = None  # (rendered) HTML, kept in the page archive
+    headers: Optional[Dict[str, str]] = None  # Response headers of the page
 
 
 class BaseScraper(ABC):
-    def __init__(self, max_pages: int = 50, headers: Optional[Dict[str, str]] = None):
+    """
+    Shared crawl loop: a frontier, a pool of page workers and asset downloads.
+
+    Engines only decide how a page is fetched and parsed by implementing
+    ``fetch_page`` (plus ``start``/``stop`` for anything they hold open).
+    """
+
+    def __init__(
+        self,
+        max_pages: int = 50,
+        headers: Optional[Dict[str, str]] = None,
+        workers: int = CRAWL_WORKERS,
+        per_host_limit: int = PER_HOST_CONCURRENCY,
+        strategy: str = FRONTIER_STRATEGY,
+        max_depth: Optional[int] = FRONTIER_MAX_DEPTH,
+    ):
         self.max_pages = max_pages
         self.headers = headers or {}
+        self.workers = max(1, workers)
+        self.per_host_limit = max(1, per_host_limit)
+        self.strategy = strategy
+        self.max_depth = max_depth
+        self.scheduler = get_scheduler()
+        self._paused = False
+        self._unpaused: Optional[asyncio.Event] = None
+        self._log_page = page_sampler()  # Gates the per-page summary line
+
+    async def start(self) -> None:
+        """Acquire engine resources (browsers, sessions) before the first page."""
+
+    async def stop(self) -> None:
+        """Release whatever ``start`` acquired."""
+
+    def pause(self) -> None:
+        """Stop workers from starting new pages; pages already open still finish."""
+        self._paused = True
+        if self._unpaused is not None:
+            self._unpaused.clear()
+
+    def unpause(self) -> None:
+        self._paused = False
+        if self._unpaused is not None:
+            self._unpaused.set()
 
     @abstractmethod
+    async def fetch_page(self, url: str) -> PageContent:
+        pass
+
     async def crawl(
         self,
         start_url: str,
         status_key: Optional[str] = None,
-        status_callback: Optional[Callable[[str, str], None]] = None,
+        status_callback: Optional[ProgressCallback] = None,
+        resume: bool = False,
+        page_callback: Optional[PageCallback] = None,
     ) -> None:
-        pass
+        """
+        Crawl from ``start_url``. With ``resume=True`` an unfinished earlier crawl
+        of the same start URL continues from its last checkpoint. ``page_callback``
+        is called with the text of every page as soon as it is saved.
+        """
+        logger.info(f"🚀 Starting crawl with start_url: {start_url}")
+        start_url = start_url if start_url.startswith("http") else f"http://{start_url}"
+        start_url = normalize_url(start_url)
+        domain = urlparse(start_url).netloc
+        logger.info(f"🌐 Domain parsed: {domain}")
+
+        # Crawl state shared by every worker of this crawl
+        self._frontier = self._new_frontier()
+        self._visited = UrlSet()
+        # Per-crawl aggregate; /metrics has the process-wide READINESS_SECONDS
+        self._readiness_stats = Histogram(
+            "crawl_readiness_seconds", "Page readiness time of this crawl.", register=False
+        )
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._seen_images = UrlSet()
+        self._seen_files = UrlSet()
+        self._count = 0
+        self._image_count = 0
+        self._file_count = 0
+        self._error_count = 0
+        self._bytes = 0
+        self._duplicate_count = 0
+        self._retries: Dict[str, int] = {}  # Re-queues of throttled / 5xx pages, by URL
+        self._near_dups = SimHashIndex() if NEAR_DUP_ENABLED else None
+        self._started = time.monotonic()
+        self._resumed_from = 0
+        self._page_callback = page_callback
+        self._unpaused = asyncio.Event()
+        if not self._paused:
+            self._unpaused.set()
+
+        # Checkpoint SQLite stays off the loop, like the per-page commits
+        loop = asyncio.get_running_loop()
+        self._checkpoint = await loop.run_in_executor(None, self._new_checkpoint, start_url)
+        if resume and await loop.run_in_executor(None, self._checkpoint.resumable):
+            state = await loop.run_in_executor(None, self._restore_checkpoint)
+            self._frontier.restore_pending(state.pending)
+            self._visited = state.visited
+            self._seen_images = state.seen_images
+            self._seen_files = state.seen_files
+            self._count = state.counters["count"]
+            self._image_count = state.counters["image_count"]
+            self._file_count = state.counters["file_count"]
+            self._error_count = state.counters["error_count"]
+            self._bytes = state.counters["bytes"]
+            self._duplicate_count = state.duplicates
+            self._resumed_from = self._count
+            logger.info(
+                f"⏯️ Resuming crawl: {len(state.visited)} pages done, "
+                f"{len(state.pending)} pending"
+            )
+        else:
+            if resume:
+                logger.info("⏯️ No unfinished checkpoint for this URL, starting fresh.")
+            await loop.run_in_executor(None, self._checkpoint.reset)
+            self._frontier.add(start_url)
+
+        completed = False
+        await self.start()
+        hold_http_pool()
+        tasks: List[asyncio.Task] = []
+        try:
+            # Rules must be in place before the first page is fetched
+            self._robots = await self._load_robots(start_url)
+            logger.info(f"👷 Starting {self.workers} page workers...")
+            tasks = [
+                asyncio.create_task(self._worker(n, domain, status_key, status_callback))
+                for n in range(self.workers)
+            ]
+            # Workers start on the start page while the sitemaps stream in; seeding stops
+            # early once the page budget is claimed, as nothing it queues could be visited
+            seeding = asyncio.create_task(self._seed_frontier(start_url, domain))
+            tasks.append(seeding)
+            while not seeding.done():
+                await asyncio.wait({seeding}, timeout=SITEMAP_POLL_SECONDS)
+                if not seeding.done() and not await self._budget_left():
+                    seeding.cancel()
+                    logger.info("🗺️ Page budget claimed, stopped reading sitemaps")
+            await asyncio.gather(seeding, return_exceptions=True)
+            await self._frontier.join()
+            completed = True
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.stop()
+            await release_http_pool()
+            # Pages must be readable from the archive once the crawl reports finished
+            await loop.run_in_executor(None, get_page_archive(BASE_DIR).flush)
+            await loop.run_in_executor(None, self._checkpoint.finish, completed, self._counters())
+            await loop.run_in_executor(None, self._save_link_graph, domain)
+            self._frontier.close()
+            if self._near_dups is not None:
+                self._near_dups.close()
+            if self._duplicate_count:
+                logger.info(f"🪞 {self._duplicate_count} near-duplicate pages linked, not saved")
+            for total, count in self._readiness_stats.totals().values():
+                logger.info(f"⏱️ Average page readiness: {total / count * 1000:.0f} ms")
+            logger.info("🛑 Crawl finished.")
+
+    def _restore_checkpoint(self) -> CrawlState:
+        """Load the checkpoint and rebuild the link graph and near-duplicate index (blocking)."""
+        state = self._checkpoint.load()
+        self._frontier.restore(state.seen, state.edges)
+        if self._near_dups is not None:
+            for url, fingerprint in state.fingerprints:
+                self._near_dups.add(fingerprint, url)
+        return state
+
+    async def _load_robots(self, start_url: str) -> RobotsRules:
+        """
+        robots.txt of the start host; its Crawl-delay raises the host's throttle floor.
+        An unavailable robots.txt is refetched every ``ROBOTS_ERROR_SECONDS``; after
+        ``ROBOTS_ATTEMPTS`` fetches the crawl fails instead of finishing with no pages.
+        """
+        if not ROBOTS_ENABLED:
+            return RobotsRules()
+        robots = await get_robots(start_url)
+        for attempt in range(2, ROBOTS_ATTEMPTS + 1):
+            if not robots.unavailable:
+                break
+            logger.warning(
+                f"🤖⚠️ robots.txt unavailable, retrying in {ROBOTS_ERROR_SECONDS}s "
+                f"(attempt {attempt}/{ROBOTS_ATTEMPTS})"
+            )
+            await asyncio.sleep(ROBOTS_ERROR_SECONDS)  # The cached failure expires meanwhile
+            robots = await get_robots(start_url)
+        if robots.unavailable:
+            raise RuntimeError(f"robots.txt of {urlparse(start_url).netloc} is unavailable")
+        if robots.crawl_delay:
+            logger.info(f"🐢 Crawl-delay of {robots.crawl_delay}s for {urlparse(start_url).netloc}")
+            self.scheduler.set_min_delay(start_url, robots.crawl_delay)
+        if not robots.allowed(start_url):
+            logger.warning(f"🤖⚠️ robots.txt disallows the start URL {start_url}")
+        return robots
+
+    async def _seed_frontier(self, start_url: str, domain: str) -> None:
+        """Queue the pages listed in the site's sitemaps, most recently modified first."""
+        if not SITEMAP_SEED:
+            return
+        seeded = 0
+        try:
+            # More seeds than pages in the budget could never be visited
+            max_urls = min(SITEMAP_MAX_URLS, self.max_pages)
+            async for batch in sitemap_urls(start_url, self._robots.sitemaps, max_urls):
+                links = [
+                    link
+                    for link in extract_page_links(start_url, batch, domain)
+                    if self._robots.allowed(link)
+                ]
+                while links:
+                    chunk, links = links[:1000], links[1000:]
+                    seeded += self._frontier.add_links(None, chunk, 1)
+                    await asyncio.sleep(0)  # Let workers run between chunks of a big sitemap
+        except Exception as e:
+            logger.warning(f"🗺️⚠️ Sitemap seeding stopped: {e}", exc_info=True)
+        if seeded:
+            logger.info(f"🗺️ Seeded the frontier with {seeded} URLs from sitemaps")
+
+    # --- Crawl state hooks (overridden by sharded workers) ---
+
+    def _new_frontier(self) -> Frontier:
+        return Frontier(strategy=self.strategy, max_depth=self.max_depth)
+
+    def _new_checkpoint(self, start_url: str) -> CrawlCheckpoint:
+        return CrawlCheckpoint(start_url, BASE_DIR, archive=get_page_archive(BASE_DIR))
+
+    async def _claim_page(self, url: str) -> bool:
+        """Whether the page budget allows visiting one more page (duplicates are free)."""
+        return await self._budget_left()
+
+    async def _budget_left(self) -> bool:
+        """Whether pages of the budget are still unclaimed."""
+        return len(self._visited) - self._duplicate_count < self.max_pages
+
+    async def _unclaim_page(self, url: str) -> None:
+        """Give back the budget ``_claim_page`` took for a page that will be retried."""
+
+    def _save_link_graph(self, domain: str) -> None:
+        save_link_graph(domain, self._frontier.graph.items())
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        """Per-host semaphore capping how many pages of one host are open at once."""
+        host = urlparse(url).netloc
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        return slot
+
+    async def _worker(
+        self,
+        worker_id: int,
+        domain: str,
+        status_key: Optional[str],
+        status_callback: Optional[ProgressCallback],
+    ) -> None:
+        """Pull URLs off the shared frontier until the crawl is cancelled."""
+        while True:
+            url, parent, depth = await self._frontier.get()
+            try:
+                await self._unpaused.wait()
+                logger.debug(
+                    "➡️ [w%d] Popped URL from frontier: %s (depth %d)", worker_id, url, depth
+                )
+                if not self._robots.allowed(url):
+                    logger.debug("🤖 [w%d] Disallowed by robots.txt: %s", worker_id, url)
+                    continue
+                if not await self._claim_page(url):
+                    continue
+
+                logger.debug("🔍 [w%d] Visiting: %s", worker_id, url)
+                self._visited.add(url)
+                async with self._host_slot(url):
+                    await self._process_page(
+                        url, parent, depth, domain, status_key, status_callback
+                    )
+            finally:
+                self._frontier.task_done()
+
+    async def _process_page(
+        self,
+        url: str,
+        parent: Optional[str],
+        depth: int,
+        domain: str,
+        status_key: Optional[str],
+        status_callback: Optional[ProgressCallback],
+    ) -> None:
+        try:
+            await self.scheduler.acquire(url)
+            try:
+                page = await self.fetch_page(url)
+            except Exception:
+                self.scheduler.record(url, None)
+                raise
+            self.scheduler.record(url, page.status, page.retry_after)
+            if page.status is not None and (page.status in BACKOFF_STATUSES or page.status >= 500):
+                await self._retry_later(url, parent, depth, page.status)
+                return
+            self._retries.pop(url, None)
+            if page.ready_ms is not None:
+                self._readiness_stats.observe(page.ready_ms / 1000)
+            fingerprint = None
+            if page.text and self._near_dups is not None:
+                fingerprint = await asyncio.get_running_loop().run_in_executor(
+                    None, simhash, page.text
+                )
+                if await self._link_duplicate(url, depth, domain, page.text, fingerprint):
+                    return
+            if page.text and not page.not_modified:
+                logger.debug("🗂️ Saving page text for %s ...", url)
+                await save_page(domain, url, page.text, page.html, page.status, page.headers)
+                self._bytes += len(page.text.encode("utf-8"))
+            if page.text and self._page_callback:
+                self._page_callback(domain, url, page.text)
+
+            links = extract_page_links(url, page.links, domain)
+            queued = self._frontier.add_links(url, links, depth + 1)
+            logger.debug("🔗 Found %d same-domain links, %d new in frontier.", len(links), queued)
+
+            file_urls_filtered = [f for f in page.links if f and f.lower().endswith(DOC_EXTS)]
+            logger.debug("📄 Filtered %d downloadable files.", len(file_urls_filtered))
+
+            image_urls_filtered = [i for i in page.images if i]
+            logger.debug("📄 Filtered %d images for download.", len(image_urls_filtered))
+
+            # --- Download images/files concurrently ---
+            logger.debug(
+                "⏬ Downloading images (%d) and files (%d)...",
+                len(image_urls_filtered),
+                len(file_urls_filtered),
+            )
+            assets = page.assets or {}
+            img_tasks = [
+                async_save_image(domain, img_url, self._seen_images, assets.get(img_url))
+                for img_url in image_urls_filtered
+            ]
+            file_tasks = [
+                async_save_file(domain, file_url, self._seen_files, assets.get(file_url))
+                for file_url in file_urls_filtered
+            ]
+
+            img_results = await asyncio.gather(*img_tasks, return_exceptions=True)
+            file_results = await asyncio.gather(*file_tasks, return_exceptions=True)
+            self._image_count += sum(1 for r in img_results if r is True)
+            self._file_count += sum(1 for r in file_results if r is True)
+            saved = [
+                asset_url
+                for asset_url, r in zip(
+                    image_urls_filtered + file_urls_filtered, img_results + file_results
+                )
+                if r is True
+            ]
+            if saved:
+                self._bytes += await asyncio.get_running_loop().run_in_executor(
+                    None, get_asset_store(BASE_DIR).total_size, saved
+                )
+            self._count += 1
+            PAGES.inc(result="ok")
+            if self._log_page():
+                logger.info(
+                    "✅ Crawled %d/%d: %s (%d new links, images: %d, files: %d)",
+                    self._count,
+                    self.max_pages,
+                    url,
+                    queued,
+                    self._image_count,
+                    self._file_count,
+                )
+            await self._checkpoint.page_done(
+                url,
+                depth,
+                links,
+                image_urls_filtered,
+                file_urls_filtered,
+                self._counters(),
+                fingerprint=fingerprint,
+            )
+
+            # --- Progress reporting: now includes files/images ---
+            if status_callback and status_key:
+                logger.debug("📢 Reporting progress update via callback...")
+                status_callback(
+                    status_key,
+                    self._progress(
+                        f"Crawled {self._count} of {self.max_pages} | "
+                        f"Images: {self._image_count} | Files: {self._file_count}"
+                    ),
+                )
+
+        except Exception as e:
+            logger.error(f"❌ Error loading {url}: {e}", exc_info=True)
+            self._error_count += 1
+            PAGES.inc(result="error")
+            if status_callback and status_key:
+                logger.debug("📢 Reporting error via callback...")
+                status_callback(status_key, self._progress(f"Error: {e}"))
+
+    async def _retry_later(self, url: str, parent: Optional[str], depth: int, status: int) -> None:
+        """
+        Put a throttled or failing (5xx) page back in the frontier without
+        counting it; the scheduler holds its next fetch until the host's pause
+        ends. After ``PAGE_RETRIES`` re-queues it counts as an error.
+        """
+        attempts = self._retries.pop(url, 0) + 1
+        if attempts > PAGE_RETRIES:
+            raise RuntimeError(f"HTTP {status} after {PAGE_RETRIES} retries")
+        self._retries[url] = attempts
+        self._visited.discard(url)
+        await self._unclaim_page(url)
+        self._frontier.requeue(url, parent, depth)
+        PAGES.inc(result="retry")
+        logger.info(f"🔁 HTTP {status} for {url}, re-queued (retry {attempts}/{PAGE_RETRIES})")
+
+    async def _link_duplicate(
+        self, url: str, depth: int, domain: str, text: str, fingerprint: int
+    ) -> bool:
+        """
+        Link ``url`` to an earlier page with (nearly) the same text. A duplicate
+        is not saved, categorized or asset-processed, its links are not
+        followed and it does not count against ``max_pages``. True if linked.
+        """
+        assert self._near_dups is not None
+        # Fingerprints of short texts are noisy: only exact matches count there
+        exact = len(words(text)) < NEAR_DUP_MIN_WORDS
+        match = self._near_dups.find(fingerprint, 0 if exact else None)
+        if match is None:
+            self._near_dups.add(fingerprint, url)
+            return False
+        canonical, bits = match
+        self._duplicate_count += 1
+        PAGES.inc(result="duplicate")
+        await link_duplicate_page(domain, url, canonical, bits)
+        await self._checkpoint.page_done(
+            url, depth, [], [], [], self._counters(), duplicate_of=canonical
+        )
+        logger.debug("🪞 %s duplicates %s (%d bits apart), skipped", url, canonical, bits)
+        return True
+
+    def _counters(self) -> Dict[str, int]:
+        return {
+            "count": self._count,
+            "image_count": self._image_count,
+            "file_count": self._file_count,
+            "error_count": self._error_count,
+            "bytes": self._bytes,
+        }
+
+    def _progress(self, message: str) -> CrawlProgress:
+        """Snapshot of this crawl's counters, with an ETA from the pace so far."""
+        eta = None
+        done_here = self._count - self._resumed_from
+        if done_here > 0:
+            remaining = min(self.max_pages - self._count, self._frontier.qsize())
+            eta = (time.monotonic() - self._started) / done_here * max(0, remaining)
+        return CrawlProgress(
+            message=message,
+            pages=self._count,
+            max_pages=self.max_pages,
+            images=self._image_count,
+            files=self._file_count,
+            errors=self._error_count,
+            bytes=self._bytes,
+            eta=eta,
+        )
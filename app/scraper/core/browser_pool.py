@@ -0,0 +1,245 @@
+import asyncio
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+from playwright.async_api import async_playwright  # type: ignore
+from playwright.async_api import Browser, BrowserContext, Playwright  # type: ignore
+
+from scraper.config import (
+    BROWSER_CONTEXTS_PER_BROWSER,
+    BROWSER_MAX_PAGES,
+    BROWSER_MAX_RSS_MB,
+    BROWSER_POOL_SIZE,
+    HEADLESS_MODE,
+)
+from scraper.logging_config import get_logger
+
+try:
+    import psutil  # type: ignore
+except ImportError:  # Memory-based recycling is skipped without psutil
+    psutil = None
+
+logger = get_logger(__name__)
+
+
+class PooledBrowser:
+    """A launched browser plus the bookkeeping the pool uses to recycle it."""
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.active = 0  # Contexts currently handed out
+        self.pages = 0  # Pages opened since launch
+        self.retiring = False
+
+    def count_page(self, _page=None) -> None:
+        self.pages += 1
+
+
+class BrowserPool:
+    """
+    Keeps ``size`` warm Chromium browsers and hands out isolated contexts.
+
+    A browser is retired after ``max_pages`` pages or when browser processes
+    use more than ``max_rss_mb`` each on average. Holders check ``due`` before
+    opening pages and move to a fresh context when their browser is due, so
+    the limits hold during long crawls too. A replacement is launched in the
+    background (never under the pool lock) and the old browser closes once
+    its last context is released.
+    """
+
+    RSS_CHECK_SECONDS = 5.0  # Scanning Chromium processes is too slow to do per page
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        headless: bool = HEADLESS_MODE,
+        max_pages: int = BROWSER_MAX_PAGES,
+        max_rss_mb: int = BROWSER_MAX_RSS_MB,
+        contexts_per_browser: int = BROWSER_CONTEXTS_PER_BROWSER,
+    ):
+        self.size = max(1, size)
+        self.headless = headless
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[PooledBrowser] = []
+        self._lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(self.size * max(1, contexts_per_browser))
+        self._filling: Optional["asyncio.Task[None]"] = None
+        self._rss_mb: Optional[float] = None
+        self._rss_checked = 0.0
+
+    async def start(self) -> None:
+        """Launch the warm browsers (no-op if already running)."""
+        await self._refill()
+
+    def _healthy(self) -> List[PooledBrowser]:
+        for pooled in self._browsers:
+            if not pooled.browser.is_connected():
+                pooled.retiring = True
+        return [b for b in self._browsers if not b.retiring]
+
+    def _refill(self) -> "asyncio.Task[None]":
+        """Top the pool up to ``size`` healthy browsers; one launch round runs at a time."""
+        if self._filling is None or self._filling.done():
+            self._filling = asyncio.create_task(self._fill())
+            self._filling.add_done_callback(_log_fill_error)
+        return self._filling
+
+    async def _fill(self) -> None:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        async with self._lock:
+            self._browsers = [b for b in self._browsers if b.browser.is_connected() or b.active > 0]
+            missing = self.size - len(self._healthy())
+        if missing <= 0:
+            return
+        # Chromium takes a while to start; acquire keeps handing out healthy browsers meanwhile
+        logger.info(
+            f"🎭 Launching {missing} pooled Chromium browsers (headless={self.headless})..."
+        )
+        launched = await asyncio.gather(
+            *(self._playwright.chromium.launch(headless=self.headless) for _ in range(missing)),
+            return_exceptions=True,
+        )
+        errors = [b for b in launched if isinstance(b, BaseException)]
+        async with self._lock:
+            self._browsers.extend(
+                PooledBrowser(b) for b in launched if not isinstance(b, BaseException)
+            )
+            if errors and not self._healthy():
+                raise errors[0]
+        for error in errors:
+            logger.warning(f"🎭⚠️ Failed to launch a pooled browser: {error}")
+
+    async def acquire(
+        self, headers: Optional[Dict[str, str]] = None, slot: bool = True
+    ) -> Tuple[BrowserContext, PooledBrowser]:
+        """
+        Open a fresh context on the least busy healthy browser. ``slot=False``
+        skips the context limit, for a holder trading in a context it still has.
+        """
+        if slot:
+            await self._slots.acquire()
+        try:
+            while True:
+                async with self._lock:
+                    healthy = self._healthy()
+                    if healthy:
+                        pooled = min(healthy, key=lambda b: b.active)
+                        pooled.active += 1
+                        break
+                await self._refill()
+            if len(healthy) < self.size:
+                self._refill()
+            logger.info("🌱 Creating new browser context from pool...")
+            try:
+                context = await pooled.browser.new_context(extra_http_headers=headers or {})
+            except Exception:
+                pooled.active -= 1
+                raise
+        except Exception:
+            if slot:
+                self._slots.release()
+            raise
+        context.on("page", pooled.count_page)
+        return context, pooled
+
+    async def release(
+        self, context: BrowserContext, pooled: PooledBrowser, slot: bool = True
+    ) -> None:
+        """Close a context and recycle its browser if it is due."""
+        try:
+            await context.close()
+        except Exception as e:
+            logger.warning(f"🔒⚠️ Failed to close browser context: {e}")
+        finally:
+            pooled.active -= 1
+            if slot:
+                self._slots.release()
+        self.due(pooled)
+        async with self._lock:
+            close = pooled.retiring and pooled.active == 0 and pooled in self._browsers
+            if close:
+                self._browsers.remove(pooled)
+        if close:
+            await self._close_browser(pooled)
+
+    def due(self, pooled: PooledBrowser) -> bool:
+        """True once ``pooled`` is retiring; retires it when it passes a limit."""
+        if not pooled.retiring and self._should_recycle(pooled):
+            logger.info(f"♻️ Retiring browser after {pooled.pages} pages...")
+            pooled.retiring = True
+            self._refill()
+        return pooled.retiring
+
+    def _should_recycle(self, pooled: PooledBrowser) -> bool:
+        if pooled.pages >= self.max_pages:
+            return True
+        now = time.monotonic()
+        if now - self._rss_checked >= self.RSS_CHECK_SECONDS:
+            self._rss_mb = browser_rss_mb()
+            self._rss_checked = now
+        rss_mb = self._rss_mb
+        return rss_mb is not None and rss_mb / max(1, len(self._browsers)) > self.max_rss_mb
+
+    async def _close_browser(self, pooled: PooledBrowser) -> None:
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            logger.warning(f"🔒⚠️ Failed to close browser: {e}")
+
+    async def close(self) -> None:
+        if self._filling is not None and not self._filling.done():
+            self._filling.cancel()
+            await asyncio.gather(self._filling, return_exceptions=True)
+        async with self._lock:
+            logger.info(f"🔒 Closing browser pool ({len(self._browsers)} browsers)...")
+            for pooled in self._browsers:
+                await self._close_browser(pooled)
+            self._browsers = []
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+
+def _log_fill_error(task: "asyncio.Task[None]") -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"🎭❌ Could not launch pooled browsers: {task.exception()}")
+
+
+def browser_rss_mb() -> Optional[float]:
+    """Resident memory of this process's Chromium children in MiB (None without psutil)."""
+    if psutil is None:
+        return None
+    total = 0
+    for child in psutil.Process().children(recursive=True):
+        try:
+            if "chrom" in child.name().lower() or "headless_shell" in child.name():
+                total += child.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / (1024 * 1024)
+
+
+# Playwright objects are bound to the loop that created them, so there is one pool per loop.
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, BrowserPool]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_browser_pool() -> BrowserPool:
+    """Return the browser pool for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = _pools[loop] = BrowserPool()
+    return pool
+
+
+async def close_browser_pool() -> None:
+    """Shut down the running loop's browser pool, if one was started."""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
@@ -0,0 +1,264 @@
+import asyncio
+import hashlib
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from scraper.config import CHECKPOINT_EVERY
+from scraper.core.archive import PageArchive
+from scraper.core.urlset import UrlSet
+from scraper.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS discovered (url TEXT PRIMARY KEY, parent TEXT, depth INTEGER);
+CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS edges (parent TEXT, child TEXT, PRIMARY KEY (parent, child));
+CREATE TABLE IF NOT EXISTS assets (url TEXT PRIMARY KEY, kind TEXT);
+CREATE TABLE IF NOT EXISTS fingerprints (url TEXT PRIMARY KEY, simhash INTEGER);
+CREATE TABLE IF NOT EXISTS duplicates (url TEXT PRIMARY KEY, canonical TEXT);
+"""
+
+COUNTERS = ("count", "image_count", "file_count", "error_count", "bytes")
+
+
+def _to_sqlite(fingerprint: int) -> int:
+    """SQLite integers are signed 64-bit."""
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def _from_sqlite(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+class _Batch(NamedTuple):
+    """Rows buffered since the last checkpoint, taken in one go for the writer."""
+
+    seq: int
+    pages: List[str]
+    discovered: List[Tuple[str, Optional[str], int]]
+    assets: List[Tuple[str, str]]
+    fingerprints: List[Tuple[str, int]]
+    duplicates: List[Tuple[str, str]]
+    counters: Dict[str, int]
+
+
+class CrawlState(NamedTuple):
+    """Everything needed to continue a crawl where its last checkpoint left it."""
+
+    visited: UrlSet
+    pending: List[Tuple[str, Optional[str], int]]  # (url, parent, depth) not yet visited
+    seen: UrlSet  # every URL ever queued
+    edges: Iterable[Tuple[str, str]]  # (parent, child) link graph edges, read lazily
+    seen_images: UrlSet
+    seen_files: UrlSet
+    counters: Dict[str, int]
+    fingerprints: List[Tuple[str, int]]  # (url, SimHash) of canonical pages
+    duplicates: int  # Pages linked to a canonical page instead of saved
+
+
+class CrawlCheckpoint:
+    """
+    Append-only crawl log in SQLite, one file per start URL.
+
+    Workers report finished pages with ``page_done``; rows are buffered and
+    committed every ``every`` pages (and on ``finish``), so a crash or restart
+    loses at most the pages since the last checkpoint. Pages that were in
+    flight are simply crawled again on resume. Commits run on the default
+    executor, never on the event loop. With an ``archive``, each commit first
+    waits until the archive has written every page queued so far, so no page
+    is marked visited before its text is on disk.
+    """
+
+    def __init__(
+        self,
+        start_url: str,
+        base_dir: Path,
+        every: int = CHECKPOINT_EVERY,
+        archive: Optional[PageArchive] = None,
+    ):
+        key = hashlib.sha1(start_url.encode("utf-8")).hexdigest()[:16]
+        self.path = base_dir / ".checkpoints" / f"{key}.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.start_url = start_url
+        self.every = max(1, every)
+        self.archive = archive
+        self._lock = Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._pages: List[str] = []
+        self._discovered: List[Tuple[str, Optional[str], int]] = []
+        self._assets: List[Tuple[str, str]] = []
+        self._fingerprints: List[Tuple[str, int]] = []
+        self._duplicates: List[Tuple[str, str]] = []
+        self._counters: Dict[str, int] = {}
+        self._seq = 0  # Batches taken so far
+        self._written = -1  # Newest batch whose counters are on disk
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def resumable(self) -> bool:
+        """True if an earlier crawl of this start URL stopped before finishing."""
+        with self._lock:
+            return self._meta("start_url") == self.start_url and self._meta("finished") == "0"
+
+    def reset(self) -> None:
+        """Start a fresh log for a new crawl."""
+        with self._lock, self._db:
+            for table in (
+                "meta",
+                "discovered",
+                "visited",
+                "edges",
+                "assets",
+                "fingerprints",
+                "duplicates",
+            ):
+                self._db.execute(f"DELETE FROM {table}")
+            self._db.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [("start_url", self.start_url), ("finished", "0")],
+            )
+            self._db.execute(
+                "INSERT INTO discovered (url, parent, depth) VALUES (?, NULL, 0)",
+                (self.start_url,),
+            )
+
+    def load(self) -> CrawlState:
+        with self._lock:
+            visited = UrlSet(r[0] for r in self._db.execute("SELECT url FROM visited"))
+            seen = UrlSet()
+            pending: List[Tuple[str, Optional[str], int]] = []
+            for url, parent, depth in self._db.execute(
+                "SELECT url, parent, depth FROM discovered ORDER BY rowid"
+            ):
+                seen.add(url)
+                if url not in visited:
+                    pending.append((url, parent, depth))
+            edges = self._db.execute("SELECT parent, child FROM edges ORDER BY rowid")
+            seen_images = UrlSet()
+            seen_files = UrlSet()
+            for url, kind in self._db.execute("SELECT url, kind FROM assets"):
+                (seen_images if kind == "images" else seen_files).add(url)
+            counters = {key: int(self._meta(key) or 0) for key in COUNTERS}
+            fingerprints = [
+                (url, _from_sqlite(value))
+                for url, value in self._db.execute(
+                    "SELECT url, simhash FROM fingerprints ORDER BY rowid"
+                )
+            ]
+            duplicates = self._db.execute("SELECT COUNT(*) FROM duplicates").fetchone()[0]
+        return CrawlState(
+            visited=visited,
+            pending=pending,
+            seen=seen,
+            edges=edges,
+            seen_images=seen_images,
+            seen_files=seen_files,
+            counters=counters,
+            fingerprints=fingerprints,
+            duplicates=duplicates,
+        )
+
+    async def page_done(
+        self,
+        url: str,
+        depth: int,
+        links: Iterable[str],
+        images: Iterable[str],
+        files: Iterable[str],
+        counters: Dict[str, int],
+        fingerprint: Optional[int] = None,
+        duplicate_of: Optional[str] = None,
+    ) -> None:
+        """
+        Buffer a finished page; writes a checkpoint every ``every`` pages.
+        ``fingerprint`` is the SimHash of a canonical page, ``duplicate_of``
+        the canonical page of a near-duplicate.
+        """
+        self._pages.append(url)
+        if fingerprint is not None:
+            self._fingerprints.append((url, _to_sqlite(fingerprint)))
+        if duplicate_of is not None:
+            self._duplicates.append((url, duplicate_of))
+        self._discovered.extend((link, url, depth + 1) for link in links)
+        self._assets.extend((u, "images") for u in images)
+        self._assets.extend((u, "files") for u in files)
+        self._counters = dict(counters)
+        if len(self._pages) >= self.every:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, self._take())
+
+    def _take(self) -> _Batch:
+        batch = _Batch(
+            self._seq,
+            self._pages,
+            self._discovered,
+            self._assets,
+            self._fingerprints,
+            self._duplicates,
+            self._counters,
+        )
+        self._seq += 1
+        self._pages, self._discovered, self._assets = [], [], []
+        self._fingerprints, self._duplicates = [], []
+        return batch
+
+    def _write(self, batch: _Batch) -> None:
+        if self.archive is not None and batch.pages:
+            self.archive.flush()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO discovered (url, parent, depth) VALUES (?, ?, ?)",
+                batch.discovered,
+            )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO edges (parent, child) VALUES (?, ?)",
+                [(parent, url) for url, parent, _ in batch.discovered],
+            )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO visited (url) VALUES (?)", [(u,) for u in batch.pages]
+            )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO assets (url, kind) VALUES (?, ?)", batch.assets
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO fingerprints (url, simhash) VALUES (?, ?)",
+                batch.fingerprints,
+            )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO duplicates (url, canonical) VALUES (?, ?)", batch.duplicates
+            )
+            # Writes of two batches can finish out of order; counters only move forward
+            if batch.seq > self._written:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    [(k, str(v)) for k, v in batch.counters.items()],
+                )
+                self._written = batch.seq
+        if batch.pages:
+            logger.info(f"💾 Checkpointed {len(batch.pages)} pages to {self.path}")
+
+    def flush(self) -> None:
+        """Commit what is buffered now (blocking)."""
+        if self._pages:
+            self._write(self._take())
+
+    def finish(self, completed: bool, counters: Optional[Dict[str, int]] = None) -> None:
+        """
+        Flush what is buffered, with the final ``counters`` if given; mark the
+        log finished if the crawl ran to the end (blocking).
+        """
+        if counters is not None:
+            self._counters = dict(counters)
+        if self._pages or counters is not None:
+            self._write(self._take())
+        with self._lock:
+            if completed:
+                with self._db:
+                    self._db.execute("UPDATE meta SET value = '1' WHERE key = 'finished'")
+            self._db.close()
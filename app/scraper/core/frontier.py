@@ -0,0 +1,280 @@
+import asyncio
+import heapq
+import itertools
+import os
+import sqlite3
+import tempfile
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from scraper.config import FRONTIER_MEMORY_ITEMS
+from scraper.core.urlset import UrlSet
+from scraper.logging_config import get_logger
+from scraper.utils.url_utils import normalize_url
+
+logger = get_logger(__name__)
+
+STRATEGIES = ("bfs", "dfs", "priority")
+
+# (url, parent, depth)
+FrontierItem = Tuple[str, Optional[str], int]
+Scorer = Callable[[str, int], float]
+
+
+def default_url_score(url: str, depth: int) -> float:
+    """Best-first score (lower is crawled sooner): shallow, short, query-free URLs first."""
+    parsed = urlparse(url)
+    segments = [s for s in parsed.path.split("/") if s]
+    score = depth * 10.0 + len(segments) * 2.0
+    if parsed.query:
+        score += 5.0
+    if any(s.isdigit() for s in segments):  # pagination / archive shells
+        score += 3.0
+    return score
+
+
+# Children of a page, in the order first seen, grouped by the page's first appearance
+GROUPED_EDGES = """
+SELECT e.parent, e.child FROM edges e
+JOIN (SELECT parent, MIN(rowid) AS first FROM edges GROUP BY parent) p ON p.parent = e.parent
+ORDER BY p.first, e.rowid
+"""
+
+
+def group_edges(rows: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, List[str]]]:
+    """(parent, children) pairs from parent-grouped (parent, child) rows; "" children skipped."""
+    parent: Optional[str] = None
+    children: List[str] = []
+    for row_parent, child in rows:
+        if row_parent != parent:
+            if parent is not None:
+                yield parent, children
+            parent, children = row_parent, []
+        if child:
+            children.append(child)
+    if parent is not None:
+        yield parent, children
+
+
+class LinkGraph:
+    """
+    Parent→child link edges of a crawl, kept in a temporary SQLite file.
+
+    Edges are buffered and written ``buffer`` at a time, so memory stays flat
+    however many pages are crawled; repeated edges are dropped by the table.
+    A page recorded without children still appears in ``items``.
+    """
+
+    def __init__(self, buffer: int = 1000):
+        self.buffer = max(1, buffer)
+        self._pending: List[Tuple[str, str]] = []
+        self._db: Optional[sqlite3.Connection] = None
+        self._path: Optional[str] = None
+
+    def add(self, parent: str, child: Optional[str] = None) -> None:
+        self._pending.append((parent, child or ""))  # "" marks a page seen without links
+        if len(self._pending) >= self.buffer:
+            self._write()
+
+    def _write(self) -> None:
+        if not self._pending:
+            return
+        if self._db is None:
+            fd, self._path = tempfile.mkstemp(prefix="links-", suffix=".sqlite")
+            os.close(fd)
+            self._db = sqlite3.connect(self._path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=OFF")
+            self._db.execute("PRAGMA synchronous=OFF")
+            self._db.execute(
+                "CREATE TABLE edges (parent TEXT NOT NULL, child TEXT NOT NULL, "
+                "UNIQUE (parent, child))"
+            )
+        self._db.executemany("INSERT OR IGNORE INTO edges VALUES (?, ?)", self._pending)
+        self._pending = []
+
+    def items(self) -> Iterator[Tuple[str, List[str]]]:
+        """(page, children) pairs, pages in the order they were first recorded."""
+        self._write()
+        if self._db is not None:
+            yield from group_edges(self._db.execute(GROUPED_EDGES))
+
+    def __len__(self) -> int:
+        """Pages with recorded links."""
+        self._write()
+        if self._db is None:
+            return 0
+        return self._db.execute("SELECT COUNT(DISTINCT parent) FROM edges").fetchone()[0]
+
+    def close(self) -> None:
+        """Drop the file."""
+        self._pending = []
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        if self._path is not None:
+            os.unlink(self._path)
+            self._path = None
+
+
+class Frontier(asyncio.Queue):
+    """
+    Crawl frontier shared by all page workers.
+
+    URLs are deduplicated when they are *enqueued*, so the queue never holds
+    the same page twice; ``seen`` keeps fingerprints, not the URL strings.
+    Every parent→child edge is recorded in the on-disk ``graph`` (including
+    edges to pages already seen) for export after the crawl.
+
+    At most ``memory_items`` queued URLs are kept in memory; the rest spill
+    to a temporary SQLite file ordered the same way, and ``get`` always
+    returns the best item of either, so the order does not change.
+
+    Ordering:
+      - ``bfs``: shallowest pages first (FIFO within a depth)
+      - ``dfs``: deepest pages first; combine with ``max_depth`` for depth-limited search
+      - ``priority``: best-first by ``scorer(url, depth)``, lowest score first
+    """
+
+    def __init__(
+        self,
+        strategy: str = "bfs",
+        max_depth: Optional[int] = None,
+        scorer: Optional[Scorer] = None,
+        memory_items: int = FRONTIER_MEMORY_ITEMS,
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown frontier strategy {strategy!r}, expected {STRATEGIES}")
+        self.strategy = strategy
+        self.max_depth = max_depth
+        self.scorer = scorer or default_url_score
+        self.memory_items = max(1, memory_items)
+        self.seen = UrlSet()
+        self.graph = LinkGraph()
+        super().__init__()
+
+    # --- asyncio.Queue storage hooks (same pattern as asyncio.PriorityQueue) ---
+    def _init(self, maxsize: int) -> None:
+        self._queue: List[Tuple[float, int, FrontierItem]] = []
+        self._seq = itertools.count()
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_path: Optional[str] = None
+        self._disk_size = 0
+        self._disk_head: Optional[Tuple[float, int]] = None  # Best (rank, seq) on disk
+
+    def _put(self, item: FrontierItem) -> None:
+        entry = (self._rank(item), next(self._seq), item)
+        if len(self._queue) < self.memory_items:
+            heapq.heappush(self._queue, entry)
+        else:
+            self._spill(entry)
+
+    def _get(self) -> FrontierItem:
+        if self._disk_head is not None and (
+            not self._queue or self._disk_head < self._queue[0][:2]
+        ):
+            return self._unspill()
+        return heapq.heappop(self._queue)[2]
+
+    def qsize(self) -> int:
+        return len(self._queue) + self._disk_size
+
+    def empty(self) -> bool:
+        return not self._queue and not self._disk_size
+
+    # --- Disk spill ---
+    def _spill(self, entry: Tuple[float, int, FrontierItem]) -> None:
+        if self._disk is None:
+            fd, self._disk_path = tempfile.mkstemp(prefix="frontier-", suffix=".sqlite")
+            os.close(fd)
+            self._disk = sqlite3.connect(self._disk_path)
+            self._disk.execute("PRAGMA journal_mode=OFF")
+            self._disk.execute("PRAGMA synchronous=OFF")
+            self._disk.execute(
+                "CREATE TABLE items (rank REAL, seq INTEGER, url TEXT, parent TEXT, depth INTEGER,"
+                " PRIMARY KEY (rank, seq)) WITHOUT ROWID"
+            )
+            logger.info(f"💽 Frontier passed {self.memory_items} URLs, spilling to disk...")
+        rank, seq, (url, parent, depth) = entry
+        self._disk.execute(
+            "INSERT INTO items VALUES (?, ?, ?, ?, ?)", (rank, seq, url, parent, depth)
+        )
+        self._disk_size += 1
+        if self._disk_head is None or (rank, seq) < self._disk_head:
+            self._disk_head = (rank, seq)
+
+    def _unspill(self) -> FrontierItem:
+        assert self._disk is not None and self._disk_head is not None
+        rank, seq = self._disk_head
+        row = self._disk.execute(
+            "SELECT url, parent, depth FROM items WHERE rank = ? AND seq = ?", (rank, seq)
+        ).fetchone()
+        self._disk.execute("DELETE FROM items WHERE rank = ? AND seq = ?", (rank, seq))
+        self._disk_size -= 1
+        head = self._disk.execute(
+            "SELECT rank, seq FROM items ORDER BY rank, seq LIMIT 1"
+        ).fetchone()
+        self._disk_head = (head[0], head[1]) if head else None
+        return row[0], row[1], row[2]
+
+    def close(self) -> None:
+        """Drop the spill and link graph files, if any."""
+        self.graph.close()
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+        if self._disk_path is not None:
+            os.unlink(self._disk_path)
+            self._disk_path = None
+        self._disk_size = 0
+        self._disk_head = None
+
+    def _rank(self, item: FrontierItem) -> float:
+        url, _, depth = item
+        if self.strategy == "priority":
+            return self.scorer(url, depth)
+        if self.strategy == "dfs":
+            return -depth
+        return depth
+
+    # --- Public API ---
+    def add(self, url: str, parent: Optional[str] = None, depth: int = 0) -> bool:
+        """Record the parent→url edge and enqueue url if new and within depth. True if queued."""
+        url = normalize_url(url)
+        if parent is not None:
+            self.graph.add(parent, url)
+        if url in self.seen:
+            return False
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        self.seen.add(url)
+        self.put_nowait((url, parent, depth))
+        return True
+
+    def add_links(self, parent: Optional[str], links: List[str], depth: int) -> int:
+        """
+        Enqueue the children of ``parent`` found at ``depth``. Returns how many were new.
+        ``parent=None`` queues URLs without recording edges (sitemap seeds).
+        """
+        if parent is not None:
+            self.graph.add(parent)
+        return sum(1 for link in links if self.add(link, parent, depth))
+
+    def requeue(self, url: str, parent: Optional[str], depth: int) -> None:
+        """Queue an already seen URL again (a page to retry later)."""
+        self.put_nowait((url, parent, depth))
+
+    def restore(self, seen: Iterable[str], edges: Iterable[Tuple[str, str]]) -> None:
+        """
+        Reload known URLs and link graph edges from a checkpoint. Reads and writes
+        SQLite, so the crawl runs it on the executor; ``restore_pending`` then
+        queues the unvisited items on the loop.
+        """
+        self.seen = seen if isinstance(seen, UrlSet) else UrlSet(seen)
+        for parent, child in edges:
+            self.graph.add(parent, child)
+
+    def restore_pending(self, pending: List[FrontierItem]) -> None:
+        """Queue the unvisited items of a checkpoint that are within depth."""
+        for url, parent, depth in pending:
+            if self.max_depth is None or depth <= self.max_depth:
+                self.put_nowait((url, parent, depth))
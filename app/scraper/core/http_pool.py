@@ -0,0 +1,81 @@
+import asyncio
+import weakref
+from typing import Optional
+
+import aiohttp
+
+from scraper.config import (
+    HTTP_DNS_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_MAX_IN_FLIGHT,
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+)
+from scraper.logging_config import get_logger
+from scraper.utils.headers import get_random_headers
+
+logger = get_logger(__name__)
+
+
+class HttpPool:
+    """
+    One pooled aiohttp session plus a global in-flight cap.
+
+    Connections are kept alive and DNS answers cached, so assets from the
+    same host reuse TCP/TLS connections instead of handshaking per file.
+    """
+
+    def __init__(self) -> None:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_TTL,
+            use_dns_cache=True,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        )
+        self.session = aiohttp.ClientSession(connector=connector, headers=get_random_headers())
+        self.slots = asyncio.Semaphore(HTTP_MAX_IN_FLIGHT)
+
+    async def close(self) -> None:
+        await self.session.close()
+
+
+# aiohttp sessions are bound to the loop that created them, so there is one pool per loop.
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, HttpPool]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_http_pool() -> HttpPool:
+    """Return the pool for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None or pool.session.closed:
+        logger.info("🔌 Opening pooled HTTP session...")
+        pool = _pools[loop] = HttpPool()
+    return pool
+
+
+_users: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, int]" = weakref.WeakKeyDictionary()
+
+
+def hold_http_pool() -> None:
+    """Register a crawl using the running loop's pool; pair with ``release_http_pool``."""
+    loop = asyncio.get_running_loop()
+    _users[loop] = _users.get(loop, 0) + 1
+
+
+async def release_http_pool() -> None:
+    """Drop a crawl's hold and close the pool once no crawl on this loop uses it."""
+    loop = asyncio.get_running_loop()
+    _users[loop] = max(0, _users.get(loop, 0) - 1)
+    if _users[loop] == 0:
+        await close_http_pool()
+
+
+async def close_http_pool() -> None:
+    """Close the running loop's pool (call when a crawl or the process shuts down)."""
+    pool: Optional[HttpPool] = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        logger.info("🔌 Closing pooled HTTP session...")
+        await pool.close()
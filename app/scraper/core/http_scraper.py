@@ -0,0 +1,143 @@
+import asyncio
+import re
+import time
+from typing import Optional
+from urllib.parse import urljoin
+
+import aiohttp
+from bs4 import BeautifulSoup  # type: ignore
+
+from scraper.config import JS_MIN_TEXT_CHARS, TIMEOUT
+from scraper.core.asset_store import get_asset_store
+from scraper.core.http_pool import get_http_pool
+from scraper.core.metrics import EXTRACTION_SECONDS, NAVIGATION_SECONDS
+from scraper.core.storage import BASE_DIR
+from scraper.core.validator_cache import conditional_headers, get_validator_cache, stored_entry
+from scraper.logging_config import get_logger
+
+from .base import BaseScraper, PageContent
+from .playwright_scraper import PlaywrightScraper
+
+logger = get_logger(__name__)
+
+# Empty mount points left by client-side frameworks (React, Vue, Next, Nuxt, Svelte)
+SPA_SHELL_RE = re.compile(
+    r"<div[^>]+id=[\"'](?:root|app|__next|__nuxt|svelte)[\"'][^>]*>\s*</div>", re.IGNORECASE
+)
+NOSCRIPT_JS_RE = re.compile(
+    r"<noscript[^>]*>.{0,300}?(?:enable|requires?|turn on)\s+javascript", re.IGNORECASE | re.DOTALL
+)
+
+
+def needs_javascript(html: str, text: str) -> bool:
+    """Heuristic: True if the static HTML is a shell that only renders with JavaScript."""
+    visible = len(text.strip())
+    if visible < JS_MIN_TEXT_CHARS:
+        return True
+    if SPA_SHELL_RE.search(html):
+        return True
+    return visible < JS_MIN_TEXT_CHARS * 4 and bool(NOSCRIPT_JS_RE.search(html))
+
+
+def parse_html(url: str, html: str) -> PageContent:
+    """Extract visible text, a[href] and img[src] (resolved against url) from static HTML."""
+    soup = BeautifulSoup(html, "lxml")
+    links = [urljoin(url, a["href"]) for a in soup.find_all("a", href=True)]
+    images = [urljoin(url, img["src"]) for img in soup.find_all("img", src=True)]
+    for tag in soup(["script", "style", "noscript", "template"]):
+        tag.decompose()
+    body = soup.body or soup
+    lines = (line.strip() for line in body.get_text("\n").splitlines())
+    text = "\n".join(line for line in lines if line)
+    return PageContent(text=text, links=links, images=images)
+
+
+class HttpScraper(BaseScraper):
+    """
+    Fetches pages with plain HTTP GETs over the pooled session and parses them
+    without a browser. Pages that need JavaScript are handed to a Playwright
+    engine, which is only launched the first time such a page shows up.
+    """
+
+    _renderer: Optional[PlaywrightScraper] = None
+
+    async def start(self) -> None:
+        self._renderer_lock = asyncio.Lock()
+        self.rendered_pages = 0
+
+    async def stop(self) -> None:
+        if self._renderer is not None:
+            logger.info(f"🎭 Browser fallback rendered {self.rendered_pages} pages.")
+            await self._renderer.stop()
+            self._renderer = None
+
+    async def _get_renderer(self) -> PlaywrightScraper:
+        async with self._renderer_lock:
+            if self._renderer is None:
+                logger.info("🎭 Page needs JavaScript, starting browser fallback...")
+                renderer = PlaywrightScraper(max_pages=self.max_pages, headers=self.headers)
+                await renderer.start()
+                self._renderer = renderer
+            return self._renderer
+
+    async def fetch_page(self, url: str) -> PageContent:
+        pool = get_http_pool()
+        store = get_asset_store(BASE_DIR)
+        validators = get_validator_cache(BASE_DIR)
+        loop = asyncio.get_running_loop()
+        # SQLite and disk reads stay off the event loop, like parsing below
+        cached = await loop.run_in_executor(None, stored_entry, validators, store, url)
+        headers = {**self.headers, **conditional_headers(cached)}
+        timeout = aiohttp.ClientTimeout(total=TIMEOUT / 1000)
+        logger.debug("⚡ Fetching %s over HTTP...", url)
+        started = time.perf_counter()
+        async with pool.slots:
+            async with pool.session.get(url, headers=headers, timeout=timeout) as resp:
+                content_type = resp.headers.get("Content-Type", "")
+                resp_headers = dict(resp.headers)
+                status = resp.status
+                final_url = str(resp.url)
+                if status == 304 and cached is not None:
+                    logger.debug("♻️ Not modified (304), re-parsing stored copy: %s", url)
+                    await loop.run_in_executor(None, validators.touch, url)
+                    body = await loop.run_in_executor(
+                        None, store.blob_path(cached.digest).read_bytes
+                    )
+                    html = body.decode("utf-8", errors="replace")
+                elif status >= 400:
+                    logger.warning(f"🌐⚠️ HTTP {status} for page: {url}")
+                    return PageContent(
+                        text="",
+                        links=[],
+                        images=[],
+                        status=status,
+                        retry_after=resp.headers.get("Retry-After"),
+                    )
+                elif "html" not in content_type.lower():
+                    logger.debug("⏭️ Not an HTML page (%s), skipping: %s", content_type, url)
+                    return PageContent(text="", links=[], images=[], status=status)
+                else:
+                    html = await resp.text(errors="replace")
+                    NAVIGATION_SECONDS.observe(time.perf_counter() - started, engine="http")
+                    # Stored as UTF-8 so a later 304 can be decoded without the original charset
+                    body = html.encode("utf-8")
+                    digest = await loop.run_in_executor(None, store.ingest_bytes, url, body)
+                    await loop.run_in_executor(
+                        None, validators.put, url, resp.headers, digest, len(body)
+                    )
+
+        # Parsing is CPU-bound; keep it off the event loop so other workers keep fetching
+        with EXTRACTION_SECONDS.time(engine="http"):
+            page = await loop.run_in_executor(None, parse_html, final_url, html)
+
+        if needs_javascript(html, page.text):
+            renderer = await self._get_renderer()
+            self.rendered_pages += 1
+            return await renderer.fetch_page(url)
+        return page._replace(
+            ready_ms=(time.perf_counter() - started) * 1000,
+            status=status,
+            not_modified=status == 304,
+            html=html,
+            headers=resp_headers,
+        )
@@ -0,0 +1,266 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+from urllib.parse import urlparse
+
+from scraper.config import (
+    CRAWL_MAX_JOBS,
+    CRAWL_MAX_JOBS_PER_DOMAIN,
+    CRAWL_MAX_JOBS_PER_USER,
+    CRAWL_QUEUE_MAX,
+    CRAWL_SHARDS,
+    SCRAPER_CLS,
+)
+from scraper.core.background_loop import run_in_background
+from scraper.core.base import BaseScraper, PageCallback
+from scraper.core.progress import (
+    CANCELLED,
+    ERROR,
+    FINISHED,
+    PAUSED,
+    QUEUED,
+    RUNNING,
+    CrawlProgress,
+    ProgressStore,
+)
+from scraper.core.sharding import ShardedCrawl
+from scraper.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class JobRejected(Exception):
+    """A crawl job was refused by admission control (queue or per-user limit)."""
+
+
+class JobNotFound(Exception):
+    """No active job with that id for this user."""
+
+
+def new_crawler(max_pages: int) -> Union[BaseScraper, ShardedCrawl]:
+    """The configured engine, spread over CRAWL_SHARDS processes when that is above 1."""
+    if CRAWL_SHARDS > 1:
+        return ShardedCrawl(shards=CRAWL_SHARDS, max_pages=max_pages)
+    return SCRAPER_CLS(max_pages=max_pages)
+
+
+class CrawlJob:
+    """One requested crawl and its place in the scheduler."""
+
+    def __init__(
+        self,
+        job_id: str,
+        url: str,
+        user: str,
+        max_pages: int,
+        resume: bool,
+        priority: int,
+    ):
+        self.job_id = job_id
+        self.url = url
+        self.domain = urlparse(url).netloc
+        self.user = user
+        self.max_pages = max_pages
+        self.resume = resume
+        self.priority = priority  # Higher runs first within fairness limits
+        self.state = QUEUED
+        self.submitted = time.time()
+        self.scraper: Optional[Union[BaseScraper, ShardedCrawl]] = None
+        self.task: Optional["asyncio.Task[None]"] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "url": self.url,
+            "state": self.state,
+            "priority": self.priority,
+            "submitted": self.submitted,
+        }
+
+
+class JobScheduler:
+    """
+    Runs crawl jobs on the shared background loop instead of a thread each.
+
+    At most ``max_running`` crawls run at once and ``max_queued`` wait; a user
+    may hold ``per_user`` jobs and a domain is crawled by ``per_domain`` jobs
+    at a time. The next job is the one whose user has the fewest running
+    crawls, then the highest priority, then the oldest. All job state lives
+    on the loop, so the public methods are safe to call from any thread.
+    """
+
+    def __init__(
+        self,
+        progress: ProgressStore,
+        page_callback: Optional[PageCallback] = None,
+        max_running: int = CRAWL_MAX_JOBS,
+        max_queued: int = CRAWL_QUEUE_MAX,
+        per_user: int = CRAWL_MAX_JOBS_PER_USER,
+        per_domain: int = CRAWL_MAX_JOBS_PER_DOMAIN,
+    ):
+        self.progress = progress
+        self.page_callback = page_callback
+        self.max_running = max(1, max_running)
+        self.max_queued = max_queued
+        self.per_user = max(1, per_user)
+        self.per_domain = max(1, per_domain)
+        self._jobs: Dict[str, CrawlJob] = {}  # Queued, running and paused jobs
+
+    # --- Thread-safe API ---
+
+    def submit(
+        self,
+        job_id: str,
+        url: str,
+        user: str,
+        max_pages: int = 50,
+        resume: bool = False,
+        priority: int = 0,
+    ) -> CrawlJob:
+        """Queue a crawl. Raises JobRejected if the queue or the user's quota is full."""
+        job = CrawlJob(job_id, url, user, max_pages, resume, priority)
+        return self._on_loop(self._submit, job)
+
+    def cancel(self, job_id: str, user: Optional[str] = None) -> CrawlJob:
+        return self._on_loop(self._cancel, job_id, user)
+
+    def pause(self, job_id: str, user: Optional[str] = None) -> CrawlJob:
+        return self._on_loop(self._pause, job_id, user)
+
+    def unpause(self, job_id: str, user: Optional[str] = None) -> CrawlJob:
+        return self._on_loop(self._unpause, job_id, user)
+
+    def jobs(self, user: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._on_loop(
+            lambda: [j.to_dict() for j in self._jobs.values() if user in (None, j.user)]
+        )
+
+    def _on_loop(self, fn: Callable[..., Any], *args: Any) -> Any:
+        async def call() -> Any:
+            return fn(*args)
+
+        return run_in_background(call()).result()
+
+    # --- Loop side ---
+
+    def _submit(self, job: CrawlJob) -> CrawlJob:
+        queued = [j for j in self._jobs.values() if j.state == QUEUED]
+        if len(queued) >= self.max_queued:
+            raise JobRejected("The crawl queue is full, please try again later.")
+        if sum(1 for j in self._jobs.values() if j.user == job.user) >= self.per_user:
+            raise JobRejected(f"You already have {self.per_user} crawls queued or running.")
+        self._jobs[job.job_id] = job
+        self.progress.set(
+            job.job_id,
+            CrawlProgress(
+                state=QUEUED,
+                message=f"Queued ({len(queued) + 1} waiting)...",
+                max_pages=job.max_pages,
+            ),
+        )
+        logger.info(f"📥 Queued crawl job {job.job_id} for {job.url}")
+        self._dispatch()
+        return job
+
+    def _find(self, job_id: str, user: Optional[str]) -> CrawlJob:
+        job = self._jobs.get(job_id)
+        if job is None or user not in (None, job.user):
+            raise JobNotFound(job_id)
+        return job
+
+    def _cancel(self, job_id: str, user: Optional[str]) -> CrawlJob:
+        job = self._find(job_id, user)
+        if job.task is not None:
+            job.task.cancel()  # _run reports the cancellation once the crawl has cleaned up
+        else:
+            del self._jobs[job_id]
+            job.state = CANCELLED
+            self.progress.update(job_id, state=CANCELLED, message="Crawl cancelled.")
+        return job
+
+    def _pause(self, job_id: str, user: Optional[str]) -> CrawlJob:
+        job = self._find(job_id, user)
+        if job.state in (QUEUED, RUNNING):
+            if job.scraper is not None:
+                job.scraper.pause()
+            job.state = PAUSED
+            self.progress.update(job_id, state=PAUSED, message="Paused.")
+        return job
+
+    def _unpause(self, job_id: str, user: Optional[str]) -> CrawlJob:
+        job = self._find(job_id, user)
+        if job.state == PAUSED:
+            if job.scraper is not None:
+                job.scraper.unpause()
+                job.state = RUNNING
+                self.progress.update(job_id, state=RUNNING, message="Crawl resumed...")
+            else:
+                job.state = QUEUED
+                self.progress.update(job_id, state=QUEUED, message="Queued...")
+                self._dispatch()
+        return job
+
+    def _dispatch(self) -> None:
+        """Start queued jobs while there are free slots (paused crawls keep theirs)."""
+        while sum(1 for j in self._jobs.values() if j.task is not None) < self.max_running:
+            job = self._next_job()
+            if job is None:
+                return
+            job.state = RUNNING
+            job.scraper = new_crawler(job.max_pages)
+            job.task = asyncio.get_running_loop().create_task(self._run(job))
+            job.task.add_done_callback(lambda _task, job=job: self._done(job))
+
+    def _next_job(self) -> Optional[CrawlJob]:
+        started = [j for j in self._jobs.values() if j.task is not None]
+        candidates = [
+            j
+            for j in self._jobs.values()
+            if j.state == QUEUED
+            and sum(1 for r in started if r.domain == j.domain) < self.per_domain
+        ]
+        if not candidates:
+            return None
+        return min(
+            candidates,
+            key=lambda j: (sum(1 for r in started if r.user == j.user), -j.priority, j.submitted),
+        )
+
+    async def _run(self, job: CrawlJob) -> None:
+        logger.info(f"🏁 Starting crawl job {job.job_id} for {job.url}")
+        self.progress.update(
+            job.job_id,
+            state=job.state,
+            message="Resuming crawl..." if job.resume else "Crawl started...",
+        )
+
+        def report(job_id: str, progress: CrawlProgress) -> None:
+            self.progress.set(job_id, progress._replace(state=job.state))
+
+        assert job.scraper is not None
+        try:
+            await job.scraper.crawl(
+                job.url,
+                status_key=job.job_id,
+                status_callback=report,
+                resume=job.resume,
+                page_callback=self.page_callback,
+            )
+            job.state = FINISHED
+            self.progress.update(job.job_id, state=FINISHED, message="Crawl finished.", eta=0.0)
+        except asyncio.CancelledError:
+            job.state = CANCELLED
+            self.progress.update(
+                job.job_id, state=CANCELLED, message="Crawl cancelled (resumable).", eta=None
+            )
+        except Exception as e:
+            logger.error(f"❌ Crawl job {job.job_id} failed: {e}", exc_info=True)
+            job.state = ERROR
+            self.progress.update(job.job_id, state=ERROR, message=f"Error during crawl: {e}")
+
+    def _done(self, job: CrawlJob) -> None:
+        self._jobs.pop(job.job_id, None)
+        if job.state not in (FINISHED, ERROR, CANCELLED):  # Cancelled before it started
+            job.state = CANCELLED
+            self.progress.update(job.job_id, state=CANCELLED, message="Crawl cancelled.")
+        self._dispatch()
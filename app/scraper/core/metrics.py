@@ -0,0 +1,205 @@
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Seconds; covers fast local fetches up to slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(n, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for n, v in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Metric(ABC):
+    """
+    Base for a named metric family with fixed label names. ``register=False``
+    keeps it out of /metrics, for aggregates owned by one crawl.
+    """
+
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        register: bool = True,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+        if register:
+            REGISTRY.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Exposition lines of every labelled series."""
+
+    def render(self) -> str:
+        header = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(header + self.samples())
+
+
+class Counter(Metric):
+    """A value that only goes up (requests, bytes, cache hits)."""
+
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        register: bool = True,
+    ):
+        super().__init__(name, documentation, labelnames, register)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {v}" for k, v in values]
+
+
+class Histogram(Metric):
+    """Counts observations into cumulative buckets, plus their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        register: bool = True,
+    ):
+        super().__init__(name, documentation, labelnames, register)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: one count per bucket (non-cumulative), then sum and count
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, totals = self._values.setdefault(key, ([0] * len(self.buckets), [0.0, 0.0]))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            totals[0] += value
+            totals[1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall time of the ``with`` block (awaits inside it included)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def totals(self) -> Dict[LabelValues, Tuple[float, int]]:
+        """Sum and count of observations per label set."""
+        with self._lock:
+            return {k: (t[0], int(t[1])) for k, (_, t) in self._values.items()}
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((k, (list(c), list(t))) for k, (c, t) in self._values.items())
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, (counts, (total, count)) in values:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                labels = _format_labels(names, key + (repr(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(names, key + ('+Inf',))} {count:.0f}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count:.0f}")
+        return lines
+
+
+class Registry:
+    """All metrics of this process, rendered in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# --- Crawl stages ---
+PAGES = Counter("scraper_pages_total", "Pages processed by crawl workers.", ["result"])
+NAVIGATION_SECONDS = Histogram(
+    "scraper_navigation_seconds",
+    "Time from request to response body (http) or to the navigation commit (browser).",
+    ["engine"],
+)
+READINESS_SECONDS = Histogram(
+    "scraper_readiness_wait_seconds",
+    "Time spent waiting for a navigated page to become ready.",
+    ["strategy"],
+)
+EXTRACTION_SECONDS = Histogram(
+    "scraper_extraction_seconds", "Time spent extracting text, links and images.", ["engine"]
+)
+ASSET_DOWNLOAD_SECONDS = Histogram(
+    "scraper_asset_download_seconds", "Latency of image and file downloads.", ["status"]
+)
+ASSET_DOWNLOAD_BYTES = Counter(
+    "scraper_asset_download_bytes_total", "Bytes received for image and file downloads."
+)
+THROTTLE_SLEEP_SECONDS = Histogram(
+    "scraper_throttle_sleep_seconds",
+    "Time requests slept for per-host politeness.",
+    ["reason"],
+)
+STORAGE_WRITE_SECONDS = Histogram(
+    "scraper_storage_write_seconds", "Time spent writing crawl output to disk.", ["kind"]
+)
+STORAGE_WRITE_BYTES = Counter(
+    "scraper_storage_write_bytes_total", "Bytes of crawl output written to disk.", ["kind"]
+)
+
+# --- LLM ---
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_seconds",
+    "Latency of LLM API calls, including reading a streamed answer.",
+    ["result"],
+    buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+LLM_CACHE_LOOKUPS = Counter(
+    "llm_cache_lookups_total", "LLM result cache lookups by outcome.", ["result"]
+)
@@ -0,0 +1,118 @@
+import time
+from collections import OrderedDict
+from threading import Condition
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from scraper.config import PROGRESS_MAX_TASKS, PROGRESS_TTL_SECONDS
+
+QUEUED = "queued"
+RUNNING = "running"
+PAUSED = "paused"
+FINISHED = "finished"
+ERROR = "error"
+CANCELLED = "cancelled"
+DONE_STATES = {FINISHED, ERROR, CANCELLED}
+
+
+class CrawlProgress(NamedTuple):
+    """Snapshot of one crawl's progress. Crawlers report a new snapshot per page."""
+
+    state: str = RUNNING
+    message: str = ""
+    pages: int = 0
+    max_pages: int = 0
+    images: int = 0
+    files: int = 0
+    errors: int = 0
+    bytes: int = 0  # Page text plus new assets written to disk
+    eta: Optional[float] = None  # Estimated seconds left
+    updated: float = 0.0
+    version: int = 0  # Bumped by the store on every change
+
+    @property
+    def done(self) -> bool:
+        return self.state in DONE_STATES
+
+    @property
+    def percent(self) -> int:
+        if self.done:
+            return 100
+        return int(self.pages / self.max_pages * 100) if self.max_pages else 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = self._asdict()
+        data["percent"] = self.percent
+        data["finished"] = self.done
+        return data
+
+
+class ProgressStore:
+    """
+    Thread-safe progress snapshots per task id, bounded in size and age.
+
+    Entries idle for longer than ``ttl`` seconds are dropped, and beyond
+    ``max_tasks`` the least recently updated go first, so memory stays flat
+    on long-running servers. ``wait`` blocks until a task changes, which lets
+    the web app push updates instead of having browsers poll.
+    """
+
+    def __init__(self, ttl: float = PROGRESS_TTL_SECONDS, max_tasks: int = PROGRESS_MAX_TASKS):
+        self.ttl = ttl
+        self.max_tasks = max(1, max_tasks)
+        self._tasks: "OrderedDict[str, CrawlProgress]" = OrderedDict()
+        self._changed = Condition()
+
+    def set(self, task_id: str, progress: CrawlProgress) -> CrawlProgress:
+        with self._changed:
+            old = self._tasks.pop(task_id, None)
+            progress = progress._replace(
+                updated=time.time(), version=(old.version + 1) if old else 1
+            )
+            self._tasks[task_id] = progress
+            self._evict()
+            self._changed.notify_all()
+        return progress
+
+    def update(self, task_id: str, **fields: Any) -> CrawlProgress:
+        """Change some fields of a task's snapshot (creating it if missing)."""
+        with self._changed:
+            current = self._tasks.get(task_id) or CrawlProgress()
+            return self.set(task_id, current._replace(**fields))
+
+    def get(self, task_id: str) -> Optional[CrawlProgress]:
+        with self._changed:
+            self._evict()
+            return self._tasks.get(task_id)
+
+    def latest(self) -> Optional[Tuple[str, CrawlProgress]]:
+        """The most recently updated task, if any."""
+        with self._changed:
+            self._evict()
+            if not self._tasks:
+                return None
+            task_id = next(reversed(self._tasks))
+            return task_id, self._tasks[task_id]
+
+    def wait(self, task_id: str, version: int, timeout: float) -> Optional[CrawlProgress]:
+        """
+        Block until the task's snapshot is newer than ``version`` and return it.
+        Returns None on timeout or if the task is unknown.
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                progress = self._tasks.get(task_id)
+                if progress is None or progress.version > version:
+                    return progress
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._changed.wait(remaining)
+
+    def _evict(self) -> None:
+        cutoff = time.time() - self.ttl
+        while self._tasks:
+            task_id, oldest = next(iter(self._tasks.items()))
+            if oldest.updated >= cutoff and len(self._tasks) <= self.max_tasks:
+                break
+            del self._tasks[task_id]
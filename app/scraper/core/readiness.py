@@ -0,0 +1,96 @@
+import asyncio
+import time
+from typing import Optional, Tuple
+
+from playwright.async_api import Error as PlaywrightError  # type: ignore
+from playwright.async_api import Page, Response  # type: ignore
+
+from scraper.config import (
+    READINESS_STRATEGY,
+    READY_MAX_MS,
+    READY_QUIET_MS,
+    READY_SELECTOR,
+    TIMEOUT,
+)
+from scraper.core.metrics import NAVIGATION_SECONDS, READINESS_SECONDS
+from scraper.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+STRATEGIES = ("domcontentloaded", "load", "networkidle", "quiescence", "selector")
+
+# Resolves once the DOM has had no mutations for quietMs (or after maxMs regardless)
+QUIESCENCE_JS = """
+([quietMs, maxMs]) => new Promise((resolve) => {
+  let timer;
+  const observer = new MutationObserver(() => {
+    clearTimeout(timer);
+    timer = setTimeout(done, quietMs);
+  });
+  function done() {
+    observer.disconnect();
+    resolve(true);
+  }
+  observer.observe(document.documentElement, {
+    childList: true, subtree: true, attributes: true, characterData: true,
+  });
+  timer = setTimeout(done, quietMs);
+  setTimeout(done, maxMs);
+})
+"""
+
+
+class Readiness:
+    """
+    Decides when a navigated page is ready for extraction.
+
+      - ``domcontentloaded`` / ``load`` / ``networkidle``: Playwright load states
+      - ``quiescence``: DOMContentLoaded, then no DOM mutations for ``quiet_ms``
+      - ``selector``: DOMContentLoaded, then ``selector`` is attached
+
+    The wait after navigation never exceeds ``max_ms``; a page that is not
+    ready by then is extracted as-is rather than failed.
+    """
+
+    def __init__(
+        self,
+        strategy: str = READINESS_STRATEGY,
+        selector: str = READY_SELECTOR,
+        quiet_ms: int = READY_QUIET_MS,
+        max_ms: int = READY_MAX_MS,
+        nav_timeout_ms: int = TIMEOUT,
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown readiness strategy {strategy!r}, expected {STRATEGIES}")
+        self.strategy = strategy
+        self.selector = selector
+        self.quiet_ms = quiet_ms
+        self.max_ms = max_ms
+        self.nav_timeout_ms = nav_timeout_ms
+
+    @property
+    def wait_until(self) -> str:
+        if self.strategy in ("load", "networkidle"):
+            return self.strategy
+        return "domcontentloaded"
+
+    async def goto(self, page: Page, url: str) -> Tuple[Optional[Response], float]:
+        """Navigate and wait until ready. Returns the main response and readiness time in ms."""
+        started = time.perf_counter()
+        response = await page.goto(url, timeout=self.nav_timeout_ms, wait_until=self.wait_until)
+        navigated = time.perf_counter()
+        NAVIGATION_SECONDS.observe(navigated - started, engine="browser")
+        try:
+            await asyncio.wait_for(self._settle(page), timeout=self.max_ms / 1000)
+        except (asyncio.TimeoutError, PlaywrightError) as e:
+            logger.debug("⏱️ Readiness cap hit for %s (%s): %s", url, self.strategy, e or "timeout")
+        finished = time.perf_counter()
+        READINESS_SECONDS.observe(finished - navigated, strategy=self.strategy)
+        return response, (finished - started) * 1000
+
+    async def _settle(self, page: Page) -> Optional[bool]:
+        if self.strategy == "quiescence":
+            return await page.evaluate(QUIESCENCE_JS, [self.quiet_ms, self.max_ms])
+        if self.strategy == "selector":
+            await page.wait_for_selector(self.selector, state="attached", timeout=self.max_ms)
+        return None
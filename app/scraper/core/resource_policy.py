@@ -0,0 +1,90 @@
+import asyncio
+from typing import Dict, Iterable, Set
+from urllib.parse import urlparse
+
+from playwright.async_api import Request, Response, Route  # type: ignore
+
+from scraper.config import (
+    BLOCKED_RESOURCE_TYPES,
+    BLOCKED_URL_HOSTS,
+    CAPTURE_MAX_BYTES,
+)
+from scraper.logging_config import get_logger
+from scraper.utils.url_utils import DOC_EXTS
+
+logger = get_logger(__name__)
+
+
+class ResourcePolicy:
+    """
+    ``page.route`` handler that aborts requests the crawl never uses:
+    resource types such as fonts and media, and known analytics/tracker hosts.
+    """
+
+    def __init__(
+        self,
+        blocked_types: Iterable[str] = BLOCKED_RESOURCE_TYPES,
+        blocked_hosts: Iterable[str] = BLOCKED_URL_HOSTS,
+    ):
+        self.blocked_types: Set[str] = {t.strip() for t in blocked_types if t.strip()}
+        self.blocked_hosts = tuple(h.strip().lower() for h in blocked_hosts if h.strip())
+        self.blocked = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.blocked_types or self.blocked_hosts)
+
+    def should_block(self, request: Request) -> bool:
+        if request.resource_type in self.blocked_types:
+            return True
+        host = urlparse(request.url).hostname or ""
+        return any(host == h or host.endswith("." + h) for h in self.blocked_hosts)
+
+    async def handle_route(self, route: Route) -> None:
+        if self.should_block(route.request):
+            self.blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+
+class AssetCapture:
+    """
+    Keeps the bodies of image and document responses a page already loaded,
+    so storage can write them without downloading the same bytes again.
+    """
+
+    def __init__(self, max_bytes: int = CAPTURE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bodies: Dict[str, bytes] = {}
+        self._pending: Set["asyncio.Task[None]"] = set()
+
+    def on_response(self, response: Response) -> None:
+        if response.status != 200 or not self._wanted(response):
+            return
+        task = asyncio.ensure_future(self._grab(response))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _wanted(self, response: Response) -> bool:
+        length = response.headers.get("content-length")
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            return False
+        if response.request.resource_type == "image":
+            return True
+        return urlparse(response.url).path.lower().endswith(DOC_EXTS)
+
+    async def _grab(self, response: Response) -> None:
+        try:
+            body = await response.body()
+        except Exception as e:  # Page navigated away or body was evicted
+            logger.debug("📥⚠️ Could not capture %s: %s", response.url, e)
+            return
+        if len(body) <= self.max_bytes:
+            self.bodies[response.url] = body
+
+    async def drain(self) -> Dict[str, bytes]:
+        """Wait for in-progress body reads (call before closing the page)."""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+        return self.bodies
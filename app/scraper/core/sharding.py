@@ -0,0 +1,619 @@
+import asyncio
+import hashlib
+import multiprocessing
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+from urllib.parse import urlparse
+
+from scraper.config import (
+    CRAWL_SHARDS,
+    CRAWL_WORKERS,
+    FRONTIER_MAX_DEPTH,
+    FRONTIER_STRATEGY,
+    SCRAPER_CLS,
+)
+from scraper.core.archive import get_page_archive
+from scraper.core.base import PageCallback, ProgressCallback
+from scraper.core.browser_pool import close_browser_pool
+from scraper.core.checkpoint import CrawlCheckpoint
+from scraper.core.frontier import GROUPED_EDGES, Frontier, FrontierItem, group_edges
+from scraper.core.progress import CrawlProgress
+from scraper.core.storage import BASE_DIR, save_link_graph
+from scraper.logging_config import get_logger
+from scraper.utils.throttling import HostState, PolitenessScheduler, set_scheduler
+from scraper.utils.url_utils import normalize_url
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+SHARD_POLL_SECONDS = 0.2  # How often idle shards look for work handed over by others
+SHARD_REPORT_SECONDS = 0.5  # How often the coordinator merges shard progress
+SHARD_STOP_GRACE = 30  # Seconds shards get to wind down after a cancel
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    shard INTEGER NOT NULL,
+    parent TEXT,
+    depth INTEGER NOT NULL,
+    taken INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS urls_pending ON urls (shard, taken);
+CREATE TABLE IF NOT EXISTS edges (parent TEXT, child TEXT, PRIMARY KEY (parent, child));
+CREATE TABLE IF NOT EXISTS shards (
+    shard INTEGER PRIMARY KEY,
+    idle INTEGER NOT NULL DEFAULT 0,
+    pages INTEGER NOT NULL DEFAULT 0,
+    images INTEGER NOT NULL DEFAULT 0,
+    files INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS hosts (
+    host TEXT PRIMARY KEY,
+    delay REAL NOT NULL,
+    min_delay REAL NOT NULL,
+    next_slot REAL NOT NULL,
+    blocked_until REAL NOT NULL,
+    raised_at REAL NOT NULL
+);
+"""
+
+# Links found on one page: parent, (url, owner shard) pairs, depth, whether to queue them
+Offer = Tuple[Optional[str], List[Tuple[str, int]], int, bool]
+
+
+def shard_for(url: str, shards: int) -> int:
+    """Stable owner of a URL: every process maps it to the same shard."""
+    return int(hashlib.sha1(url.encode("utf-8")).hexdigest()[:8], 16) % shards
+
+
+class ShardDB:
+    """
+    The crawl state shard processes share: one SQLite file in WAL mode.
+
+    ``urls`` is the global dedup set and the hand-over queue (rows a shard
+    has not ``taken`` yet), ``meta`` holds the page budget and control flags
+    and ``shards`` each process's idle flag and counters, ``hosts`` the
+    politeness state of every host. A shard takes rows and clears its idle
+    flag in one transaction, so "every shard idle and nothing left to take"
+    reliably means the crawl is done.
+
+    Methods block on SQLite; event loop code goes through ``run`` and
+    ``submit``, which queue them on one thread per process.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(
+            str(path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shard-db")
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Await a ShardDB call made on the database thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args))
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> None:
+        """Queue a ShardDB write nobody waits for; calls run in submission order."""
+        self._executor.submit(fn, *args).add_done_callback(_log_failure)
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def reset(self, start_url: str, shards: int, max_pages: int, paused: bool = False) -> None:
+        with self._write() as db:
+            for table in ("meta", "urls", "edges", "shards", "hosts"):
+                db.execute(f"DELETE FROM {table}")
+            db.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [("max_pages", max_pages), ("budget", 0), ("stop", 0), ("paused", int(paused))],
+            )
+            db.executemany("INSERT INTO shards (shard) VALUES (?)", [(i,) for i in range(shards)])
+            db.execute(
+                "INSERT INTO urls (url, shard, parent, depth) VALUES (?, ?, NULL, 0)",
+                (start_url, shard_for(start_url, shards)),
+            )
+
+    def offer(self, shard: int, offers: List[Offer]) -> List[FrontierItem]:
+        """
+        Record parent→url edges and, where ``queue`` is set, add unseen URLs for
+        their owners, all in one transaction. URLs this shard owns are taken
+        straight away and returned.
+        """
+        own: List[FrontierItem] = []
+        with self._write() as db:
+            for parent, urls, depth, queue in offers:
+                if parent is not None:
+                    db.executemany(
+                        "INSERT OR IGNORE INTO edges (parent, child) VALUES (?, ?)",
+                        [(parent, url) for url, _ in urls],
+                    )
+                if not queue:
+                    continue
+                for url, owner in urls:
+                    cur = db.execute(
+                        "INSERT OR IGNORE INTO urls (url, shard, parent, depth, taken) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (url, owner, parent, depth, int(owner == shard)),
+                    )
+                    if cur.rowcount == 1 and owner == shard:
+                        own.append((url, parent, depth))
+        return own
+
+    def take(self, shard: int, limit: int = 500) -> List[FrontierItem]:
+        """Claim URLs other shards handed to this one (marks the shard busy)."""
+        with self._write() as db:
+            rows = db.execute(
+                "SELECT url, parent, depth FROM urls WHERE shard = ? AND taken = 0 LIMIT ?",
+                (shard, limit),
+            ).fetchall()
+            if rows:
+                db.executemany("UPDATE urls SET taken = 1 WHERE url = ?", [(r[0],) for r in rows])
+                db.execute("UPDATE shards SET idle = 0 WHERE shard = ?", (shard,))
+        return [tuple(r) for r in rows]  # type: ignore[misc]
+
+    def go_idle(self, shard: int) -> bool:
+        """Mark the shard idle unless work for it arrived meanwhile."""
+        with self._write() as db:
+            if (
+                not self._budget_spent(db)
+                and db.execute(
+                    "SELECT 1 FROM urls WHERE shard = ? AND taken = 0 LIMIT 1", (shard,)
+                ).fetchone()
+            ):
+                return False
+            db.execute("UPDATE shards SET idle = 1 WHERE shard = ?", (shard,))
+        return True
+
+    def finished(self) -> bool:
+        """True once the crawl is stopped, or every shard is idle with nothing left to take."""
+        with self._write() as db:  # One snapshot: idle flags and queue must agree
+            if db.execute("SELECT value FROM meta WHERE key = 'stop'").fetchone()[0]:
+                return True
+            if db.execute("SELECT 1 FROM shards WHERE idle = 0 LIMIT 1").fetchone():
+                return False
+            pending = db.execute("SELECT 1 FROM urls WHERE taken = 0 LIMIT 1").fetchone()
+            return not pending or self._budget_spent(db)
+
+    def claim(self) -> bool:
+        """Take one page from the crawl-wide budget."""
+        with self._write() as db:
+            cur = db.execute(
+                "UPDATE meta SET value = value + 1 WHERE key = 'budget' "
+                "AND value < (SELECT value FROM meta WHERE key = 'max_pages')"
+            )
+        return cur.rowcount == 1
+
+    def unclaim(self) -> None:
+        """Return one page to the crawl-wide budget."""
+        with self._write() as db:
+            db.execute("UPDATE meta SET value = MAX(0, value - 1) WHERE key = 'budget'")
+
+    def budget_spent(self) -> bool:
+        """Whether the whole crawl-wide budget is claimed."""
+        with self._lock:
+            return self._budget_spent(self._db)
+
+    def _budget_spent(self, db: sqlite3.Connection) -> bool:
+        meta = dict(db.execute("SELECT key, value FROM meta WHERE key IN ('budget', 'max_pages')"))
+        return meta.get("budget", 0) >= meta.get("max_pages", 0)
+
+    def flag(self, key: str) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return bool(row and row[0])
+
+    def set_flag(self, key: str, value: bool) -> None:
+        with self._write() as db:
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, int(value)))
+
+    def report(self, shard: int, progress: CrawlProgress) -> None:
+        with self._write() as db:
+            db.execute(
+                "UPDATE shards SET pages = ?, images = ?, files = ?, errors = ?, bytes = ? "
+                "WHERE shard = ?",
+                (
+                    progress.pages,
+                    progress.images,
+                    progress.files,
+                    progress.errors,
+                    progress.bytes,
+                    shard,
+                ),
+            )
+
+    @contextmanager
+    def host_state(self, host: str, delay: float, min_delay: float) -> Iterator[HostState]:
+        """A host's politeness state, written back when the ``with`` block ends."""
+        with self._write() as db:
+            state = HostState(delay, min_delay)
+            row = db.execute(
+                "SELECT delay, min_delay, next_slot, blocked_until, raised_at "
+                "FROM hosts WHERE host = ?",
+                (host,),
+            ).fetchone()
+            if row:
+                (
+                    state.delay,
+                    state.min_delay,
+                    state.next_slot,
+                    state.blocked_until,
+                    state.raised_at,
+                ) = row
+            yield state
+            db.execute(
+                "INSERT OR REPLACE INTO hosts VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    host,
+                    state.delay,
+                    state.min_delay,
+                    state.next_slot,
+                    state.blocked_until,
+                    state.raised_at,
+                ),
+            )
+
+    def totals(self) -> Dict[str, int]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT SUM(pages), SUM(images), SUM(files), SUM(errors), SUM(bytes) FROM shards"
+            ).fetchone()
+            pending = self._db.execute("SELECT COUNT(*) FROM urls WHERE taken = 0").fetchone()[0]
+        keys = ("pages", "images", "files", "errors", "bytes")
+        totals = {key: int(value or 0) for key, value in zip(keys, row)}
+        totals["pending"] = pending
+        return totals
+
+    def graph(self) -> Iterator[Tuple[str, List[str]]]:
+        """(page, children) pairs of the crawl-wide link graph, read from the database."""
+        return group_edges(self._db.execute(GROUPED_EDGES))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)  # Writes submitted so far still land
+        self._db.close()
+
+
+def _log_failure(future: "Future[Any]") -> None:
+    if future.exception() is not None:
+        logger.error(f"🧩❌ Shard database write failed: {future.exception()}")
+
+
+class SharedScheduler(PolitenessScheduler):
+    """
+    A shard's politeness scheduler: host state lives in the ShardDB, so all
+    shards space their requests to a host together instead of each at the
+    full polite rate. Slots use ``time.monotonic``, which is one clock for
+    every process on the machine.
+    """
+
+    def __init__(self, db: ShardDB, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.db = db
+
+    @contextmanager
+    def _host(self, host: str) -> Iterator[HostState]:
+        with self.db.host_state(host, self.start_delay, self.min_delay) as state:
+            yield state
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        return await self.db.run(fn, *args)
+
+    def _apply(self, fn: Callable[..., Any], *args: Any) -> None:
+        self.db.submit(fn, *args)
+
+
+class SharedFrontier(Frontier):
+    """
+    A shard's frontier: URLs are deduplicated crawl-wide in the ShardDB and
+    only the ones this shard owns are queued locally; the rest wait in the
+    database for their owner. ``join`` returns when the whole crawl is done.
+
+    Links are buffered and offered to the database in batches off the event
+    loop, so ``add`` and ``add_links`` count the URLs handed over, not the
+    ones that turn out to be new.
+    """
+
+    def __init__(
+        self,
+        db: ShardDB,
+        shard: int,
+        shards: int,
+        strategy: str = "bfs",
+        max_depth: Optional[int] = None,
+    ):
+        super().__init__(strategy=strategy, max_depth=max_depth)
+        self.db = db
+        self.shard = shard
+        self.shards = shards
+        self._offers: List[Offer] = []
+        self._flushing: Optional[asyncio.Task] = None
+
+    def add(self, url: str, parent: Optional[str] = None, depth: int = 0) -> bool:
+        return self._offer(parent, [url], depth) > 0
+
+    def add_links(self, parent: Optional[str], links: List[str], depth: int) -> int:
+        return self._offer(parent, links, depth)
+
+    def _offer(self, parent: Optional[str], links: List[str], depth: int) -> int:
+        urls = list(dict.fromkeys(normalize_url(link) for link in links))
+        within_depth = self.max_depth is None or depth <= self.max_depth
+        owned = [(url, shard_for(url, self.shards)) for url in urls]
+        self._offers.append((parent, owned, depth, within_depth))
+        if self._flushing is None or self._flushing.done():
+            self._flushing = asyncio.ensure_future(self._flush())
+        return len(urls)
+
+    async def _flush(self) -> None:
+        """Offer buffered links until none are left; pages found meanwhile join the batch."""
+        while self._offers:
+            offers, self._offers = self._offers, []
+            for item in await self.db.run(self.db.offer, self.shard, offers):
+                self.put_nowait(item)
+
+    async def join(self) -> None:
+        while True:
+            for item in await self.db.run(self.db.take, self.shard):
+                self.put_nowait(item)
+            await super().join()
+            if self._flushing is not None:
+                await self._flushing  # Own links may still be on their way back
+                if not self.empty():
+                    continue
+            if await self.db.run(self._go_idle):
+                return
+            await asyncio.sleep(SHARD_POLL_SECONDS)
+
+    def _go_idle(self) -> bool:
+        return self.db.go_idle(self.shard) and self.db.finished()
+
+
+class ShardWorkerMixin:
+    """Turns an engine into one shard of a ShardedCrawl; mix in before the engine class."""
+
+    shard_db: ShardDB
+    shard: int
+    shards: int
+
+    def _new_frontier(self) -> Frontier:
+        return SharedFrontier(
+            self.shard_db, self.shard, self.shards, self.strategy, self.max_depth  # type: ignore
+        )
+
+    def _new_checkpoint(self, start_url: str) -> CrawlCheckpoint:
+        return CrawlCheckpoint(
+            f"{start_url}#shard{self.shard}", BASE_DIR, archive=get_page_archive(BASE_DIR)
+        )
+
+    async def _claim_page(self, url: str) -> bool:
+        while True:
+            claimed = await self.shard_db.run(self._claim)
+            if claimed is not None:
+                return claimed
+            await asyncio.sleep(SHARD_REPORT_SECONDS)
+
+    def _claim(self) -> Optional[bool]:
+        """None while the crawl is paused, else whether a page of the budget was claimed."""
+        db = self.shard_db
+        if db.flag("stop"):
+            return False
+        return None if db.flag("paused") else db.claim()
+
+    async def _unclaim_page(self, url: str) -> None:
+        self.shard_db.submit(self.shard_db.unclaim)
+
+    async def _budget_left(self) -> bool:
+        db = self.shard_db
+        return not await db.run(lambda: db.flag("stop") or db.budget_spent())
+
+    def _save_link_graph(self, domain: str) -> None:
+        """The coordinator writes the merged graph."""
+
+    async def _seed_frontier(self, start_url: str, domain: str) -> None:
+        """Only the first shard reads the sitemaps; the ShardDB hands URLs to their owners."""
+        if self.shard == 0:
+            await super()._seed_frontier(start_url, domain)  # type: ignore
+
+
+def run_shard(
+    db_path: str,
+    shard: int,
+    shards: int,
+    start_url: str,
+    max_pages: int,
+    workers: int,
+    strategy: str,
+    max_depth: Optional[int],
+) -> None:
+    """Entry point of one shard process."""
+    db = ShardDB(Path(db_path))
+    set_scheduler(SharedScheduler(db))  # Page fetches and downloads alike
+    cls = type(f"Sharded{SCRAPER_CLS.__name__}", (ShardWorkerMixin, SCRAPER_CLS), {})
+    crawler = cls(max_pages=max_pages, workers=workers, strategy=strategy, max_depth=max_depth)
+    crawler.shard_db = db
+    crawler.shard = shard
+    crawler.shards = shards
+
+    async def main() -> None:
+        try:
+            await crawler.crawl(
+                start_url,
+                status_key=f"shard{shard}",
+                status_callback=lambda _key, progress: db.submit(db.report, shard, progress),
+            )
+        finally:
+            await close_browser_pool()
+            db.close()
+
+    logger.info(f"🧩 Shard {shard + 1}/{shards} starting...")
+    asyncio.run(main())
+
+
+class ShardedCrawl:
+    """
+    One crawl spread over ``shards`` worker processes, each running the
+    configured engine on the URLs that hash to it.
+
+    Shards share dedup, hand-over queue and page budget through a ShardDB;
+    this coordinator seeds it, merges shard progress for ``status_callback``
+    and writes the merged link graph. Politeness state is shared too, so a
+    host sees the same request rate as from a single process. A shard that
+    dies stops the whole crawl, as its URLs would never be crawled.
+    """
+
+    def __init__(
+        self,
+        shards: int = CRAWL_SHARDS,
+        max_pages: int = 50,
+        workers: int = CRAWL_WORKERS,
+        strategy: str = FRONTIER_STRATEGY,
+        max_depth: Optional[int] = FRONTIER_MAX_DEPTH,
+    ):
+        self.shards = max(1, shards)
+        self.max_pages = max_pages
+        self.workers = workers
+        self.strategy = strategy
+        self.max_depth = max_depth
+        self._paused = False
+        self._db: Optional[ShardDB] = None
+
+    def pause(self) -> None:
+        self._paused = True
+        if self._db is not None:  # Queued behind the ShardDB's other writes, in order
+            self._db.submit(self._db.set_flag, "paused", True)
+
+    def unpause(self) -> None:
+        self._paused = False
+        if self._db is not None:
+            self._db.submit(self._db.set_flag, "paused", False)
+
+    async def crawl(
+        self,
+        start_url: str,
+        status_key: Optional[str] = None,
+        status_callback: Optional[ProgressCallback] = None,
+        resume: bool = False,
+        page_callback: Optional[PageCallback] = None,
+    ) -> None:
+        if resume:
+            logger.warning("⏯️ Sharded crawls cannot resume from a checkpoint, starting fresh.")
+        if page_callback is not None:
+            logger.warning("🧩 Page callbacks do not reach shard processes and are skipped.")
+        start_url = start_url if start_url.startswith("http") else f"http://{start_url}"
+        start_url = normalize_url(start_url)
+        domain = urlparse(start_url).netloc
+        key = hashlib.sha1(start_url.encode("utf-8")).hexdigest()[:16]
+        loop = asyncio.get_running_loop()
+        path = BASE_DIR / ".shards" / f"{key}.sqlite"
+        self._db = db = await loop.run_in_executor(None, ShardDB, path)
+        await db.run(db.reset, start_url, self.shards, self.max_pages, self._paused)
+
+        logger.info(f"🧩 Starting sharded crawl of {start_url} across {self.shards} processes")
+        ctx = multiprocessing.get_context("spawn")  # Playwright and threads do not survive fork
+        procs = [
+            ctx.Process(
+                target=run_shard,
+                args=(
+                    str(db.path),
+                    shard,
+                    self.shards,
+                    start_url,
+                    self.max_pages,
+                    self.workers,
+                    self.strategy,
+                    self.max_depth,
+                ),
+                name=f"crawl-shard-{shard}",
+                daemon=True,
+            )
+            for shard in range(self.shards)
+        ]
+        for proc in procs:
+            proc.start()
+        started = time.monotonic()
+        try:
+            while any(proc.is_alive() for proc in procs):
+                await asyncio.sleep(SHARD_REPORT_SECONDS)
+                await self._report(started, status_key, status_callback)
+                failed = [proc.name for proc in procs if proc.exitcode]
+                if failed:
+                    # A dead shard never goes idle, so the others would wait for it forever
+                    logger.error(f"🧩❌ Shard process failed ({', '.join(failed)}), stopping crawl")
+                    await db.run(db.set_flag, "stop", True)
+                    await loop.run_in_executor(None, _join_all, procs, SHARD_STOP_GRACE)
+                    break
+        except asyncio.CancelledError:
+            await db.run(db.set_flag, "stop", True)
+            await loop.run_in_executor(None, _join_all, procs, SHARD_STOP_GRACE)
+            raise
+        finally:
+            for proc in procs:
+                if proc.is_alive():
+                    proc.terminate()
+            await self._report(started, status_key, status_callback)
+            await db.run(lambda: save_link_graph(domain, db.graph()))
+            self._db = None  # Pausing from here on has nothing to write to
+            await loop.run_in_executor(None, db.close)
+        failed = [proc.name for proc in procs if proc.exitcode]
+        if failed:
+            raise RuntimeError(f"Shard processes failed: {', '.join(failed)}")
+        logger.info("🛑 Sharded crawl finished.")
+
+    async def _report(
+        self,
+        started: float,
+        status_key: Optional[str],
+        status_callback: Optional[ProgressCallback],
+    ) -> None:
+        if not (status_callback and status_key and self._db is not None):
+            return
+        totals = await self._db.run(self._db.totals)
+        eta = None
+        if totals["pages"]:
+            remaining = min(self.max_pages - totals["pages"], totals["pending"])
+            eta = (time.monotonic() - started) / totals["pages"] * max(0, remaining)
+        status_callback(
+            status_key,
+            CrawlProgress(
+                message=(
+                    f"Crawled {totals['pages']} of {self.max_pages} | "
+                    f"Images: {totals['images']} | Files: {totals['files']} | "
+                    f"Shards: {self.shards}"
+                ),
+                pages=totals["pages"],
+                max_pages=self.max_pages,
+                images=totals["images"],
+                files=totals["files"],
+                errors=totals["errors"],
+                bytes=totals["bytes"],
+                eta=eta,
+            ),
+        )
+
+
+def _join_all(procs: List[multiprocessing.process.BaseProcess], timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    for proc in procs:
+        proc.join(max(0.0, deadline - time.monotonic()))
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from scraper.config import NEAR_DUP_DISTANCE, NEAR_DUP_SHINGLE
+
+_WORD = re.compile(r"\w+")
+
+BITS = 64
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+def words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def simhash(text: str, shingle: int = NEAR_DUP_SHINGLE) -> int:
+    """
+    64-bit SimHash of a text over overlapping ``shingle``-word features.
+
+    Similar texts get fingerprints that differ in few bits, so the Hamming
+    distance of two fingerprints estimates how different the texts are.
+    """
+    tokens = words(text)
+    if len(tokens) <= shingle:
+        features = {" ".join(tokens)}
+    else:
+        features = {" ".join(gram) for gram in zip(*(tokens[i:] for i in range(shingle)))}
+    hashes = [_feature_hash(f) for f in features]
+    votes = [0] * BITS
+    for h in hashes:
+        for bit in range(BITS):
+            votes[bit] += (h >> bit) & 1
+    half = len(hashes) / 2
+    return sum(1 << bit for bit in range(BITS) if votes[bit] > half)
+
+
+def distance(a: int, b: int) -> int:
+    """Hamming distance of two fingerprints."""
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """
+    Finds a stored fingerprint within ``max_distance`` bits of a query.
+
+    Fingerprints are split into ``max_distance + 1`` bit blocks; two within
+    the distance must agree on at least one whole block (pigeonhole), so a
+    lookup only compares against fingerprints sharing a block with the query
+    instead of scanning them all.
+
+    The block tables hold (fingerprint, page id) pairs in flat integer arrays;
+    the URL behind an id is only needed for a match, so URLs go to a
+    temporary SQLite file ``buffer`` at a time instead of staying in memory.
+    """
+
+    def __init__(self, max_distance: int = NEAR_DUP_DISTANCE, buffer: int = 1000):
+        self.max_distance = max(0, min(max_distance, BITS - 1))
+        self.buffer = max(1, buffer)
+        blocks = self.max_distance + 1
+        width = BITS // blocks
+        self._blocks: List[Tuple[int, int]] = [  # (shift, mask)
+            (i * width, (1 << (width if i < blocks - 1 else BITS - i * width)) - 1)
+            for i in range(blocks)
+        ]
+        # block value → fingerprint, id, fingerprint, id, ...
+        self._tables: List[Dict[int, "array[int]"]] = [{} for _ in range(blocks)]
+        self._urls: Dict[int, str] = {}  # Not yet written to disk
+        self._db: Optional[sqlite3.Connection] = None
+        self._path: Optional[str] = None
+        self._len = 0
+
+    def add(self, fingerprint: int, url: str) -> None:
+        page = self._len
+        for (shift, mask), table in zip(self._blocks, self._tables):
+            entries = table.get((fingerprint >> shift) & mask)
+            if entries is None:
+                entries = table[(fingerprint >> shift) & mask] = array("Q")
+            entries.extend((fingerprint, page))
+        self._urls[page] = url
+        if len(self._urls) >= self.buffer:
+            self._spill()
+        self._len += 1
+
+    def find(
+        self, fingerprint: int, max_distance: Optional[int] = None
+    ) -> Optional[Tuple[str, int]]:
+        """The closest stored (url, distance) within ``max_distance`` bits, if any."""
+        limit = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        best: Optional[Tuple[int, int]] = None  # (page id, distance)
+        for (shift, mask), table in zip(self._blocks, self._tables):
+            entries = table.get((fingerprint >> shift) & mask, ())
+            for stored, page in zip(entries[::2], entries[1::2]):
+                d = distance(fingerprint, stored)
+                if d <= limit and (best is None or d < best[1]):
+                    best = (page, d)
+                    if d == 0:
+                        return self._url(page), 0
+        return (self._url(best[0]), best[1]) if best is not None else None
+
+    def _spill(self) -> None:
+        if self._db is None:
+            fd, self._path = tempfile.mkstemp(prefix="simhash-", suffix=".sqlite")
+            os.close(fd)
+            # Resumed crawls refill the index on the executor, then use it on the loop
+            self._db = sqlite3.connect(self._path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=OFF")
+            self._db.execute("PRAGMA synchronous=OFF")
+            self._db.execute("CREATE TABLE urls (page INTEGER PRIMARY KEY, url TEXT)")
+        self._db.executemany("INSERT INTO urls VALUES (?, ?)", self._urls.items())
+        self._urls = {}
+
+    def _url(self, page: int) -> str:
+        url = self._urls.get(page)
+        if url is None:
+            assert self._db is not None
+            url = self._db.execute("SELECT url FROM urls WHERE page = ?", (page,)).fetchone()[0]
+        return url
+
+    def close(self) -> None:
+        """Drop the URL file, if any."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        if self._path is not None:
+            os.unlink(self._path)
+            self._path = None
+
+    def __len__(self) -> int:
+        return self._len
@@ -0,0 +1,274 @@
+import asyncio
+import re
+import time
+import zlib
+from datetime import datetime, timezone
+from threading import Lock
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Pattern, Tuple
+from urllib.parse import urljoin, urlparse
+from xml.etree import ElementTree
+
+import aiohttp
+
+from scraper.config import (
+    ROBOTS_CACHE_SECONDS,
+    ROBOTS_ERROR_SECONDS,
+    ROBOTS_MAX_BYTES,
+    ROBOTS_USER_AGENT,
+    SITEMAP_MAX_BYTES,
+    SITEMAP_MAX_FILES,
+    SITEMAP_MAX_URLS,
+    TIMEOUT,
+)
+from scraper.core.http_pool import get_http_pool
+from scraper.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# (allow, pattern length, compiled pattern)
+Rule = Tuple[bool, int, Pattern[str]]
+
+
+def _compile(pattern: str) -> Pattern[str]:
+    """robots.txt path pattern: ``*`` matches anything, a trailing ``$`` anchors the end."""
+    anchored = pattern.endswith("$")
+    body = re.escape(pattern[:-1] if anchored else pattern).replace(r"\*", ".*")
+    return re.compile(body + (r"\Z" if anchored else ""))
+
+
+class RobotsRules:
+    """The robots.txt rules of one host that apply to our user agent (RFC 9309)."""
+
+    def __init__(
+        self,
+        rules: Optional[List[Rule]] = None,
+        crawl_delay: Optional[float] = None,
+        sitemaps: Optional[List[str]] = None,
+        disallow_all: bool = False,
+        unavailable: bool = False,
+    ):
+        self.rules = rules or []
+        self.crawl_delay = crawl_delay
+        self.sitemaps = sitemaps or []
+        self.disallow_all = disallow_all
+        self.unavailable = unavailable  # robots.txt could not be fetched; retry later
+
+    def allowed(self, url: str) -> bool:
+        """Longest matching rule wins; on a tie ``Allow`` wins. No match means allowed."""
+        parsed = urlparse(url)
+        path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+        if path == "/robots.txt":
+            return True
+        if self.disallow_all:
+            return False
+        best = -1
+        allow = True
+        for rule_allow, length, pattern in self.rules:
+            if (length > best or (length == best and rule_allow)) and pattern.match(path):
+                best, allow = length, rule_allow
+        return allow
+
+
+def parse_robots(text: str, user_agent: str = ROBOTS_USER_AGENT) -> RobotsRules:
+    """Rules of the groups naming ``user_agent``, else of the ``*`` groups."""
+    groups: List[Tuple[List[str], List[Tuple[str, str]]]] = []
+    sitemaps: List[str] = []
+    in_rules = False
+    for raw in text.splitlines():
+        line = raw.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        field, value = (part.strip() for part in line.split(":", 1))
+        field = field.lower()
+        if field == "sitemap":
+            if value:
+                sitemaps.append(value)
+        elif field == "user-agent":
+            if in_rules or not groups:  # A user-agent line after rules starts a new group
+                groups.append(([], []))
+                in_rules = False
+            groups[-1][0].append(value.lower())
+        elif field in ("allow", "disallow", "crawl-delay") and groups:
+            in_rules = True
+            groups[-1][1].append((field, value))
+
+    agent = user_agent.lower()
+    matched = [lines for agents, lines in groups if agent != "*" and agent in agents]
+    if not matched:
+        matched = [lines for agents, lines in groups if "*" in agents]
+
+    rules: List[Rule] = []
+    crawl_delay: Optional[float] = None
+    for lines in matched:
+        for field, value in lines:
+            if field == "crawl-delay":
+                try:
+                    crawl_delay = max(crawl_delay or 0.0, float(value))
+                except ValueError:
+                    pass
+            elif value:  # An empty Disallow allows everything
+                rules.append((field == "allow", len(value), _compile(value)))
+    return RobotsRules(rules, crawl_delay, sitemaps)
+
+
+def _origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+async def fetch_robots(origin: str) -> Tuple[RobotsRules, float]:
+    """Fetch and parse ``origin``'s robots.txt. Returns the rules and how long to cache them."""
+    url = f"{origin}/robots.txt"
+    pool = get_http_pool()
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT / 1000)
+    try:
+        async with pool.slots:
+            async with pool.session.get(url, timeout=timeout) as resp:
+                status = resp.status
+                body = await resp.content.read(ROBOTS_MAX_BYTES) if status < 400 else b""
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        # Unreachable robots.txt: assume complete disallow for now (RFC 9309 2.3.1.4)
+        logger.warning(f"🤖⚠️ Could not fetch {url} ({e}); not crawling {origin} for now.")
+        return RobotsRules(disallow_all=True, unavailable=True), ROBOTS_ERROR_SECONDS
+    if status >= 500:
+        logger.warning(f"🤖⚠️ {url} returned {status}; not crawling {origin} for now.")
+        return RobotsRules(disallow_all=True, unavailable=True), ROBOTS_ERROR_SECONDS
+    if status >= 400:
+        logger.info(f"🤖 No robots.txt on {origin} ({status}), everything allowed.")
+        return RobotsRules(), ROBOTS_CACHE_SECONDS
+    rules = parse_robots(body.decode("utf-8", errors="replace"))
+    logger.info(
+        f"🤖 robots.txt of {origin}: {len(rules.rules)} rules, "
+        f"crawl-delay {rules.crawl_delay or 'none'}, {len(rules.sitemaps)} sitemaps"
+    )
+    return rules, ROBOTS_CACHE_SECONDS
+
+
+_robots: Dict[str, Tuple[float, RobotsRules]] = {}  # origin → (expires, rules)
+_robots_lock = Lock()
+
+
+async def get_robots(url: str) -> RobotsRules:
+    """The robots.txt rules of ``url``'s host, cached per host for this process."""
+    origin = _origin(url)
+    with _robots_lock:
+        cached = _robots.get(origin)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    rules, ttl = await fetch_robots(origin)
+    with _robots_lock:
+        _robots[origin] = (time.monotonic() + ttl, rules)
+    return rules
+
+
+class SitemapEntry(NamedTuple):
+    """A ``<url>`` of a sitemap or a ``<sitemap>`` of a sitemap index."""
+
+    loc: str
+    lastmod: Optional[float]  # Unix time
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[float]:
+    """W3C datetime (``2024-05-01`` or ``2024-05-01T10:00:00+00:00``) to Unix time."""
+    if not value:
+        return None
+    value = value.strip().replace("Z", "+00:00")
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _newest_first(entries: List[SitemapEntry]) -> List[SitemapEntry]:
+    return sorted(entries, key=lambda e: -(e.lastmod or 0.0))
+
+
+async def read_sitemap(url: str) -> Tuple[List[SitemapEntry], List[SitemapEntry]]:
+    """
+    Fetch one sitemap and return its (page, child sitemap) entries.
+
+    The body is parsed while it downloads, inflated on the fly if gzipped,
+    and cut off past ``SITEMAP_MAX_BYTES`` of XML.
+    """
+    pages: List[SitemapEntry] = []
+    children: List[SitemapEntry] = []
+    parser = ElementTree.XMLPullParser(events=("start", "end"))
+    root: Optional[ElementTree.Element] = None
+    loc: Optional[str] = None
+    lastmod: Optional[str] = None
+    inflate: Optional["zlib._Decompress"] = None
+    size = 0
+    pool = get_http_pool()
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT / 1000)
+    try:
+        async with pool.slots:
+            async with pool.session.get(url, timeout=timeout) as resp:
+                if resp.status != 200:
+                    logger.debug("🗺️ Sitemap %s returned %d, skipping.", url, resp.status)
+                    return pages, children
+                first = True
+                async for chunk in resp.content.iter_chunked(64 * 1024):
+                    if first and chunk[:2] == b"\x1f\x8b":
+                        inflate = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                    first = False
+                    if inflate is not None:
+                        data = inflate.decompress(chunk, SITEMAP_MAX_BYTES - size + 1)
+                        over = bool(inflate.unconsumed_tail)
+                    else:
+                        data = chunk
+                        over = False
+                    size += len(data)
+                    if over or size > SITEMAP_MAX_BYTES:
+                        logger.warning(f"🗺️⚠️ {url} is over {SITEMAP_MAX_BYTES} bytes, cut off.")
+                        break
+                    parser.feed(data)
+                    for event, elem in parser.read_events():
+                        if event == "start":
+                            if root is None:
+                                root = elem
+                            continue
+                        tag = elem.tag.rsplit("}", 1)[-1]
+                        if tag == "loc":
+                            loc = (elem.text or "").strip()
+                        elif tag == "lastmod":
+                            lastmod = elem.text
+                        elif tag in ("url", "sitemap"):
+                            if loc:
+                                entry = SitemapEntry(urljoin(url, loc), parse_lastmod(lastmod))
+                                (pages if tag == "url" else children).append(entry)
+                            loc = lastmod = None
+                            if root is not None:
+                                root.clear()  # Only the current entry is ever kept in memory
+    except ElementTree.ParseError as e:
+        logger.warning(f"🗺️⚠️ Malformed sitemap {url}: {e}")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.warning(f"🗺️⚠️ Could not fetch sitemap {url}: {e}")
+    return pages, children
+
+
+async def sitemap_urls(
+    start_url: str, sitemaps: List[str], max_urls: int = SITEMAP_MAX_URLS
+) -> AsyncIterator[List[str]]:
+    """
+    Page URLs listed by a site's sitemaps (default ``/sitemap.xml``), one
+    batch per sitemap file, newest ``lastmod`` first. Sitemap indexes are
+    followed (newest children first) up to ``SITEMAP_MAX_FILES`` files.
+    """
+    queue = list(sitemaps) or [f"{_origin(start_url)}/sitemap.xml"]
+    fetched = set()
+    listed = 0
+    while queue and len(fetched) < SITEMAP_MAX_FILES and listed < max_urls:
+        url = queue.pop(0)
+        if url in fetched:
+            continue
+        fetched.add(url)
+        pages, children = await read_sitemap(url)
+        queue.extend(e.loc for e in _newest_first(children))
+        batch = [e.loc for e in _newest_first(pages)][: max_urls - listed]
+        listed += len(batch)
+        if batch:
+            logger.debug("🗺️ %d URLs in sitemap %s", len(batch), url)
+            yield batch
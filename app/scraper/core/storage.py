@@ -1,24 +1,68 @@
 # app/scraper/core/storage.py
 import asyncio
+import json
+import os
+import time
 from pathlib import Path
-from typing import Optional, Set
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
 from urllib.parse import urlparse
 
 import aiohttp
-from aiohttp import ClientError
+from aiohttp import ClientConnectionError, ClientError, ClientPayloadError
 
+from scraper.config import (
+    ARCHIVE_HTML,
+    ASSET_CONTENT_TYPES,
+    ASSET_FRESH_SECONDS,
+    DOWNLOAD_CHUNK_BYTES,
+    DOWNLOAD_CONNECT_TIMEOUT,
+    DOWNLOAD_MAX_BYTES,
+    DOWNLOAD_READ_TIMEOUT,
+    DOWNLOAD_RESUMES,
+)
+from scraper.core.archive import DuplicateLink, PageRecord, get_page_archive
+from scraper.core.asset_store import AssetStore, get_asset_store
+from scraper.core.http_pool import get_http_pool
+from scraper.core.metrics import (
+    ASSET_DOWNLOAD_BYTES,
+    ASSET_DOWNLOAD_SECONDS,
+    STORAGE_WRITE_BYTES,
+    STORAGE_WRITE_SECONDS,
+)
+from scraper.core.urlset import UrlSet
+from scraper.core.validator_cache import (
+    ValidatorCache,
+    conditional_headers,
+    get_validator_cache,
+    stored_entry,
+)
 from scraper.logging_config import get_logger
-from scraper.utils.headers import get_random_headers
+from scraper.utils.throttling import get_scheduler
 
 logger = get_logger(__name__)
 
 BASE_DIR = Path("extracted_data")  # Base storage directory
 
 
+class DownloadResult(NamedTuple):
+    ok: bool  # A body was written to the target path
+    status: Optional[int] = None
+    headers: Mapping[str, str] = {}
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+_made_dirs: Set[Path] = set()
+
+
 def get_storage_path(domain: str, file_type: str = "text") -> Path:
     """Returns the correct path for storing extracted data."""
     folder_path = BASE_DIR / domain / file_type
-    folder_path.mkdir(parents=True, exist_ok=True)
+    if folder_path not in _made_dirs:
+        folder_path.mkdir(parents=True, exist_ok=True)
+        _made_dirs.add(folder_path)
     return folder_path
 
 
@@ -38,95 +82,293 @@ def safe_file_name_from_url(url: str) -> str:
     return path_part
 
 
-def save_text(domain: str, url: str, text: str) -> None:
-    """Save extracted text from a page. Consistent emoji and layout."""
-    file_name = safe_file_name_from_url(url)
-    file_path = get_storage_path(domain, "text") / f"{file_name}.txt"
-    file_path.write_text(text, encoding="utf-8")
-    logger.info(f"           📂 Saved page text: {file_path}")
+async def save_page(
+    domain: str,
+    url: str,
+    text: str,
+    html: Optional[str] = None,
+    status: Optional[int] = None,
+    headers: Optional[Mapping[str, str]] = None,
+) -> None:
+    """
+    Queue a page for the compressed page archive; the write happens off the
+    event loop. Waits (on the executor) only while the archive writer is behind.
+    """
+    archive = get_page_archive(BASE_DIR)
+    record = PageRecord(
+        url=url,
+        domain=domain,
+        text=text,
+        html=html if ARCHIVE_HTML else None,
+        status=status,
+        headers=dict(headers or {}),
+    )
+    if not archive.append(record, block=False):
+        await asyncio.get_running_loop().run_in_executor(None, archive.append, record)
+    logger.debug("📂 Queued page for the archive: %s", url)
+
+
+async def link_duplicate_page(domain: str, url: str, canonical: str, distance: int = 0) -> None:
+    """Record ``url`` as a near-duplicate of the archived ``canonical`` page, not a new page."""
+    archive = get_page_archive(BASE_DIR)
+    link = DuplicateLink(url, domain, canonical, distance)
+    if not archive.link_duplicate(link, block=False):
+        await asyncio.get_running_loop().run_in_executor(None, archive.link_duplicate, link)
+    logger.debug("🪞 Linked duplicate %s → %s (%d bits apart)", url, canonical, distance)
 
 
-async def async_download_file(url: str, file_path: Path) -> bool:
-    """Download a file asynchronously. Styled emoji logs for each outcome."""
-    headers = get_random_headers()
+def save_link_graph(domain: str, graph: Iterable[Tuple[str, List[str]]]) -> Path:
+    """
+    Save the crawl's parent→children link graph as a JSON object next to the
+    domain's data, one page per line; ``graph`` is streamed, never held whole.
+    """
+    file_path = BASE_DIR / domain / "link_graph.json"
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    pages = 0
+    with STORAGE_WRITE_SECONDS.time(kind="link_graph"):
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write("{")
+            for parent, children in graph:
+                f.write(f"{',' if pages else ''}\n  {json.dumps(parent)}: {json.dumps(children)}")
+                pages += 1
+            f.write("\n}\n")
+    STORAGE_WRITE_BYTES.inc(file_path.stat().st_size, kind="link_graph")
+    logger.info(f"🕸️ Saved link graph ({pages} pages): {file_path}")
+    return file_path
+
+
+def _content_range_start(value: Optional[str]) -> Optional[int]:
+    """First byte of a ``Content-Range: bytes <start>-<end>/<size>`` header."""
+    if not value or not value.startswith("bytes "):
+        return None
+    start = value[6:].split("-", 1)[0].strip()
+    return int(start) if start.isdigit() else None
+
+
+def _refusal(
+    headers: Mapping[str, str], max_bytes: int, content_types: Optional[Tuple[str, ...]]
+) -> Optional[str]:
+    """Why a response should not be downloaded, judged from its headers alone."""
+    length = headers.get("Content-Length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        return f"{int(length)} bytes is over the {max_bytes} byte cap"
+    content_type = headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+    if content_types and content_type and not content_type.startswith(content_types):
+        return f"unexpected Content-Type {content_type}"
+    return None
+
+
+async def async_download_file(
+    url: str,
+    file_path: Path,
+    headers: Optional[Dict[str, str]] = None,
+    max_bytes: int = DOWNLOAD_MAX_BYTES,
+    content_types: Optional[Tuple[str, ...]] = None,
+) -> DownloadResult:
+    """
+    Download a file over the shared HTTP pool. Styled emoji logs for each outcome.
+
+    The body is written to ``<file_path>.part`` in large chunks off the event
+    loop and renamed to ``file_path`` only once complete, so a failed download
+    leaves nothing behind. A connection dropped mid-body is resumed with a
+    ``Range`` request. Bodies over ``max_bytes`` or whose Content-Type starts
+    with none of ``content_types`` are refused from the headers, before the
+    body is read. ``headers`` may carry validators; a 304 reply is returned
+    without writing anything.
+    """
+    pool = get_http_pool()
+    scheduler = get_scheduler()
+    loop = asyncio.get_running_loop()
+    part = file_path.with_name(file_path.name + ".part")
+    # No total timeout: a large file may take minutes, as long as bytes keep arriving
+    timeout = aiohttp.ClientTimeout(
+        total=None, sock_connect=DOWNLOAD_CONNECT_TIMEOUT, sock_read=DOWNLOAD_READ_TIMEOUT
+    )
+    status = "error"
+    started = 0.0
+    received = 0  # Bytes safely in the .part file
+    validator: Optional[str] = None  # ETag / Last-Modified of the full response, for If-Range
+    result = DownloadResult(False)
     try:
-        timeout = aiohttp.ClientTimeout(total=30)
-        async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
-            async with session.get(url) as resp:
-                if resp.status == 200:
-                    try:
-                        with open(file_path, "wb") as f:
-                            async for chunk in resp.content.iter_chunked(1024):
-                                f.write(chunk)
-                        logger.info(f"✅ Downloaded file: {file_path}")
-                        return True
-                    except OSError as fe:
-                        logger.error(f"💾❌ File write error: {file_path} — {fe}")
-                else:
-                    logger.error(f"🌐❌ Failed to download (HTTP {resp.status}): {url}")
+        await scheduler.wait_for_backoff(url)
+        async with pool.slots:
+            started = time.perf_counter()  # Latency excludes waiting for a pool slot
+            for attempt in range(DOWNLOAD_RESUMES + 1):
+                request_headers = dict(headers or {})
+                if received:
+                    request_headers["Range"] = f"bytes={received}-"
+                    if validator:
+                        request_headers["If-Range"] = validator
+                try:
+                    async with pool.session.get(
+                        url, headers=request_headers, timeout=timeout
+                    ) as resp:
+                        status = str(resp.status)
+                        if attempt == 0:
+                            scheduler.record(url, resp.status, resp.headers.get("Retry-After"))
+                        if resp.status == 304:
+                            return DownloadResult(False, 304, resp.headers)
+                        if resp.status == 200:
+                            refusal = _refusal(resp.headers, max_bytes, content_types)
+                            if refusal:
+                                status = "refused"
+                                logger.warning(f"🚫 Not downloading {url}: {refusal}")
+                                return DownloadResult(False, 200, resp.headers)
+                            received = 0  # A full body, also when the server ignored Range
+                            validator = resp.headers.get("ETag") or resp.headers.get(
+                                "Last-Modified"
+                            )
+                            result = DownloadResult(True, 200, resp.headers)
+                        elif not (
+                            resp.status == 206
+                            and _content_range_start(resp.headers.get("Content-Range")) == received
+                        ):
+                            logger.error(f"🌐❌ Failed to download (HTTP {resp.status}): {url}")
+                            return DownloadResult(False, resp.status, resp.headers)
+
+                        f = await loop.run_in_executor(None, open, part, "ab" if received else "wb")
+                        try:
+                            buffer = bytearray()
+                            async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_BYTES):
+                                buffer += chunk
+                                ASSET_DOWNLOAD_BYTES.inc(len(chunk))
+                                if received + len(buffer) > max_bytes:
+                                    status = "refused"
+                                    logger.warning(
+                                        f"🚫 Stopped downloading {url}: over {max_bytes} bytes"
+                                    )
+                                    return DownloadResult(False, resp.status, resp.headers)
+                                if len(buffer) >= DOWNLOAD_CHUNK_BYTES:
+                                    await loop.run_in_executor(None, f.write, bytes(buffer))
+                                    received += len(buffer)
+                                    buffer.clear()
+                            await loop.run_in_executor(None, f.write, bytes(buffer))
+                            received += len(buffer)
+                        finally:
+                            await loop.run_in_executor(None, f.close)
+                    break
+                except (ClientPayloadError, ClientConnectionError, asyncio.TimeoutError) as e:
+                    if attempt == DOWNLOAD_RESUMES or not result.ok:
+                        raise
+                    logger.warning(
+                        f"🔁 Download of {url} dropped at {received} bytes ({e}), resuming"
+                    )
+
+        await loop.run_in_executor(None, os.replace, part, file_path)
+        logger.debug("✅ Downloaded file: %s (%d bytes)", file_path, received)
+        return result
     except ClientError as ce:
         logger.error(f"🔌❌ aiohttp client error: {url} — {ce}")
     except asyncio.TimeoutError:
         logger.error(f"⏰❌ Timeout when downloading: {url}")
+    except OSError as fe:  # After the two above, which subclass OSError
+        logger.error(f"💾❌ File write error: {file_path} — {fe}")
     except Exception as e:
         logger.error(f"💥❌ Unexpected error downloading {url}: {e}")
-    return False
+    finally:
+        if started:
+            ASSET_DOWNLOAD_SECONDS.observe(time.perf_counter() - started, status=status)
+        if part.exists():
+            part.unlink()
+    return DownloadResult(False)
 
 
-async def async_save_image(
-    domain: str, img_url: str, seen_images: Optional[Set[str]] = None
+def _ingest_download(
+    store: AssetStore,
+    validators: ValidatorCache,
+    url: str,
+    tmp_path: Path,
+    headers: Mapping[str, str],
+) -> str:
+    """Move a finished download into the store and remember its validators (blocking)."""
+    digest = store.ingest_file(url, tmp_path)
+    validators.put(url, headers, digest, store.blob_path(digest).stat().st_size)
+    return digest
+
+
+async def _async_save_asset(
+    domain: str,
+    kind: str,
+    url: str,
+    seen: Optional[UrlSet],
+    body: Optional[bytes],
+    icon: str,
 ) -> bool:
-    """Download and save an image asynchronously, logs with clear emoji/status."""
-    parsed_url = urlparse(img_url)
-    file_name = Path(parsed_url.path).name
-    if not file_name:
-        logger.warning(f"🖼️⚠️ Skipping image (no filename): {img_url}")
+    """
+    Store one asset in the content-addressed store and give it a name in
+    ``<domain>/<kind>``. Returns True only if the domain gained a new file.
+    """
+    if not Path(urlparse(url).path).name:
+        logger.warning(f"{icon}⚠️ Skipping (no filename): {url}")
         return False
 
-    if seen_images is not None and img_url in seen_images:
-        logger.info(f"🖼️⚠️ Duplicate image, skipping: {img_url}")
-        return False
+    if seen is not None:
+        if url in seen:
+            logger.debug("%s⚠️ Duplicate, skipping: %s", icon, url)
+            return False
+        seen.add(url)  # Claimed now so concurrent pages don't fetch it twice
 
-    file_path = get_storage_path(domain, "images") / file_name
+    store = get_asset_store(BASE_DIR)
+    validators = get_validator_cache(BASE_DIR)
+    loop = asyncio.get_running_loop()
+    # The index lookups and file checks below block, so they run on the executor
+    cached = await loop.run_in_executor(None, stored_entry, validators, store, url)
 
-    if file_path.exists():
-        logger.info(f"🖼️⚠️ Image already exists, skipping: {file_path}")
-        if seen_images is not None:
-            seen_images.add(img_url)
-        return False
+    if body is not None:
+        with STORAGE_WRITE_SECONDS.time(kind="asset"):
+            digest = await loop.run_in_executor(None, store.ingest_bytes, url, body)
+    elif cached is not None and time.time() - cached.checked < ASSET_FRESH_SECONDS:
+        logger.debug("%s♻️ Recently stored, not re-fetching: %s", icon, url)
+        digest = cached.digest
+    else:
+        tmp_path = store.temp_path()
+        result = await async_download_file(
+            url, tmp_path, conditional_headers(cached), content_types=ASSET_CONTENT_TYPES.get(kind)
+        )
+        if cached is not None and result.not_modified:
+            logger.debug("%s♻️ Not modified (304), reusing stored copy: %s", icon, url)
+            await loop.run_in_executor(None, validators.touch, url)
+            digest = cached.digest
+        elif result.ok:
+            with STORAGE_WRITE_SECONDS.time(kind="asset"):
+                digest = await loop.run_in_executor(
+                    None, _ingest_download, store, validators, url, tmp_path, result.headers
+                )
+        else:
+            tmp_path.unlink(missing_ok=True)
+            if seen is not None:
+                seen.discard(url)
+            return False
 
-    success = await async_download_file(img_url, file_path)
-    if seen_images is not None and success:
-        seen_images.add(img_url)
-    return success
+    file_path, is_new = await loop.run_in_executor(None, store.link, domain, kind, url, digest)
+    if is_new:
+        logger.debug("%s✅ Saved %s (%s)", icon, file_path.name, digest[:10])
+    else:
+        logger.debug("%s⚠️ Same content already saved as %s, skipping", icon, file_path)
+    return is_new
 
 
-async def async_save_file(
-    domain: str, file_url: str, seen_files: Optional[Set[str]] = None
+async def async_save_image(
+    domain: str,
+    img_url: str,
+    seen_images: Optional[UrlSet] = None,
+    body: Optional[bytes] = None,
 ) -> bool:
     """
-    Download and save a document or compressed file asynchronously.
-    Consistent emoji logs for status.
+    Download and save an image asynchronously, logs with clear emoji/status.
+    If ``body`` is given (captured from the browser) it is stored without a download.
     """
-    parsed_url = urlparse(file_url)
-    file_name = Path(parsed_url.path).name
-    if not file_name:
-        logger.warning(f"📄⚠️ Skipping file (no filename): {file_url}")
-        return False
-
-    if seen_files is not None and file_url in seen_files:
-        logger.info(f"📄⚠️ Duplicate file, skipping: {file_url}")
-        return False
+    return await _async_save_asset(domain, "images", img_url, seen_images, body, "🖼️")
 
-    file_path = get_storage_path(domain, "files") / file_name
-
-    if file_path.exists():
-        logger.info(f"📄⚠️ File already exists, skipping: {file_path}")
-        if seen_files is not None:
-            seen_files.add(file_url)
-        return False
 
-    success = await async_download_file(file_url, file_path)
-    if seen_files is not None and success:
-        seen_files.add(file_url)
-    return success
+async def async_save_file(
+    domain: str,
+    file_url: str,
+    seen_files: Optional[UrlSet] = None,
+    body: Optional[bytes] = None,
+) -> bool:
+    """
+    Download and save a document or compressed file asynchronously.
+    Consistent emoji logs for status. ``body`` works as for async_save_image.
+    """
+    return await _async_save_asset(domain, "files", file_url, seen_files, body, "📄")
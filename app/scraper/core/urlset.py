@@ -0,0 +1,97 @@
+import hashlib
+from array import array
+from typing import Iterable, Optional
+
+_EMPTY = 0
+_DELETED = 1
+
+
+def fingerprint(url: str) -> int:
+    """64-bit fingerprint of a URL; 0 and 1 are reserved as slot markers."""
+    fp = int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+    return fp if fp > _DELETED else fp + 2
+
+
+class UrlSet:
+    """
+    A set of URLs that stores 64-bit fingerprints instead of the strings.
+
+    Fingerprints live in an open-addressing hash table backed by one
+    ``array('Q')``, about 8-16 bytes per URL against 100+ for a ``set`` of
+    strings. Two URLs share a fingerprint with probability ~n²/2⁶⁵ (about
+    one in 37 million at a million URLs); such a URL is treated as seen.
+    The URLs themselves cannot be listed back.
+    """
+
+    MAX_LOAD = 0.6  # Grow once live plus deleted slots pass this share of the table
+
+    def __init__(self, urls: Iterable[str] = (), capacity: int = 1024):
+        size = 16
+        while size < capacity / self.MAX_LOAD:
+            size *= 2
+        self._slots = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._len = 0
+        self._used = 0  # Live plus deleted slots
+        self.update(urls)
+
+    def _find(self, fp: int) -> int:
+        """Slot holding ``fp``, or the slot where it would be inserted."""
+        slots, mask = self._slots, self._mask
+        i = fp & mask
+        free = -1
+        while True:
+            value = slots[i]
+            if value == fp:
+                return i
+            if value == _EMPTY:
+                return i if free < 0 else free
+            if value == _DELETED and free < 0:
+                free = i
+            i = (i + 1) & mask
+
+    def add(self, url: str) -> bool:
+        """Add ``url``; returns False if it (or a fingerprint twin) was already present."""
+        fp = fingerprint(url)
+        i = self._find(fp)
+        value = self._slots[i]
+        if value == fp:
+            return False
+        self._slots[i] = fp
+        self._len += 1
+        if value == _EMPTY:
+            self._used += 1
+            if self._used > len(self._slots) * self.MAX_LOAD:
+                self._resize(len(self._slots) * 2 if self._len * 2 > self._used else None)
+        return True
+
+    def update(self, urls: Iterable[str]) -> None:
+        for url in urls:
+            self.add(url)
+
+    def discard(self, url: str) -> None:
+        fp = fingerprint(url)
+        i = self._find(fp)
+        if self._slots[i] == fp:
+            self._slots[i] = _DELETED
+            self._len -= 1
+
+    def __contains__(self, url: object) -> bool:
+        if not isinstance(url, str):
+            return False
+        fp = fingerprint(url)
+        return self._slots[self._find(fp)] == fp
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _resize(self, size: Optional[int]) -> None:
+        """Rehash live fingerprints into a table of ``size`` slots (same size drops tombstones)."""
+        old = self._slots
+        size = size or len(old)
+        self._slots = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._used = self._len
+        for value in old:
+            if value > _DELETED:
+                self._slots[self._find(value)] = value
@@ -0,0 +1,105 @@
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, Mapping, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from scraper.core.asset_store import AssetStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS validators (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    length INTEGER,
+    digest TEXT NOT NULL,
+    checked REAL NOT NULL
+);
+"""
+
+
+class CacheEntry(NamedTuple):
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    length: Optional[int]
+    digest: str  # Asset store digest of the last body we kept
+    checked: float  # When the server last confirmed this entry (epoch seconds)
+
+
+class ValidatorCache:
+    """
+    Persistent per-URL HTTP validators (ETag, Last-Modified) plus the length
+    and digest of the body they describe, so repeat crawls can send
+    conditional requests and skip bodies the server reports unchanged (304).
+    """
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, etag, last_modified, length, digest, checked "
+                "FROM validators WHERE url = ?",
+                (url,),
+            ).fetchone()
+        return CacheEntry(*row) if row else None
+
+    def put(self, url: str, headers: Mapping[str, str], digest: str, length: int) -> None:
+        """Remember the validators a 200 response came with."""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO validators "
+                "(url, etag, last_modified, length, digest, checked) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    headers.get("ETag"),
+                    headers.get("Last-Modified"),
+                    length,
+                    digest,
+                    time.time(),
+                ),
+            )
+
+    def touch(self, url: str) -> None:
+        """Mark an entry as just revalidated (after a 304)."""
+        with self._lock, self._db:
+            self._db.execute("UPDATE validators SET checked = ? WHERE url = ?", (time.time(), url))
+
+
+def stored_entry(cache: ValidatorCache, store: "AssetStore", url: str) -> Optional[CacheEntry]:
+    """``url``'s entry, if the body it describes is still in the asset store (blocking)."""
+    entry = cache.get(url)
+    if entry is not None and not store.blob_path(entry.digest).exists():
+        return None  # Blob was removed; fetch the body again
+    return entry
+
+
+def conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since headers for a cached entry."""
+    headers: Dict[str, str] = {}
+    if entry is None:
+        return headers
+    if entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+_cache: Optional[ValidatorCache] = None
+_cache_path: Optional[Path] = None
+
+
+def get_validator_cache(base_dir: Path) -> ValidatorCache:
+    """The process-wide cache, stored alongside the asset store in ``base_dir``."""
+    global _cache, _cache_path
+    db_path = base_dir / ".blobs" / "validators.sqlite"
+    if _cache is None or _cache_path != db_path:
+        _cache, _cache_path = ValidatorCache(db_path), db_path
+    return _cache
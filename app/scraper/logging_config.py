@@ -1,23 +1,57 @@
 # app/scraper/logging_config.py
+import atexit
+import itertools
 import logging
-from typing import Optional
+import logging.handlers
+import os
+import queue
+import threading
+from typing import Callable, Optional
+
+# "dev" writes every record straight to stderr at DEBUG. "production" defaults to INFO and
+# hands records to a background thread through a queue, so crawls never wait on stderr.
+LOG_MODE = os.getenv("LOG_MODE", "dev")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO" if LOG_MODE == "production" else "DEBUG").upper()
+# Per-page summary lines: log one page in N (1 = every page)
+LOG_PAGE_SAMPLE = int(os.getenv("LOG_PAGE_SAMPLE", "25" if LOG_MODE == "production" else "1"))
+LOG_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+
+_lock = threading.Lock()
+_handler: Optional[logging.Handler] = None
+
+
+def _shared_handler() -> logging.Handler:
+    """The one handler every logger writes to, created on first use."""
+    global _handler
+    with _lock:
+        if _handler is None:
+            stream = logging.StreamHandler()
+            stream.setFormatter(logging.Formatter(LOG_FORMAT))
+            if LOG_MODE == "production":
+                records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+                listener = logging.handlers.QueueListener(records, stream)
+                listener.start()
+                atexit.register(listener.stop)  # Flushes what is still queued
+                _handler = logging.handlers.QueueHandler(records)
+            else:
+                _handler = stream
+        return _handler
 
 
 def get_logger(name: Optional[str] = None) -> logging.Logger:
+    """A logger on the shared handler. Safe to call repeatedly, it is configured once."""
     logger = logging.getLogger(name)
-    # Remove ALL handlers so we don't stack up duplicates
-    for h in logger.handlers[:]:
-        logger.removeHandler(h)
-    # Add our preferred handler every time
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-    # Set level to DEBUG for max output (change to INFO if too noisy)
-    logger.setLevel(logging.DEBUG)
-    # Let logs propagate up, unless this is the root
-    if name:
-        logger.propagate = True
-    else:
+    handler = _shared_handler()
+    if handler not in logger.handlers:
+        logger.addHandler(handler)
+        logger.setLevel(LOG_LEVEL)
+        # Our handler already writes the record; the root one would print it twice
         logger.propagate = False
     return logger
+
+
+def page_sampler(every: int = LOG_PAGE_SAMPLE) -> Callable[[], bool]:
+    """Returns a check that is true on the first call and then on every ``every``-th."""
+    calls = itertools.count()
+    every = max(1, every)
+    return lambda: next(calls) % every == 0
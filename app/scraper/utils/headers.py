@@ -4,14 +4,16 @@ from typing import Dict
 
 from fake_useragent import UserAgent  # type: ignore
 
-from scraper.logging_config import logging
+from scraper.logging_config import get_logger
+
+logger = get_logger(__name__)
 
 # Try initializing UserAgent pool
 try:
     ua = UserAgent()
     USER_AGENTS = [ua.random for _ in range(20)]
 except Exception as e:
-    logging.error(f"❌ Failed to initialize UserAgent: {e}")
+    logger.error(f"❌ Failed to initialize UserAgent: {e}")
     USER_AGENTS = [
         (
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -35,5 +37,4 @@ def get_random_headers() -> Dict[str, str]:
         "Accept-Language": "en-US,en;q=0.5",
         "Connection": "keep-alive",
     }
-    logging.info(f"🔀 Using User-Agent: {headers['User-Agent']}")
     return headers
@@ -1,50 +1,174 @@
-# app/scraper/utils/throttling.py
 import asyncio
 import random
 import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+from urllib.parse import urlparse
 
-from scraper.logging_config import logging
+from scraper.config import (
+    THROTTLE_DECREASE_STEP,
+    THROTTLE_MAX_DELAY,
+    THROTTLE_MIN_DELAY,
+    THROTTLE_START_DELAY,
+)
+from scraper.core.metrics import THROTTLE_SLEEP_SECONDS
+from scraper.logging_config import get_logger
 
-last_sleep_time = 1.5  # ✅ Base delay for normal requests
+logger = get_logger(__name__)
 
+T = TypeVar("T")
 
-def random_throttle(status_code=None):
-    """Adaptive throttle mechanism with exponential backoff & jitter."""
-    global last_sleep_time
+BACKOFF_STATUSES = {429, 503}
 
-    base_delay = 1.5  # ✅ Base delay for normal requests
-    max_delay = 15.0  # ✅ Increased Max delay to be more cautious
-    jitter = random.uniform(0.1, 3.0)  # ✅ More aggressive randomization
 
-    if status_code in {429, 503}:  # ✅ Too Many Requests / Server Overloaded
-        last_sleep_time = min(last_sleep_time * 2, max_delay)  # Exponential backoff
-        logging.warning(f"⚠️ Server returned {status_code}. Increasing throttle time!")
-    elif status_code == 200:  # ✅ Successful response
-        last_sleep_time = max(base_delay, last_sleep_time * 0.9)  # Reduce wait time
-    else:
-        last_sleep_time = base_delay  # Reset if unknown response
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
 
-    sleep_time = last_sleep_time + jitter  # ✅ Final calculated sleep time
-    logging.info(f"⏳ Throttling request: Sleeping for {sleep_time:.2f} seconds...")
-    time.sleep(sleep_time)
 
+class HostState:
+    """Politeness state for one host."""
 
-async def async_random_throttle(status_code=None):
-    """Asynchronous version of adaptive throttle mechanism."""
-    global last_sleep_time
+    def __init__(self, delay: float, min_delay: float):
+        self.delay = delay  # Spacing between page requests (AIMD controlled)
+        self.min_delay = min_delay  # Raised by robots.txt Crawl-delay
+        self.next_slot = 0.0  # Monotonic time the next page request may start
+        self.blocked_until = 0.0  # Monotonic time a 429/503 pause ends
+        self.raised_at = float("-inf")  # Monotonic time the delay was last doubled
 
-    base_delay = 1.5
-    max_delay = 15.0
-    jitter = random.uniform(0.1, 3.0)
 
-    if status_code in {429, 503}:
-        last_sleep_time = min(last_sleep_time * 2, max_delay)
-        logging.warning(f"⚠️ Server returned {status_code}. Increasing throttle time!")
-    elif status_code == 200:
-        last_sleep_time = max(base_delay, last_sleep_time * 0.9)
-    else:
-        last_sleep_time = base_delay
+class PolitenessScheduler:
+    """
+    Per-host request spacing driven by real responses (AIMD).
 
-    sleep_time = last_sleep_time + jitter
-    logging.info(f"⏳ Async Throttling request: Sleeping for {sleep_time:.2f} seconds...")
-    await asyncio.sleep(sleep_time)
+    Healthy responses shrink a host's delay by a fixed step down to its
+    minimum; 429/503, other 5xx and network errors double it (up to the
+    maximum), at most once per delay window, so a burst of errors from
+    requests already in flight counts once. A 429/503 pauses the host for
+    its ``Retry-After``, or for the delay without one. State lives behind a thread lock
+    and sleeping happens outside it, so one scheduler is safely shared by
+    every worker of every crawl in the process, whatever loop they run on.
+    """
+
+    def __init__(
+        self,
+        start_delay: float = THROTTLE_START_DELAY,
+        min_delay: float = THROTTLE_MIN_DELAY,
+        max_delay: float = THROTTLE_MAX_DELAY,
+        decrease_step: float = THROTTLE_DECREASE_STEP,
+    ):
+        self.start_delay = start_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.decrease_step = decrease_step
+        self._hosts: Dict[str, HostState] = {}
+        self._lock = Lock()
+
+    def _state(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(self.start_delay, self.min_delay)
+        return state
+
+    @contextmanager
+    def _host(self, host: str) -> Iterator[HostState]:
+        """The host's state, held for the ``with`` block (shard schedulers keep it elsewhere)."""
+        with self._lock:
+            yield self._state(host)
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a state update for an awaiting caller."""
+        return fn(*args)
+
+    def _apply(self, fn: Callable[..., Any], *args: Any) -> None:
+        """Run a state update nobody waits for."""
+        fn(*args)
+
+    async def acquire(self, url: str) -> float:
+        """Wait for this host's next page slot. Returns the seconds slept."""
+        host = urlparse(url).netloc
+        wait = await self._run(self._take_slot, host)
+        if wait > 0:
+            logger.debug("⏳ Throttling %s: sleeping %.2fs", host, wait)
+            THROTTLE_SLEEP_SECONDS.observe(wait, reason="spacing")
+            await asyncio.sleep(wait)
+        return wait
+
+    def _take_slot(self, host: str) -> float:
+        with self._host(host) as state:
+            now = time.monotonic()
+            slot = max(now, state.next_slot, state.blocked_until)
+            jitter = random.uniform(0.9, 1.1)
+            state.next_slot = slot + state.delay * jitter
+            return slot - now
+
+    async def wait_for_backoff(self, url: str) -> None:
+        """Wait out a 429/503 pause for this host without taking a page slot (assets)."""
+        wait = await self._run(self._backoff_left, urlparse(url).netloc)
+        if wait > 0:
+            THROTTLE_SLEEP_SECONDS.observe(wait, reason="backoff")
+            await asyncio.sleep(wait)
+
+    def _backoff_left(self, host: str) -> float:
+        with self._host(host) as state:
+            return state.blocked_until - time.monotonic()
+
+    def record(self, url: str, status: Optional[int], retry_after: Optional[str] = None) -> None:
+        """Feed a response status (None for a network error) back into the host's delay."""
+        self._apply(self._record, urlparse(url).netloc, status, retry_after)
+
+    def _record(self, host: str, status: Optional[int], retry_after: Optional[str]) -> None:
+        with self._host(host) as state:
+            if status is not None and status < 500 and status not in BACKOFF_STATUSES:
+                state.delay = max(state.min_delay, state.delay - self.decrease_step)
+                return
+            now = time.monotonic()
+            if now - state.raised_at >= state.delay:
+                state.delay = min(self.max_delay, max(state.delay, state.min_delay, 0.5) * 2)
+                state.raised_at = now
+            pause = parse_retry_after(retry_after)
+            if pause is None and status in BACKOFF_STATUSES:
+                pause = state.delay
+            if pause:
+                state.blocked_until = max(state.blocked_until, now + pause)
+        logger.warning(
+            f"⚠️ {host} returned {status or 'a network error'}. "
+            f"Throttle delay now {state.delay:.2f}s" + (f", pausing {pause:.1f}s" if pause else "")
+        )
+
+    def set_min_delay(self, url: str, seconds: float) -> None:
+        """Raise a host's delay floor (e.g. robots.txt Crawl-delay)."""
+        self._apply(self._set_min_delay, urlparse(url).netloc, seconds)
+
+    def _set_min_delay(self, host: str, seconds: float) -> None:
+        with self._host(host) as state:
+            state.min_delay = min(self.max_delay, max(self.min_delay, seconds))
+            state.delay = max(state.delay, state.min_delay)
+
+    def delay_for(self, url: str) -> float:
+        with self._host(urlparse(url).netloc) as state:
+            return state.delay
+
+
+_scheduler = PolitenessScheduler()
+
+
+def get_scheduler() -> PolitenessScheduler:
+    """The process-wide scheduler shared by all crawls."""
+    return _scheduler
+
+
+def set_scheduler(scheduler: PolitenessScheduler) -> None:
+    """Replace the process-wide scheduler (shard processes share theirs with the other shards)."""
+    global _scheduler
+    _scheduler = scheduler
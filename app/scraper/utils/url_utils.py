@@ -1,17 +1,20 @@
 # app/scraper/utils/url_utils.py
 import re
-from urllib.parse import urlparse
+from typing import List
+from urllib.parse import urljoin, urlparse
 
-from scraper.logging_config import logging
+from scraper.logging_config import get_logger
+
+logger = get_logger(__name__)
 
 
 def format_url(url: str) -> str:
     """Ensure URL has 'https://' if missing."""
-    logging.info(f"🌐 Formatting URL: {url}")
+    logger.info(f"🌐 Formatting URL: {url}")
     parsed_url = urlparse(url)
     if not parsed_url.scheme:
         formatted_url = "https://" + url
-        logging.info(f"🔗 No scheme detected. Updated URL: {formatted_url}")
+        logger.info(f"🔗 No scheme detected. Updated URL: {formatted_url}")
         return formatted_url
     return url
 
@@ -33,3 +36,59 @@ def is_valid_url(url: str) -> bool:
         return False
     # Optional: further restrict/allow only certain domains, etc.
     return True
+
+
+# Linked documents worth downloading
+DOC_EXTS = (".pdf", ".docx", ".zip", ".pptx", ".xlsx", ".txt")
+
+# Links with these extensions are assets, not pages to crawl
+NON_PAGE_EXTS = DOC_EXTS + (
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".gif",
+    ".bmp",
+    ".webp",
+    ".svg",
+    ".mp4",
+    ".mp3",
+    ".css",
+    ".js",
+)
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form used for dedup: drop the #fragment and lowercase scheme/host."""
+    parsed = urlparse(url)
+    return parsed._replace(
+        scheme=parsed.scheme.lower(), netloc=parsed.netloc.lower(), fragment=""
+    ).geturl()
+
+
+def is_same_domain(url: str, domain: str) -> bool:
+    """True if url is on domain (a leading 'www.' is ignored on both sides)."""
+    netloc = urlparse(url).netloc.lower()
+    domain = domain.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    if domain.startswith("www."):
+        domain = domain[4:]
+    return netloc == domain
+
+
+def extract_page_links(base_url: str, hrefs: List[str], domain: str) -> List[str]:
+    """Resolve a[href] values against base_url and keep same-domain, crawlable page links."""
+    links: List[str] = []
+    for href in hrefs:
+        if not href:
+            continue
+        link = normalize_url(urljoin(base_url, href.strip()))
+        parsed = urlparse(link)
+        if parsed.scheme not in ("http", "https"):
+            continue
+        if not is_same_domain(link, domain):
+            continue
+        if parsed.path.lower().endswith(NON_PAGE_EXTS):
+            continue
+        links.append(link)
+    return links
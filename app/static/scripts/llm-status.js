@@ -0,0 +1,26 @@
+// app/static/scripts/llm-status.js
+document.addEventListener("DOMContentLoaded", function () {
+  const section = document.getElementById("llm-pending");
+  if (!section) return;
+  const key = section.dataset.key;
+  const statusEl = document.getElementById("llm-status");
+  const partialEl = document.getElementById("llm-partial");
+
+  // Shows the streamed answer as it grows, then reloads to render the result
+  function pollCategorized() {
+    fetch(`/categorized/${key}`)
+      .then((r) => r.json())
+      .then((data) => {
+        if (data.partial) partialEl.textContent = data.partial;
+        if (data.done) {
+          statusEl.textContent = "Categorization finished.";
+          setTimeout(() => window.location.reload(), 500);
+        } else if (data.known) {
+          setTimeout(pollCategorized, 1000);
+        } else {
+          statusEl.textContent = "Categorization is not queued.";
+        }
+      });
+  }
+  pollCategorized();
+});
@@ -1,31 +1,66 @@
 // app/static/scripts/poll-status.js
 document.addEventListener("DOMContentLoaded", function () {
   const taskId = window.TASK_ID; // We'll pass this via a script tag
+  const statusEl = document.getElementById("crawl-status");
+  const progressEl = document.getElementById("progress-bar");
+
+  function formatEta(seconds) {
+    if (seconds === null || seconds === undefined) return "";
+    const s = Math.round(seconds);
+    return s >= 60 ? ` | ETA ${Math.floor(s / 60)}m ${s % 60}s` : ` | ETA ${s}s`;
+  }
+
+  function render(data) {
+    const p = data.progress || {};
+    statusEl.textContent =
+      (data.status || "Waiting...") + (data.finished ? "" : formatEta(p.eta));
+    if (p.percent !== undefined && progressEl) {
+      progressEl.style.width = p.percent + "%";
+    }
+    if (data.finished) {
+      if (progressEl) progressEl.style.width = "100%";
+      statusEl.textContent = (data.status || "") + " (Done)";
+      setTimeout(() => window.location.reload(), 1200);
+    }
+    return data.finished;
+  }
+
+  // Fallback for browsers without EventSource
   function pollStatus() {
-    if (!taskId) return;
-    const statusEl = document.getElementById("crawl-status");
-    const progressEl = document.getElementById("progress-bar");
     fetch(`/status/${taskId}`)
       .then((r) => r.json())
       .then((data) => {
-        statusEl.textContent = data.status || "Waiting...";
-        if (
-          data.progress &&
-          data.progress.percent !== undefined &&
-          progressEl
-        ) {
-          progressEl.style.width = data.progress.percent + "%";
-        }
-        if (!data.finished) {
-          setTimeout(pollStatus, 2000);
-        } else {
-          if (progressEl) progressEl.style.width = "100%";
-          statusEl.textContent = (data.status || "") + " (Done)";
-          setTimeout(() => window.location.reload(), 1200);
-        }
+        if (!render(data)) setTimeout(pollStatus, 2000);
       });
   }
-  if (taskId && document.getElementById("crawl-status")) {
-    pollStatus();
+
+  function streamStatus() {
+    const source = new EventSource(`/status/${taskId}/stream`);
+    source.onmessage = (event) => {
+      if (render(JSON.parse(event.data))) source.close();
+    };
+    source.addEventListener("gone", () => {
+      source.close();
+      window.location.reload();
+    });
+  }
+
+  // Pause / resume / cancel buttons; the stream reports the new state
+  document.querySelectorAll("[data-job-action]").forEach((button) => {
+    button.addEventListener("click", () => {
+      fetch(`/jobs/${taskId}/${button.dataset.jobAction}`, { method: "POST" })
+        .then((r) => r.json())
+        .then((data) => {
+          if (data.error) statusEl.textContent = data.error;
+        });
+    });
+  });
+
+  if (taskId && statusEl) {
+    if (window.EventSource) {
+      streamStatus();
+    } else {
+      pollStatus();
+    }
   }
 });
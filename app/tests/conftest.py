@@ -0,0 +1,14 @@
+import pytest
+
+from scraper.core import archive, asset_store, validator_cache
+
+
+@pytest.fixture
+def crawl_dir(tmp_path, monkeypatch):
+    """Run in an empty directory, so crawl output lands in ``tmp_path / "extracted_data"``."""
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path / "extracted_data"
+    # The stores are process-wide and keyed by the (relative) base dir: start the next test afresh
+    archive.close_archives()
+    asset_store._store = None
+    validator_cache._cache = None
@@ -0,0 +1,51 @@
+import asyncio
+
+from scraper.core.archive import DuplicateLink, PageArchive, PageRecord
+from scraper.core.checkpoint import CrawlCheckpoint
+
+URL = "http://example.test/"
+
+
+def test_pages_round_trip_across_segments(tmp_path):
+    archive = PageArchive(tmp_path, segment_bytes=200, batch=2, queue_max=2)
+    for n in range(5):
+        archive.append(PageRecord(f"{URL}{n}", "example.test", f"text {n}", "<p>", 200, {"a": "b"}))
+    archive.link_duplicate(DuplicateLink(URL + "copy", "example.test", URL + "3", 2))
+    archive.flush()
+
+    assert len(list((tmp_path / ".archive").glob("*.warc.gz"))) > 1
+    record = archive.get(URL + "4")
+    assert (record.text, record.html, record.status, record.headers) == (
+        "text 4",
+        "<p>",
+        200,
+        {"a": "b"},
+    )
+    assert archive.get(URL + "copy").url == URL + "3"
+    assert archive.duplicates("example.test") == {URL + "copy": URL + "3"}
+    assert archive.urls("example.test") == [f"{URL}{n}" for n in range(5)]
+    archive.close()
+
+    reopened = PageArchive(tmp_path)
+    assert reopened.get(URL + "0").text == "text 0"
+    reopened.close()
+
+
+def test_a_full_queue_refuses_without_blocking(tmp_path):
+    archive = PageArchive(tmp_path, queue_max=1)
+    archive._start = lambda: None  # No writer: the queue only fills
+    assert archive.append(PageRecord(URL, "example.test", "one"), block=False)
+    assert not archive.append(PageRecord(URL + "2", "example.test", "two"), block=False)
+
+
+def test_checkpoint_commits_only_archived_pages(tmp_path):
+    archive = PageArchive(tmp_path)
+    checkpoint = CrawlCheckpoint(URL, tmp_path, every=1, archive=archive)
+    checkpoint.reset()
+    archive.append(PageRecord(URL, "example.test", "home"))
+    counters = {"count": 1, "image_count": 0, "file_count": 0, "error_count": 0, "bytes": 4}
+    asyncio.run(checkpoint.page_done(URL, 0, [], [], [], counters))
+
+    assert URL in checkpoint.load().visited
+    assert PageArchive(tmp_path).get(URL).text == "home"  # Readable from a fresh process
+    archive.close()
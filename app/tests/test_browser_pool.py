@@ -0,0 +1,113 @@
+import asyncio
+import itertools
+
+import pytest
+
+from scraper.core import browser_pool
+from scraper.core.browser_pool import BrowserPool
+
+_ids = itertools.count()
+
+
+class FakeContext:
+    def __init__(self):
+        self.on_page = None
+        self.closed = False
+
+    def on(self, event, callback):
+        self.on_page = callback
+
+    async def new_page(self):
+        self.on_page(None)
+        return object()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.id = next(_ids)
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        return FakeContext()
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeChromium:
+    def __init__(self):
+        self.gate = None  # When set, launches wait for it
+        self.launches = 0
+
+    async def launch(self, headless):
+        self.launches += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        return FakeBrowser()
+
+
+class FakePlaywright:
+    def __init__(self, chromium):
+        self.chromium = chromium
+
+    async def stop(self):
+        pass
+
+
+@pytest.fixture
+def chromium(monkeypatch):
+    chromium = FakeChromium()
+
+    class Starter:
+        async def start(self):
+            return FakePlaywright(chromium)
+
+    monkeypatch.setattr(browser_pool, "async_playwright", Starter)
+    monkeypatch.setattr(browser_pool, "browser_rss_mb", lambda: None)
+    return chromium
+
+
+def test_browser_is_retired_mid_crawl_and_closed_once_released(chromium):
+    async def main():
+        pool = BrowserPool(size=1, max_pages=2)
+        context, pooled = await pool.acquire()
+        await context.new_page()
+        assert not pool.due(pooled)
+        await context.new_page()
+        assert pool.due(pooled)
+
+        fresh, replacement = await pool.acquire(slot=False)
+        assert replacement is not pooled and not replacement.retiring
+        await pool.release(context, pooled, slot=False)
+        assert context.closed and not pooled.browser.is_connected()
+        await pool.release(fresh, replacement)
+        await pool.close()
+
+    asyncio.run(main())
+
+
+def test_launching_does_not_hold_the_pool_lock(chromium):
+    async def main():
+        pool = BrowserPool(size=1, max_pages=1)
+        context, pooled = await pool.acquire()
+        chromium.gate = asyncio.Event()
+        await context.new_page()
+        assert pool.due(pooled)  # Starts launching a replacement, which now hangs
+        await asyncio.sleep(0)
+        await asyncio.wait_for(pool.release(context, pooled), timeout=1)
+        waiting = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0.05)
+        assert not waiting.done()  # No healthy browser until the launch finishes
+        chromium.gate.set()
+        context, pooled = await asyncio.wait_for(waiting, timeout=1)
+        assert chromium.launches == 2
+        await pool.release(context, pooled)
+        await pool.close()
+
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from scraper.core import site_meta
+from scraper.core.checkpoint import CrawlCheckpoint
+from scraper.core.http_scraper import HttpScraper
+from scraper.core.storage import BASE_DIR
+from scraper.utils.throttling import PolitenessScheduler
+
+START = "http://example.test/"
+
+
+def _counters(count, errors=0, size=0):
+    return {"count": count, "image_count": 0, "file_count": 0, "error_count": errors, "bytes": size}
+
+
+def test_resume_restores_pages_links_and_counters(tmp_path):
+    async def main():
+        checkpoint = CrawlCheckpoint(START, tmp_path, every=2)
+        checkpoint.reset()
+        await checkpoint.page_done(START, 0, [START + "a", START + "b"], [], [], _counters(1))
+        await checkpoint.page_done(START + "a", 1, [], [START + "a.png"], [], _counters(2, 1, 50))
+        await checkpoint.page_done(START + "b", 1, [], [], [], _counters(3, 1, 70))  # Buffered
+        return checkpoint
+
+    asyncio.run(main()).finish(completed=False)
+
+    checkpoint = CrawlCheckpoint(START, tmp_path)
+    assert checkpoint.resumable()
+    state = checkpoint.load()
+    assert START + "b" in state.visited  # Written by finish()
+    assert state.pending == []
+    assert list(state.edges) == [(START, START + "a"), (START, START + "b")]
+    assert START + "a.png" in state.seen_images
+    assert state.counters == _counters(3, 1, 70)
+
+
+def test_an_older_batch_does_not_roll_the_counters_back(tmp_path):
+    checkpoint = CrawlCheckpoint(START, tmp_path, every=1)
+    checkpoint.reset()
+    checkpoint._counters = _counters(1)
+    old = checkpoint._take()
+    checkpoint._counters = _counters(2)
+    checkpoint._write(checkpoint._take())
+    checkpoint._write(old)  # Finished last on the executor
+    assert checkpoint.load().counters["count"] == 2
+
+
+def test_finished_crawl_is_not_resumable(tmp_path):
+    checkpoint = CrawlCheckpoint(START, tmp_path)
+    checkpoint.reset()
+    checkpoint.finish(completed=True, counters=_counters(0))
+    assert not CrawlCheckpoint(START, tmp_path).resumable()
+
+
+@pytest.fixture
+def site():
+    """Pages at /, /a and /b, each with enough text to need no browser; counts fetches."""
+    fetched = []
+
+    async def page(request):
+        if request.path.endswith((".txt", ".xml")):  # No robots.txt or sitemaps
+            return web.Response(status=404)
+        fetched.append(request.path)
+        words = " ".join(f"{request.path} word{i}" for i in range(30))
+        return web.Response(
+            text=f"<html><body><p>{words}</p></body></html>", content_type="text/html"
+        )
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", page)
+    return app, fetched
+
+
+def test_crawl_resumes_from_the_checkpoint(crawl_dir, site, monkeypatch):
+    monkeypatch.setattr(site_meta, "_robots", {})
+    app, fetched = site
+
+    async def main():
+        runner = web.AppRunner(app)
+        await runner.setup()
+        server = web.TCPSite(runner, "127.0.0.1", 0)
+        await server.start()
+        start = f"http://127.0.0.1:{server._server.sockets[0].getsockname()[1]}/"
+        checkpoint = CrawlCheckpoint(start, BASE_DIR, every=1)
+        checkpoint.reset()
+        await checkpoint.page_done(start, 0, [start + "a", start + "b"], [], [], _counters(1))
+        checkpoint.finish(completed=False)  # As if the crawl stopped after its first page
+
+        scraper = HttpScraper(max_pages=5, workers=2)
+        scraper.scheduler = PolitenessScheduler(start_delay=0.0, min_delay=0.0)
+        try:
+            await scraper.crawl(start, resume=True)
+        finally:
+            await runner.cleanup()
+        return scraper
+
+    scraper = asyncio.run(main())
+    assert sorted(fetched) == ["/a", "/b"]
+    assert scraper._count == 3
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from scraper.core import storage
+from scraper.core.http_pool import hold_http_pool, release_http_pool
+from scraper.core.storage import async_download_file
+
+BODY = bytes(range(256)) * 400  # 100 KiB
+
+
+class FileServer:
+    """Serves BODY with Range support; the first full response drops mid-body."""
+
+    def __init__(self, drop=True):
+        self.drop = drop
+        self.ranges = []
+
+    async def handle(self, request):
+        start = 0
+        if "Range" in request.headers:
+            start = int(request.headers["Range"][6:].split("-")[0])
+            self.ranges.append((start, request.headers.get("If-Range")))
+            resp = web.StreamResponse(status=206)
+            resp.headers["Content-Range"] = f"bytes {start}-{len(BODY) - 1}/{len(BODY)}"
+        else:
+            resp = web.StreamResponse(status=200)
+        resp.headers["ETag"] = '"v1"'
+        resp.content_type = "application/pdf"
+        resp.content_length = len(BODY) - start
+        await resp.prepare(request)
+        if self.drop and not start:
+            self.drop = False
+            await resp.write(BODY[: len(BODY) // 2])
+            await asyncio.sleep(0.1)  # Let the client read what was sent
+            request.transport.close()  # Connection lost halfway through
+            return resp
+        await resp.write(BODY[start:])
+        await resp.write_eof()
+        return resp
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/{name}", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        return f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+
+def _download(server, target, **kwargs):
+    async def main():
+        url = await server.start()
+        hold_http_pool()
+        try:
+            return await async_download_file(f"{url}/doc.pdf", target, **kwargs)
+        finally:
+            await release_http_pool()
+            await server.runner.cleanup()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(storage, "DOWNLOAD_CHUNK_BYTES", 4096)
+
+
+def test_dropped_download_resumes_with_range(tmp_path):
+    server = FileServer()
+    target = tmp_path / "doc.pdf"
+    result = _download(server, target)
+    assert result.ok
+    assert target.read_bytes() == BODY
+    assert len(server.ranges) == 1
+    start, if_range = server.ranges[0]
+    assert 0 < start <= len(BODY) // 2 and if_range == '"v1"'
+    assert not (tmp_path / "doc.pdf.part").exists()
+
+
+def test_oversized_or_wrong_type_is_refused_without_leftovers(tmp_path):
+    target = tmp_path / "doc.pdf"
+    assert not _download(FileServer(drop=False), target, max_bytes=1000).ok
+    assert not _download(FileServer(drop=False), target, content_types=("image/",)).ok
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+from scraper.core.frontier import Frontier, LinkGraph
+from scraper.core.storage import save_link_graph
+from scraper.core.urlset import UrlSet
+
+SITE = "http://example.test"
+
+
+def _drain(frontier):
+    items = []
+    while not frontier.empty():
+        items.append(frontier.get_nowait())
+        frontier.task_done()
+    return items
+
+
+def test_spilled_items_come_back_in_order():
+    async def main():
+        frontier = Frontier(strategy="bfs", memory_items=3)
+        for depth in (2, 0, 1):
+            frontier.add_links(f"{SITE}/d{depth}", [f"{SITE}/{depth}/{n}" for n in range(4)], depth)
+        assert frontier.qsize() == 12 and frontier._disk_size == 9
+        items = _drain(frontier)
+        frontier.close()
+        return items
+
+    items = asyncio.run(main())
+    assert [depth for _, _, depth in items] == sorted(depth for _, _, depth in items)
+    assert [url for url, _, _ in items if url.startswith(f"{SITE}/0/")] == [
+        f"{SITE}/0/{n}" for n in range(4)
+    ]
+
+
+def test_urls_are_queued_once_but_every_edge_is_kept():
+    async def main():
+        frontier = Frontier()
+        assert frontier.add_links(SITE + "/", [SITE + "/a", SITE + "/b#top", SITE + "/a"], 1) == 2
+        assert frontier.add_links(SITE + "/a", [SITE + "/b", SITE + "/"], 2) == 1
+        frontier.add_links(SITE + "/b", [], 2)
+        graph = list(frontier.graph.items())
+        frontier.close()
+        return graph
+
+    assert asyncio.run(main()) == [
+        (SITE + "/", [SITE + "/a", SITE + "/b"]),
+        (SITE + "/a", [SITE + "/b", SITE + "/"]),
+        (SITE + "/b", []),
+    ]
+
+
+def test_link_graph_streams_to_json(crawl_dir):
+    graph = LinkGraph(buffer=2)
+    for n in range(5):
+        graph.add(f"{SITE}/{n}", f"{SITE}/{n + 1}")
+    graph.add(f"{SITE}/0", f"{SITE}/4")
+    assert len(graph) == 5
+    path = save_link_graph("example.test", graph.items())
+    graph.close()
+    saved = json.loads(path.read_text())
+    assert saved[f"{SITE}/0"] == [f"{SITE}/1", f"{SITE}/4"]
+    assert list(saved) == [f"{SITE}/{n}" for n in range(5)]
+
+
+def test_urlset_membership_survives_growth_and_deletes():
+    urls = [f"{SITE}/page/{n}" for n in range(5000)]
+    seen = UrlSet(capacity=16)
+    assert all(seen.add(url) for url in urls)
+    assert not seen.add(urls[0])
+    for url in urls[::2]:
+        seen.discard(url)
+    assert len(seen) == 2500
+    assert urls[1] in seen and urls[2] not in seen and "nope" not in seen
+    assert seen.add(urls[2]) and urls[2] in seen
@@ -0,0 +1,67 @@
+import threading
+import time
+
+import pytest
+from llm import api, cache, categorizer
+from llm.worker import CategorizationQueue
+
+ANSWER = '{"Quick-links": ["Home"], "Main text block": "Hello"}'
+
+
+@pytest.fixture
+def llm_cache(tmp_path, monkeypatch):
+    """A fresh result cache, and an Ollama stand-in that answers every prompt the same."""
+    calls = []
+
+    def fake_call(prompt, logger, on_chunk=None):
+        calls.append(prompt)
+        return {"message": {"content": ANSWER}}, None
+
+    monkeypatch.setattr(categorizer, "call_llama3", fake_call)
+    monkeypatch.setattr(cache, "_cache", cache.LLMCache(str(tmp_path / "llm.sqlite")))
+    yield cache._cache, calls
+
+
+def test_a_miss_is_counted_once_and_the_answer_is_reused(llm_cache):
+    results, calls = llm_cache
+    queue = CategorizationQueue(concurrency=1)
+    first = queue.submit("Some page text")
+    assert first.future.result(timeout=5)["Main text block"] == "Hello"
+    assert (results.hits, results.misses) == (0, 1)
+
+    queue._recent.clear()  # Forget the job so the next submit goes to the cache
+    second = queue.submit("Some page text")
+    assert second.done
+    assert (results.hits, results.misses, len(calls)) == (1, 1, 1)
+    queue.shutdown()
+
+
+def test_chunk_calls_share_the_concurrency_limit(llm_cache, monkeypatch):
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow_call(prompt, logger, on_chunk):
+        with lock:
+            running.append(prompt)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(prompt)
+        return {"message": {"content": ANSWER}}, None
+
+    monkeypatch.setattr(categorizer, "call_llama3", api.call_llama3)
+    monkeypatch.setattr(api, "_call_llama3", slow_call)
+    monkeypatch.setattr(
+        categorizer,
+        "split_into_chunks",
+        lambda text, budget: [text] * (3 if text.startswith("Long") else 1),
+    )
+    queue = CategorizationQueue(concurrency=api.LLM_CONCURRENCY)
+    # Short pages call Ollama from the queue's threads, long ones from the chunk pool
+    texts = [f"{size} page {n}" for n in range(4) for size in ("Long", "Short")]
+    jobs = [queue.submit(text) for text in texts]
+    for job in jobs:
+        job.future.result(timeout=5)
+    assert max(peak) <= api.LLM_CONCURRENCY
+    queue.shutdown()
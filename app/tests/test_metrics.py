@@ -0,0 +1,31 @@
+import pytest
+
+from scraper.core import metrics
+from scraper.core.metrics import Counter, Histogram, Metric
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    """Metrics created by a test register with a throwaway registry."""
+    monkeypatch.setattr(metrics, "REGISTRY", metrics.Registry())
+
+
+def test_a_metric_without_samples_cannot_be_created():
+    class Incomplete(Metric):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete("test_incomplete", "No samples.")
+
+
+def test_counter_and_histogram_render():
+    pages = Counter("test_pages_total", "Pages.", ["result"])
+    pages.inc(result="ok")
+    pages.inc(2, result="ok")
+    seconds = Histogram("test_seconds", "Time.", buckets=(0.1, 1.0))
+    seconds.observe(0.5)
+    assert 'test_pages_total{result="ok"} 3.0' in pages.render()
+    lines = seconds.samples()
+    assert 'test_seconds_bucket{le="0.1"} 0' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 1' in lines
+    assert "test_seconds_count 1" in lines
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from scraper.core import playwright_scraper, site_meta
+from scraper.core.archive import get_page_archive
+from scraper.core.playwright_scraper import PlaywrightScraper
+from scraper.core.storage import BASE_DIR
+from scraper.utils.throttling import PolitenessScheduler
+
+LINKS = {"/": ["/a", "/b"], "/a": ["/b"], "/b": ["/"]}
+
+
+class FakeResponse:
+    status = 200
+    headers = {"content-type": "text/html"}
+
+
+class FakePage:
+    """Just enough of a Playwright page for PlaywrightScraper._fetch_in."""
+
+    def __init__(self, origin):
+        self.origin = origin
+        self.path = ""
+
+    def on(self, event, handler):
+        pass
+
+    async def goto(self, url, timeout, wait_until):
+        self.path = url.replace(self.origin, "", 1) or "/"
+        return FakeResponse()
+
+    async def evaluate(self, script, args):
+        return True
+
+    async def wait_for_selector(self, selector, state, timeout):
+        pass
+
+    async def inner_text(self, selector):
+        return " ".join(f"{self.path} word{i}" for i in range(30))
+
+    async def eval_on_selector_all(self, selector, script):
+        if selector == "a":
+            return [self.origin + link for link in LINKS[self.path]]
+        return []
+
+    async def content(self):
+        return f"<html><body>{self.path}</body></html>"
+
+    async def close(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self, origin):
+        self.origin = origin
+        self.pages = 0
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def new_page(self):
+        self.pages += 1
+        return FakePage(self.origin)
+
+
+class FakePool:
+    def __init__(self, origin):
+        self.context = FakeContext(origin)
+        self.released = 0
+
+    async def acquire(self, headers, slot=True):
+        return self.context, object()
+
+    async def release(self, context, pooled, slot=True):
+        self.released += 1
+
+    def due(self, pooled):
+        return False
+
+
+@pytest.fixture(autouse=True)
+def fresh_robots(monkeypatch):
+    monkeypatch.setattr(site_meta, "_robots", {})
+
+
+def test_crawl_renders_pages_in_the_pooled_context(crawl_dir, monkeypatch):
+    async def main():
+        # robots.txt and sitemaps come over HTTP: a server that has neither
+        runner = web.AppRunner(web.Application())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        origin = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        pool = FakePool(origin)
+        monkeypatch.setattr(playwright_scraper, "get_browser_pool", lambda: pool)
+        scraper = PlaywrightScraper(max_pages=3, workers=2)
+        scraper.scheduler = PolitenessScheduler(start_delay=0.0, min_delay=0.0)
+        try:
+            await scraper.crawl(origin + "/")
+        finally:
+            await runner.cleanup()
+        return scraper, pool, origin
+
+    scraper, pool, origin = asyncio.run(main())
+    assert (scraper._count, scraper._error_count) == (3, 0)
+    assert pool.context.pages == 3 and pool.released == 1
+    assert [count for _, count in scraper._readiness_stats.totals().values()] == [3]
+    assert get_page_archive(BASE_DIR).get(origin + "/a").text.startswith("/a word0")
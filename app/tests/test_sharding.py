@@ -0,0 +1,79 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+from aiohttp import web
+
+from scraper.core.sharding import SHARD_STOP_GRACE, ShardDB, ShardedCrawl, SharedScheduler
+
+URL = "http://example.test/"
+
+
+class EndlessSite:
+    """Every page is slow and links to five new ones, so a crawl outlives its shards."""
+
+    def __init__(self):
+        self.pages = 0
+
+    async def page(self, request):
+        if request.path == "/robots.txt":
+            return web.Response(status=404)
+        self.pages += 1
+        await asyncio.sleep(0.05)
+        links = "".join(f'<a href="{request.path.rstrip("/")}/{n}">{n}</a>' for n in range(5))
+        words = " ".join(f"{request.path} word{i}" for i in range(30))
+        return web.Response(
+            text=f"<html><body><p>{words}</p>{links}</body></html>", content_type="text/html"
+        )
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", self.page)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        return f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+
+def test_a_dead_shard_stops_the_crawl(crawl_dir, monkeypatch):
+    monkeypatch.setenv("THROTTLE_START_DELAY", "0")
+    monkeypatch.setenv("THROTTLE_MIN_DELAY", "0")
+    site = EndlessSite()
+
+    async def main():
+        url = await site.start()
+        crawl = asyncio.create_task(ShardedCrawl(shards=2, max_pages=100000, workers=2).crawl(url))
+        try:
+            deadline = time.monotonic() + 60
+            while site.pages < 5 and time.monotonic() < deadline:
+                await asyncio.sleep(0.1)
+            assert site.pages >= 5
+            victim = next(p for p in multiprocessing.active_children() if p.name == "crawl-shard-1")
+            victim.kill()
+            killed = time.monotonic()
+            with pytest.raises(RuntimeError, match="crawl-shard-1"):
+                await asyncio.wait_for(crawl, SHARD_STOP_GRACE)
+            return time.monotonic() - killed
+        finally:
+            crawl.cancel()
+            await site.runner.cleanup()
+
+    assert asyncio.run(main()) < SHARD_STOP_GRACE  # Not left waiting for the dead shard
+
+
+def test_shards_space_requests_to_a_host_together(tmp_path):
+    path = tmp_path / "shards.sqlite"
+    first, second = ShardDB(path), ShardDB(path)  # As two shard processes would
+    schedulers = [SharedScheduler(db, start_delay=0.2, min_delay=0.2) for db in (first, second)]
+
+    async def main():
+        return [await scheduler.acquire(URL) for scheduler in schedulers]
+
+    waits = asyncio.run(main())
+    assert waits[0] == 0 and waits[1] > 0.15
+    schedulers[0].record(URL, 503)  # Applied on the database thread
+    first.close()
+    assert schedulers[1].delay_for(URL) >= 0.5
+    second.close()
@@ -0,0 +1,32 @@
+import random
+
+from scraper.core.simhash import SimHashIndex, distance, simhash
+
+WORDS = [f"word{n}" for n in range(500)]
+
+
+def _text(seed, length=200):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def test_near_duplicates_are_close_and_unrelated_texts_are_not():
+    text = _text(1)
+    edited = text.replace(text.split()[100], "changed", 1)
+    assert simhash(text) == simhash(text)
+    assert distance(simhash(text), simhash(edited)) <= 3
+    assert distance(simhash(text), simhash(_text(2))) > 10
+
+
+def test_index_finds_the_closest_page_within_the_distance():
+    index = SimHashIndex(max_distance=3, buffer=2)  # URLs spill to disk after two pages
+    base = 0xF0F0_F0F0_F0F0_F0F0
+    index.add(base, "http://example.test/a")
+    index.add(base ^ 0b111, "http://example.test/b")
+    index.add(base ^ (1 << 40), "http://example.test/c")
+    assert index.find(base ^ 0b11) == ("http://example.test/b", 1)
+    assert index.find(base ^ 0b1) == ("http://example.test/a", 1)
+    assert index.find(base ^ (1 << 40) ^ 1, max_distance=1) == ("http://example.test/c", 1)
+    assert index.find(base ^ 0b1111_0000) is None  # Four bits from every page
+    assert len(index) == 3
+    index.close()
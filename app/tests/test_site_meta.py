@@ -0,0 +1,155 @@
+import asyncio
+import gzip
+import time
+
+import pytest
+from aiohttp import web
+
+from scraper.core import base, site_meta
+from scraper.core.checkpoint import CrawlCheckpoint
+from scraper.core.http_scraper import HttpScraper
+from scraper.core.site_meta import parse_robots, sitemap_urls
+from scraper.core.storage import BASE_DIR
+from scraper.utils.throttling import PolitenessScheduler
+
+ROBOTS = """
+User-agent: *
+Disallow: /private/
+Allow: /private/open$
+Crawl-delay: 2
+
+User-agent: other-bot
+User-agent: ourbot
+Disallow: /
+Allow: /*.html$
+
+Sitemap: http://example.test/sitemap_index.xml
+"""
+
+
+def test_robots_groups_and_longest_match():
+    rules = parse_robots(ROBOTS, "*")
+    assert rules.crawl_delay == 2.0
+    assert rules.sitemaps == ["http://example.test/sitemap_index.xml"]
+    assert rules.allowed("http://example.test/")
+    assert not rules.allowed("http://example.test/private/x")
+    assert rules.allowed("http://example.test/private/open")
+    assert not rules.allowed("http://example.test/private/open?x=1")
+
+    ours = parse_robots(ROBOTS, "OurBot")  # A group may name several agents
+    assert ours.crawl_delay is None
+    assert ours.allowed("http://example.test/a/page.html")
+    assert not ours.allowed("http://example.test/a/page.html?q")
+    assert ours.allowed("http://example.test/robots.txt")
+
+
+class Site:
+    """A site whose sitemap index lists many large sitemaps; counts what is fetched."""
+
+    def __init__(self, robots_status=200, children=30, per_child=2000):
+        self.robots_status = robots_status
+        self.children = children
+        self.per_child = per_child
+        self.sitemaps = 0
+        self.url = ""
+
+    async def robots(self, request):
+        if self.robots_status != 200:
+            return web.Response(status=self.robots_status)
+        return web.Response(text="User-agent: *\nDisallow: /skip\n")
+
+    async def index(self, request):
+        entries = "".join(
+            f"<sitemap><loc>{self.url}/sitemap-{n}.xml.gz</loc></sitemap>"
+            for n in range(self.children)
+        )
+        return web.Response(text=f"<sitemapindex>{entries}</sitemapindex>")
+
+    async def child(self, request):
+        self.sitemaps += 1
+        n = request.match_info["n"]
+        await asyncio.sleep(0.2)  # A slow sitemap host
+        entries = "".join(
+            f"<url><loc>{self.url}/page/{n}-{i}</loc><lastmod>2024-01-0{1 + i % 9}</lastmod></url>"
+            for i in range(self.per_child)
+        )
+        body = gzip.compress(f"<urlset>{entries}</urlset>".encode())
+        return web.Response(body=body, content_type="application/octet-stream")
+
+    async def page(self, request):
+        text = " ".join(f"{request.path} word{i}" for i in range(30))
+        return web.Response(
+            text=f"<html><body><p>{text}</p></body></html>", content_type="text/html"
+        )
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/robots.txt", self.robots)
+        app.router.add_get("/sitemap.xml", self.index)
+        app.router.add_get("/sitemap-{n}.xml.gz", self.child)
+        app.router.add_get("/{tail:.*}", self.page)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+@pytest.fixture(autouse=True)
+def fresh_robots(monkeypatch):
+    monkeypatch.setattr(site_meta, "_robots", {})
+
+
+def _crawl(site, max_pages=3):
+    async def main():
+        url = await site.start()
+        scraper = HttpScraper(max_pages=max_pages, workers=2)
+        scraper.scheduler = PolitenessScheduler(start_delay=0.0, min_delay=0.0, max_delay=0.5)
+        try:
+            await scraper.crawl(url + "/")
+        finally:
+            await site.stop()
+        return scraper
+
+    return asyncio.run(main())
+
+
+def test_sitemaps_are_read_newest_first_up_to_the_cap():
+    site = Site(children=3, per_child=5)
+
+    async def main():
+        url = await site.start()
+        try:
+            return [batch async for batch in sitemap_urls(url + "/", [], max_urls=7)]
+        finally:
+            await site.stop()
+
+    batches = asyncio.run(main())
+    assert [len(b) for b in batches] == [5, 2]
+    assert batches[0][0].endswith("/page/0-4")  # Latest lastmod first
+    assert site.sitemaps == 2
+
+
+@pytest.mark.parametrize("per_child", [2000, 1])  # Capped by max_pages / stopped by the budget
+def test_seeding_stops_at_the_page_budget(crawl_dir, per_child):
+    site = Site(per_child=per_child)
+    started = time.monotonic()
+    scraper = _crawl(site, max_pages=3)
+    assert scraper._count == 3
+    assert site.sitemaps < 10
+    assert time.monotonic() - started < 5
+
+
+def test_unavailable_robots_fails_the_crawl(crawl_dir, monkeypatch):
+    monkeypatch.setattr(base, "ROBOTS_ATTEMPTS", 2)
+    monkeypatch.setattr(base, "ROBOTS_ERROR_SECONDS", 0.1)
+    monkeypatch.setattr(site_meta, "ROBOTS_ERROR_SECONDS", 0.1)
+    site = Site(robots_status=503)
+    with pytest.raises(RuntimeError, match="unavailable"):
+        _crawl(site)
+    assert CrawlCheckpoint(site.url + "/", BASE_DIR).resumable()  # Not recorded as finished
@@ -0,0 +1,54 @@
+import asyncio
+
+from scraper.bench.site import SiteSpec, SyntheticSite
+from scraper.core.http_scraper import HttpScraper
+from scraper.utils.throttling import PolitenessScheduler
+
+URL = "http://example.test/page"
+
+
+def test_retry_after_sets_the_pause():
+    scheduler = PolitenessScheduler(start_delay=1.0, min_delay=0.25, max_delay=60.0)
+    for _ in range(5):
+        scheduler.record(URL, 429, "1")
+    state = scheduler._hosts["example.test"]
+    assert state.blocked_until - state.raised_at < 1.1  # Not the 2 s delay
+
+
+def test_delay_doubles_once_per_window():
+    scheduler = PolitenessScheduler(start_delay=1.0, min_delay=0.25, max_delay=60.0)
+    for _ in range(10):  # A burst of 429s from requests that were already in flight
+        scheduler.record(URL, 429)
+    assert scheduler.delay_for(URL) == 2.0
+    scheduler._hosts["example.test"].raised_at -= 2.0  # The window has passed
+    scheduler.record(URL, 503)
+    assert scheduler.delay_for(URL) == 4.0
+
+
+def test_success_shrinks_the_delay_to_the_floor():
+    scheduler = PolitenessScheduler(start_delay=0.5, min_delay=0.25, decrease_step=0.1)
+    for _ in range(5):
+        scheduler.record(URL, 200)
+    assert scheduler.delay_for(URL) == 0.25
+
+
+def test_throttled_pages_are_retried_not_counted(crawl_dir):
+    spec = SiteSpec(pages=12, fanout=2, images=0, documents=0, throttle_ratio=0.5, seed=3)
+
+    async def main():
+        site = SyntheticSite(spec)
+        throttled = len(site.throttled)
+        url = await site.start()
+        scraper = HttpScraper(max_pages=20, workers=3)
+        scraper.scheduler = PolitenessScheduler(start_delay=0.0, min_delay=0.0, max_delay=0.5)
+        try:
+            await scraper.crawl(url)
+        finally:
+            await site.stop()
+        return scraper, site, throttled
+
+    scraper, site, throttled = asyncio.run(main())
+    assert throttled > 0 and site.stats["throttled"] == throttled
+    # Every page, including the ones first answered 429 ("/" and /page/0 are one page)
+    assert scraper._count == 12
+    assert scraper._error_count == 0